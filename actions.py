@@ -0,0 +1,28 @@
+class Action:
+    __slots__ = ("left", "right", "up", "down", "fire")
+
+    def __init__(self, left=False, right=False, up=False, down=False, fire=False):
+        """
+        Initializes a new instance of the Action class.
+
+        An action is what a player does in one frame, as the keys of a small gamepad: the
+        games map their keyboard to it and bots return one, so both drive the very same code.
+        Tag jumps on up, Golf changes the power with up and down and shoots on fire.
+
+        Parameters:
+            left (bool): Left is held.
+            right (bool): Right is held.
+            up (bool): Up is pressed.
+            down (bool): Down is held.
+            fire (bool): Fire is pressed.
+
+        Returns:
+            None
+        """
+        self.left = left
+        self.right = right
+        self.up = up
+        self.down = down
+        self.fire = fire
+
+IDLE = Action()
@@ -0,0 +1,237 @@
+from math import *
+import numpy as np
+import collision
+import course
+import spatial
+
+FRICTION = 0.985
+GRAVITY = 0.1
+RESIDUAL = 0.1  # Speeds under this are snapped to 0
+BOUNCE = -0.8  # Velocity kept along an axis that hit a wall
+BALL_BOUNCE = 0.8  # Share of the impulse kept when two balls hit
+PUSH_BACK = 0.1  # Share of the velocity a ball stuck in a wall steps back by
+JUMP = 2.5  # Upward speed a jump adds
+STEER = 0.12/1.18  # Speed left and right add every frame they are held
+DOWN = 1  # Speed down adds every frame it is held
+SIZE = 8  # Balls are 8x8 sprites, two centers closer than this touch
+START = (20, 228)
+
+class BallWorld:
+    def __init__(self, grid, positions):
+        """
+        Initializes a new instance of the BallWorld class.
+
+        Every ball of a Tag round lives in the arrays of the world instead of its own object:
+        positions, velocities, jump counters and whether jump was pressed this frame. One
+        step moves all of them with a few numpy operations whatever their number, the walls
+        are read from the collision masks of the course, and ball-ball contacts are found
+        through a spatial grid so only neighbours are compared.
+
+        Parameters:
+            grid (Course): The material grid of the arena.
+            positions (list): The (x, y) starting position of every ball.
+
+        Returns:
+            None
+        """
+        self.course = grid
+        self.masks = grid.masks()
+        count = len(positions)
+        self.x = np.array([float(x) for x, _ in positions])
+        self.y = np.array([float(y) for _, y in positions])
+        self.vx = np.zeros(count)
+        self.vy = np.zeros(count)
+        self.jump = np.full(count, 2)
+        self.up = np.zeros(count, dtype=bool)
+        self.tag = 0  # Player number of the ball that is it
+        self.broad = spatial.Grid(SIZE)
+        self.contacts = 0
+
+    def __len__(self):
+        return len(self.x)
+
+    def walls(self, x, y):
+        """
+        Checks which balls would touch a wall at the given positions.
+
+        Parameters:
+            x (numpy.ndarray): The x-coordinates of the top left corners.
+            y (numpy.ndarray): The y-coordinates of the top left corners.
+
+        Returns:
+            numpy.ndarray: True for every ball touching a wall.
+        """
+        return self.masks.wall[self.masks.lookup(x + 4, y + 4)]
+
+    def wallAt(self, index, x, y):
+        """
+        Checks if one ball would touch a wall at a position, refilling its jumps if so.
+
+        Parameters:
+            index (int): The ball.
+            x (float): The x-coordinate of the top left corner.
+            y (float): The y-coordinate of the top left corner.
+
+        Returns:
+            bool: True if the ball would touch a wall.
+        """
+        if collision.touches(x + 4, y + 4, course.WALL, self.course.at):
+            self.jump[index] = 2
+            return True
+        return False
+
+    def press(self, left, right, up, down):
+        """
+        Applies the controls of every ball for one frame, like ball.press does for one.
+
+        Parameters:
+            left (numpy.ndarray): True for the balls steering left.
+            right (numpy.ndarray): True for the balls steering right.
+            up (numpy.ndarray): True for the balls pressing jump this frame.
+            down (numpy.ndarray): True for the balls pushing down.
+
+        Returns:
+            None
+        """
+        jumping = up & (self.jump > 0)
+        np.subtract(self.vy, JUMP, out=self.vy, where=jumping)
+        np.subtract(self.jump, 1, out=self.jump, where=jumping)
+        self.up |= up
+        np.add(self.vy, DOWN, out=self.vy, where=down)
+        np.subtract(self.vx, STEER, out=self.vx, where=left)
+        np.add(self.vx, STEER, out=self.vx, where=right)
+
+    def step(self):
+        """
+        Moves every ball one frame: friction, wall bounces, gravity, residual speed and bounds.
+
+        Parameters:
+            None
+
+        Returns:
+            None
+        """
+        x, y, vx, vy = self.x, self.y, self.vx, self.vy
+        vx *= FRICTION
+        vy *= FRICTION
+        newX = x + vx
+        newY = y + vy
+
+        # One axis at a time, the y test sees the x move
+        hitX = self.walls(newX, y)
+        np.copyto(x, newX, where=~hitX)
+        np.multiply(vx, BOUNCE, out=vx, where=hitX)
+        hitY = self.walls(x, newY)
+        np.copyto(y, newY, where=~hitY)
+        np.multiply(vy, BOUNCE, out=vy, where=hitY)
+        self.jump[hitX | hitY] = 2
+
+        np.add(vy, GRAVITY, out=vy, where=~self.up)
+        vx[np.abs(vx) < RESIDUAL] = 0
+        vy[np.abs(vy) < RESIDUAL] = 0
+
+        out = (x < 0) | (x > 256) | (y < 0) | (y > 256)
+        if out.any():
+            x[out], y[out] = START
+            vx[out] = 0
+            vy[out] = 0
+        self.up[:] = False
+
+    def pairs(self):
+        """
+        Returns the pairs of balls close enough to touch, from the spatial grid.
+
+        Parameters:
+            None
+
+        Returns:
+            list: (i, j) index pairs with i < j, sorted.
+        """
+        centersX = (self.x + 4).tolist()
+        centersY = (self.y + 4).tolist()
+        broad = self.broad
+        broad.rebuild(list(zip(centersX, centersY)))
+        found = set()
+        for i, (cx, cy) in enumerate(zip(centersX, centersY)):
+            for j in broad.query(cx, cy, SIZE):
+                if j > i:
+                    found.add((i, j))
+        return sorted(found)
+
+    def resolve(self, i, j):
+        """
+        Separates two touching balls and bounces them off each other.
+
+        Parameters:
+            i (int): The first ball.
+            j (int): The second ball.
+
+        Returns:
+            bool: True if the balls touched.
+        """
+        x, y, vx, vy = self.x, self.y, self.vx, self.vy
+        # Between the centers of the sprites
+        dx = (float(x[i]) + 4) - (float(x[j]) + 4)
+        dy = (float(y[i]) + 4) - (float(y[j]) + 4)
+        distance = sqrt(dx*dx + dy*dy)
+        if not 0 < distance < SIZE:
+            return False
+        nx = dx / distance
+        ny = dy / distance
+        separation = (SIZE - distance) / 2
+
+        # A ball is only pushed apart if that keeps it out of the walls
+        newX, newY = float(x[i]) + nx * separation, float(y[i]) + ny * separation
+        if not self.wallAt(i, newX, newY):
+            x[i], y[i] = newX, newY
+        newX, newY = float(x[j]) - nx * separation, float(y[j]) - ny * separation
+        if not self.wallAt(j, newX, newY):
+            x[j], y[j] = newX, newY
+
+        dvx = float(vx[i]) - float(vx[j])
+        dvy = float(vy[i]) - float(vy[j])
+        impulse = 2 * (dvx * nx + dvy * ny) / 2  # Equal masses
+        vx[i] -= impulse * nx * BALL_BOUNCE
+        vy[i] -= impulse * ny * BALL_BOUNCE
+        vx[j] += impulse * nx * BALL_BOUNCE
+        vy[j] += impulse * ny * BALL_BOUNCE
+        return True
+
+    def collide(self):
+        """
+        Resolves the ball-ball contacts, the first one touching the ball that is it passes the tag.
+
+        Parameters:
+            None
+
+        Returns:
+            int: The number of contacts.
+        """
+        it = self.tag - 1
+        passed = False
+        self.contacts = 0
+        for i, j in self.pairs():
+            if self.resolve(i, j):
+                self.contacts += 1
+                if not passed and it in (i, j):
+                    self.tag = (j if it == i else i) + 1
+                    passed = True
+        return self.contacts
+
+    def pushBack(self):
+        """
+        Steps the balls a collision left inside a wall back and slows them down.
+
+        Parameters:
+            None
+
+        Returns:
+            None
+        """
+        stuck = self.walls(self.x, self.y)
+        if stuck.any():
+            self.jump[stuck] = 2
+            self.x[stuck] -= self.vx[stuck] * PUSH_BACK
+            self.y[stuck] -= self.vy[stuck] * PUSH_BACK
+            self.vx[stuck] *= -0.5
+            self.vy[stuck] *= -0.5
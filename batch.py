@@ -0,0 +1,109 @@
+class Batch:
+    def __init__(self):
+        """
+        Initializes a new instance of the Batch class.
+
+        A batch is a command buffer standing in for pyxel while a scene draws: circles, blits
+        and text are not drawn when they are submitted but kept in one bucket per layer and
+        dither level. flush then draws the buckets in order, lower layers first and the most
+        transparent level first inside a layer, so every dither level is set once per layer
+        instead of around every call. Calls in a bucket keep their order. The color key is
+        an argument of every blit in pyxel, not a state, so it does not split the buckets.
+
+        Things that must stay on top of others go to a higher layer, inside a layer the
+        solid calls are drawn over the dithered ones.
+
+        Parameters:
+            None
+
+        Returns:
+            None
+        """
+        self.buckets = {}
+        self.layer = 0
+        self.alpha = 1.0
+        self.bucket = self.buckets.setdefault((self.layer, self.alpha), [])
+        self.commands = 0  # Calls drawn by the last flush
+        self.switches = 0  # Dither changes made by the last flush
+
+    def select(self, layer, alpha):
+        self.layer = layer
+        self.alpha = alpha
+        bucket = self.buckets.get((layer, alpha))
+        if bucket is None:
+            bucket = self.buckets[(layer, alpha)] = []
+        self.bucket = bucket
+
+    def setLayer(self, layer):
+        """
+        Sends the next calls to a layer, the dither level stays.
+
+        Parameters:
+            layer (int): The layer, higher ones are drawn over lower ones.
+
+        Returns:
+            None
+        """
+        self.select(layer, self.alpha)
+
+    def dither(self, alpha):
+        self.select(self.layer, alpha)
+
+    def circ(self, x, y, r, col):
+        self.bucket.append(("circ", (x, y, r, col), None))
+
+    def rect(self, x, y, w, h, col):
+        self.bucket.append(("rect", (x, y, w, h, col), None))
+
+    def text(self, x, y, s, col):
+        self.bucket.append(("text", (x, y, s, col), None))
+
+    def blt(self, x, y, img, u, v, w, h, colkey=None, rotate=None, scale=None):
+        # Only the options given are passed on, the call is the one the scene would have made
+        options = None
+        if rotate is not None or scale is not None:
+            options = {}
+            if rotate is not None:
+                options["rotate"] = rotate
+            if scale is not None:
+                options["scale"] = scale
+        self.bucket.append(("blt", (x, y, img, u, v, w, h, colkey), options))
+
+    def flush(self, target):
+        """
+        Draws the submitted calls on a target and empties the batch.
+
+        Parameters:
+            target (object): What to draw on, pyxel, a pyxel.Image or anything with the same methods.
+
+        Returns:
+            None
+        """
+        alpha = 1.0
+        commands = 0
+        switches = 0
+        methods = {}
+        for key in sorted(self.buckets):
+            bucket = self.buckets[key]
+            if not bucket:
+                continue
+            if key[1] != alpha:
+                alpha = key[1]
+                target.dither(alpha)
+                switches += 1
+            for name, args, options in bucket:
+                method = methods.get(name)
+                if method is None:
+                    method = methods[name] = getattr(target, name)
+                if options:
+                    method(*args, **options)
+                else:
+                    method(*args)
+            commands += len(bucket)
+            bucket.clear()
+        if alpha != 1.0:
+            target.dither(1.0)
+            switches += 1
+        self.commands = commands
+        self.switches = switches
+        self.select(0, 1.0)
@@ -0,0 +1,246 @@
+import argparse
+import binding
+import contextlib
+import io
+import json
+import platform
+import random
+import sys
+import time
+import headless
+import replay
+import resources
+import timing
+from stats import summary
+
+backend = headless.install()
+backend.limit = 0  # HotAirBalloonGame() starts pyxel.run, return from it right away
+
+import main
+import game_clock, game_coin, game_golf, game_shooter, game_tag, game_wam
+
+with contextlib.redirect_stdout(io.StringIO()):
+    game = main.HotAirBalloonGame()
+
+# Scenarios, each one returns the scene to step and the input script for it
+
+def menuScene():
+    resources.use("my_resource.pyxres")
+    game.isMenu = True
+    return game, None
+
+def overworldScene():
+    resources.use("my_resource.pyxres")
+    game.isMenu = False
+    game.current_game = "balloon"
+    game.minigame = None
+    directions = [backend.KEY_RIGHT, backend.KEY_DOWN, backend.KEY_LEFT, backend.KEY_UP]
+
+    def script(b):
+        # Fly in a square around the trigger points without starting a minigame
+        b.hold(directions[(b.frame_count // 60) % 4])
+    return game, script
+
+def clockScene():
+    return game_clock.Clock(), None
+
+def coinScene():
+    game = game_coin.Coin()
+    directions = [backend.KEY_RIGHT, backend.KEY_DOWN, backend.KEY_LEFT, backend.KEY_UP]
+
+    def script(b):
+        b.hold(directions[(b.frame_count // 20) % 4])
+    return game, script
+
+def golfScene():
+    game = game_golf.Golf()
+    game.rotation = 300
+
+    def script(b):
+        # Charge to max power and shoot again as soon as the ball stops
+        if game.stopped and b.frame_count % 2 == 0:
+            b.hold(backend.KEY_UP if game.power < 10 else backend.KEY_SPACE)
+    return game, script
+
+def shooterScene():
+    game = game_shooter.Shooter()
+    # Every enemy of the wave on screen at once
+    for i in range(20):
+        game.enemies.swarm.spawn(40 + (i % 5) * 40, 10 + (i // 5) * 30, 10, game.enemies.enemieSpeed)
+
+    def script(b):
+        b.hold(backend.KEY_SPACE, backend.KEY_LEFT if (b.frame_count // 30) % 2 else backend.KEY_RIGHT)
+    return game, script
+
+def shooterStressScene(count):
+    game = game_shooter.Shooter(stress=count)
+
+    def script(b):
+        # Sweep the whole screen so shots keep running into the crowd
+        b.hold(backend.KEY_SPACE, backend.KEY_LEFT if (b.frame_count // 40) % 2 else backend.KEY_RIGHT)
+    return game, script
+
+def bulletHellScene():
+    game = game_shooter.Shooter(waves="bullethell")
+
+    def script(b):
+        # Keep shooting and sweep across the swarm
+        b.hold(backend.KEY_SPACE, backend.KEY_LEFT if (b.frame_count // 40) % 2 else backend.KEY_RIGHT)
+    return game, script
+
+def tagScene():
+    game = game_tag.Tag()
+    game.ball1.bX, game.ball1.bY = 120, 200
+    game.ball2.bX, game.ball2.bY = 126, 200
+
+    def script(b):
+        # Both players push into each other and jump from time to time
+        b.hold(backend.KEY_D, backend.KEY_LEFT)
+        if b.frame_count % 40 == 0:
+            b.hold(backend.KEY_Z, backend.KEY_UP)
+    return game, script
+
+def wamScene():
+    game = game_wam.Wam()
+
+    def script(b):
+        mole = game.moles[(b.frame_count // 2) % len(game.moles)]
+        b.moveMouse(mole["x"], mole["y"])
+        if b.frame_count % 2 == 0:
+            b.hold(backend.MOUSE_BUTTON_LEFT)
+    return game, script
+
+def replayScene(path):
+    # A fresh game, the recorded session starts from the title menu
+    player = replay.Player(path)
+    replay.attach(player, backend)
+    with contextlib.redirect_stdout(io.StringIO()):
+        game = main.HotAirBalloonGame()
+
+    def script(b):
+        player.sample()
+    return game, script
+
+SCENARIOS = {
+    "menu": menuScene,
+    "overworld": overworldScene,
+    "clock": clockScene,
+    "coin": coinScene,
+    "golf": golfScene,
+    "shooter": shooterScene,
+    "stress100": lambda: shooterStressScene(100),
+    "stress200": lambda: shooterStressScene(200),
+    "stress400": lambda: shooterStressScene(400),
+    "bullethell": bulletHellScene,
+    "tag": tagScene,
+    "wam": wamScene,
+}
+
+def timed(function, samples):
+    """
+    Wraps a function so every call appends its duration to a list.
+
+    Parameters:
+        function (callable): The function to time.
+        samples (list): The list the durations are appended to.
+
+    Returns:
+        callable: The wrapped function.
+    """
+    def run():
+        start = time.perf_counter()
+        function()
+        samples.append(time.perf_counter() - start)
+    return run
+
+def runScenario(name, frames, warmup, seed):
+    """
+    Steps one scenario headlessly and measures its update and draw times.
+
+    Parameters:
+        name (str): The name of the scenario in SCENARIOS.
+        frames (int): The number of measured frames.
+        warmup (int): The number of frames run before measuring.
+        seed (int): The seed of the random module.
+
+    Returns:
+        dict: The frame count and the update and draw time summaries.
+    """
+    random.seed(seed)
+    backend.frame_count = 0
+    backend.held = set()
+    scene, script = SCENARIOS[name]()
+    backend.script = script
+    updates = []
+    draws = []
+    # Games print to stdout (game over messages), keep the report clean
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(warmup):
+            backend.step(scene.update, scene.draw)
+        update = timed(scene.update, updates)
+        draw = timed(scene.draw, draws)
+        for _ in range(frames):
+            backend.step(update, draw)
+    backend.script = None
+    # Scenarios may wrap the backend (replay), give it back to the next one
+    binding.bind(backend)
+    timing.clock.useFrames(backend)
+    return {"frames": frames, "update": summary(updates), "draw": summary(draws)}
+
+def compare(results, baseline):
+    """
+    Prints the change of every percentile against an earlier result file.
+
+    Parameters:
+        results (dict): The results of this run.
+        baseline (dict): The results loaded from the earlier run.
+
+    Returns:
+        None
+    """
+    for name, scene in results["scenes"].items():
+        if name not in baseline["scenes"]:
+            continue
+        for phase in ("update", "draw"):
+            changes = []
+            for key, value in scene[phase].items():
+                old = baseline["scenes"][name][phase].get(key)
+                if old:
+                    changes.append(f"{key} {old:.3f}->{value:.3f}ms ({(value - old) / old * 100:+.0f}%)")
+            print(f"{name:10} {phase:6} " + "  ".join(changes), file=sys.stderr)
+
+def parseArgs():
+    parser = argparse.ArgumentParser(description="Frame time benchmark of every scene, run headlessly.")
+    parser.add_argument("--frames", type=int, default=600, help="measured frames per scene")
+    parser.add_argument("--warmup", type=int, default=60, help="frames run before measuring")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the random module")
+    parser.add_argument("--scenes", default=",".join(SCENARIOS), help="comma separated scenes to run")
+    parser.add_argument("--output", help="write the JSON results to this file instead of stdout")
+    parser.add_argument("--compare", help="JSON results of an earlier run to compare against")
+    parser.add_argument("--replay", metavar="FILE", help="input log of main.py --record, run as the replay scene")
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    args = parseArgs()
+    if args.replay:
+        SCENARIOS["replay"] = lambda: replayScene(args.replay)
+        if "--scenes" not in sys.argv:
+            args.scenes = "replay"
+    results = {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "frames": args.frames,
+        "seed": args.seed,
+        "scenes": {},
+    }
+    for name in args.scenes.split(","):
+        results["scenes"][name] = runScenario(name, args.frames, args.warmup, args.seed)
+    output = json.dumps(results, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(output + "\n")
+    else:
+        print(output)
+    if args.compare:
+        with open(args.compare) as file:
+            compare(results, json.load(file))
@@ -0,0 +1,22 @@
+import sys
+
+def bind(backend):
+    """
+    Makes every module use another pyxel implementation.
+
+    The object replaces pyxel in sys.modules, so later imports get it, and in every
+    module that already imported pyxel.
+
+    Parameters:
+        backend (object): The object to use as the pyxel module.
+
+    Returns:
+        object: The pyxel implementation that was replaced, to give back to bind later.
+    """
+    previous = sys.modules.get("pyxel")
+    sys.modules["pyxel"] = backend
+    if previous is not None:
+        for module in list(sys.modules.values()):
+            if getattr(module, "pyxel", None) is previous:
+                module.pyxel = backend
+    return previous
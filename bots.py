@@ -0,0 +1,485 @@
+import copy
+import itertools
+import time
+import numpy as np
+import pyxel
+import ballworld
+import course
+import golfsolver
+from actions import Action, IDLE
+
+BUDGET = 0.004  # Seconds of planning all the bots share in a frame, under a third of a 70 fps frame
+REPLAY_STEPS = 40  # Steps per bot and frame instead while a session is recorded or replayed
+
+class Budget:
+    def __init__(self, seconds=BUDGET, steps=None):
+        """
+        Initializes a new instance of the Budget class.
+
+        The budget is the time every bot together may plan for in a frame. Each bot asks for
+        its share when it acts: what is left of the frame's budget split between the bots
+        that did not act yet, counted from the last frame. Searches check their share after
+        every simulated step, so a frame goes over by one step at most.
+
+        How far a bot gets depends on the speed of the machine. With steps, every bot gets a
+        fixed number of simulated steps per frame instead, for replays and tests.
+
+        Parameters:
+            seconds (float): The planning time per frame.
+            steps (int): The steps per bot and frame, None to use the clock.
+
+        Returns:
+            None
+        """
+        self.seconds = seconds
+        self.steps = steps
+        self.frame = None
+        self.end = 0.0
+        self.expected = 1
+        self.served = 0
+
+    def allot(self):
+        """
+        Returns the share of the frame of the bot asking.
+
+        Parameters:
+            None
+
+        Returns:
+            callable: Called before every step of the search, True once the share is used.
+        """
+        if self.steps is not None:
+            left = [self.steps]
+
+            def counted():
+                left[0] -= 1
+                return left[0] < 0
+            return counted
+
+        now = time.perf_counter()
+        if pyxel.frame_count != self.frame:
+            self.frame = pyxel.frame_count
+            self.expected = max(self.served, 1)
+            self.served = 0
+            self.end = now + self.seconds
+        waiting = max(self.expected - self.served, 1)
+        self.served += 1
+        deadline = now + max(0.0, self.end - now) / waiting
+        return lambda: time.perf_counter() >= deadline
+
+budget = Budget()
+
+def advance(search, expired):
+    """
+    Runs a search until it ends or the share of the frame is used.
+
+    Parameters:
+        search (generator): The search, yielding after every step.
+        expired (callable): Returns True once the share is used.
+
+    Returns:
+        bool: True if the search ended.
+    """
+    while not expired():
+        try:
+            next(search)
+        except StopIteration:
+            return True
+    return False
+
+# Tag plans are sequences of moves, each held for a segment of frames
+SEGMENT = 8
+DEPTH = 3
+MOVES = [(0, False), (-1, False), (1, False), (0, True), (-1, True), (1, True)]  # Steer and jump
+SAFE = 48  # A runner this far from the ball that is it does not need to get further
+HURRY = 0.1  # Pixels a chaser would give to catch one frame earlier
+
+def segments(depth):
+    """
+    Returns every sequence of depth moves, frame by frame.
+
+    Parameters:
+        depth (int): The number of segments.
+
+    Returns:
+        tuple: The steering (-1, 0 or 1) and the jump presses, arrays of shape (plans, frames).
+    """
+    combos = np.array(list(itertools.product(range(len(MOVES)), repeat=depth)))
+    steer = np.array([move[0] for move in MOVES])[combos]
+    jump = np.array([move[1] for move in MOVES])[combos]
+    # Jump is pressed on the first frame of a segment, steering is held through it
+    steer = np.repeat(steer, SEGMENT, axis=1)
+    pressed = np.zeros((len(combos), depth * SEGMENT), dtype=bool)
+    pressed[:, ::SEGMENT] = jump
+    return steer, pressed
+
+PLANS = {depth: segments(depth) for depth in range(1, DEPTH + 1)}
+
+def cellOf(grid, x, y):
+    """
+    Returns the course cells under screen positions, clamped to the course.
+
+    Parameters:
+        grid (Course): The course.
+        x (numpy.ndarray): The x-coordinates.
+        y (numpy.ndarray): The y-coordinates.
+
+    Returns:
+        tuple: The rows and the columns of the cells.
+    """
+    rows = np.clip((y - grid.top) // grid.scale, 0, grid.height - 1).astype(int)
+    columns = np.clip((x - grid.left) // grid.scale, 0, grid.width - 1).astype(int)
+    return rows, columns
+
+def flood(grid, sources):
+    """
+    Counts the steps from the source cells to every cell of a course, going around the walls.
+
+    Parameters:
+        grid (Course): The course.
+        sources (tuple): The rows and the columns of the source cells.
+
+    Returns:
+        generator: Yields after every ring of cells, returns the steps per cell, infinite
+        for the cells no path reaches.
+    """
+    cells = np.frombuffer(bytes(grid.cells), dtype=np.uint8).reshape(grid.height, grid.width)
+    free = cells != course.WALL
+    field = np.full(cells.shape, np.inf)
+    ring = np.zeros(cells.shape, dtype=bool)
+    ring[sources] = True
+    steps = 0
+    while ring.any():
+        field[ring] = steps
+        steps += 1
+        grown = ring.copy()
+        grown[1:] |= ring[:-1]
+        grown[:-1] |= ring[1:]
+        grown[:, 1:] |= ring[:, :-1]
+        grown[:, :-1] |= ring[:, 1:]
+        ring = grown & free & np.isinf(field)
+        yield
+    return field
+
+class TagBot:
+    def __init__(self, budget=budget):
+        """
+        Initializes a new instance of the TagBot class.
+
+        The bot plans by playing candidate move sequences forward in a BallWorld, all of
+        them at once, with the same friction, wall bounces and gravity as the real balls.
+        The other balls are expected to keep their velocity. The ball that is it looks for
+        the plan getting closest to another ball soonest, the others for the plan keeping
+        furthest from it, distances going around the walls once they are more than a cell.
+
+        The search is anytime: plans of one, two and three segments are tried in turn and
+        the best plan found so far is played while the search goes on over the next frames.
+        What is left of the previous plan is always one of the candidates, so a new plan
+        only replaces it if it scores better.
+
+        Parameters:
+            budget (Budget): The planning time shared with the other bots.
+
+        Returns:
+            None
+        """
+        self.budget = budget
+        self.plan = []
+        self.search = None
+        self.chasing = None
+        self.ticks = 0
+        self.searches = 0
+
+    def act(self, ball):
+        """
+        Returns the action of the ball for this frame.
+
+        Parameters:
+            ball (ball): The ball the bot plays.
+
+        Returns:
+            Action: What to press.
+        """
+        world = ball.world
+        if world.tag == 0 or len(world) < 2:
+            return IDLE
+        chasing = world.tag == ball.player
+        if chasing != self.chasing:
+            # The tag changed hands, what was planned is for the other role
+            self.chasing = chasing
+            self.search = None
+        if self.search is None:
+            self.search = self.think(ball, chasing)
+        if advance(self.search, self.budget.allot()):
+            self.search = None
+            self.searches += 1
+        self.ticks += 1
+        if not self.plan:
+            return IDLE
+        steer, jump = self.plan.pop(0)
+        return Action(left=steer < 0, right=steer > 0, up=jump)
+
+    def think(self, ball, chasing):
+        """
+        Searches for the best plan from the state of the ball now, deeper and deeper.
+
+        Parameters:
+            ball (ball): The ball the bot plays.
+            chasing (bool): Whether the ball is it.
+
+        Returns:
+            generator: Yields after every simulated frame, sets plan after every depth.
+        """
+        world = ball.world
+        start = self.ticks
+        index = ball.index
+        state = (ball.bX, ball.bY, ball.bvX, ball.bvY, ball.jump)
+        if chasing:
+            targets = [k for k in range(len(world)) if k != index]
+        else:
+            targets = [world.tag - 1]
+        targetX = world.x[targets] + 4
+        targetY = world.y[targets] + 4
+        targetVX = world.vx[targets]
+        targetVY = world.vy[targets]
+        previous = list(self.plan)
+        grid = world.course
+        field = yield from flood(grid, cellOf(grid, targetX, targetY))
+
+        for depth in range(1, DEPTH + 1):
+            steer, jump = PLANS[depth]
+            frames = steer.shape[1]
+            if previous:
+                # The rest of the last plan, then drifting
+                last = np.array([[move[0] for move in previous[:frames]] + [previous[-1][0]] * (frames - len(previous))])
+                pressed = np.array([[move[1] for move in previous[:frames]] + [False] * (frames - len(previous))])
+                steer = np.concatenate([last, steer])
+                jump = np.concatenate([pressed, jump])
+            count = len(steer)
+            sim = ballworld.BallWorld(grid, [state[:2]] * count)
+            sim.vx[:] = state[2]
+            sim.vy[:] = state[3]
+            sim.jump[:] = state[4]
+            down = np.zeros(count, dtype=bool)
+            score = np.full(count, np.inf if not chasing else -np.inf)
+            for frame in range(frames):
+                sim.press(steer[:, frame] < 0, steer[:, frame] > 0, jump[:, frame], down)
+                sim.step()
+                t = frame + 1
+                predictedX = np.clip(targetX + targetVX * t, 4, 252)
+                predictedY = np.clip(targetY + targetVY * t, 4, 252)
+                distance = np.hypot(sim.x[:, None] + 4 - predictedX, sim.y[:, None] + 4 - predictedY).min(axis=1)
+                # Around walls the way to the targets is longer than the straight line
+                path = field[cellOf(grid, sim.x + 4, sim.y + 4)]
+                distance = np.where(path > 1, path * grid.scale, distance)
+                if chasing:
+                    # Closest approach, a frame sooner is worth HURRY pixels
+                    np.maximum(score, -(np.maximum(distance - ballworld.SIZE, 0) + HURRY * t), out=score)
+                else:
+                    np.minimum(score, np.minimum(distance, SAFE), out=score)
+                yield
+            best = int(np.argmax(score))
+            plan = list(zip(steer[best].tolist(), jump[best].tolist()))
+            # The search started some frames ago, those moves are already played
+            self.plan = plan[self.ticks - start:]
+            previous = plan
+
+# Golf searches
+COARSE = 10  # Degrees between the rotations of the first pass
+CHUNK = 36  # Rotations simulated together after it
+VERIFY = 12  # Promising shots played with the real physics of the game
+PATIENCE = 140  # Frames the bot thinks at most before it shoots the best shot found
+
+class GolfBot:
+    def __init__(self, solver, budget=budget):
+        """
+        Initializes a new instance of the GolfBot class.
+
+        The bot screens the shots of the hole with golfsolver.Simulation, a few hundred at
+        a time: every tenth rotation first, then the rotations closest to the best one so
+        far. The solver plays the per axis bounce, so after every chunk the most promising
+        shot not checked yet is played again on a copy of the game, frame by frame with its
+        own physics, and only shots checked this way are aimed at.
+
+        The aim turns toward the best checked shot while the search goes on, and the bot
+        shoots once the search is over, a shot reaches the hole, or it has thought for
+        PATIENCE frames. Results the solver already has, like the hints of the tee, replace
+        the screening.
+
+        Parameters:
+            solver (Solver): The solver of the game, for its cache and best.
+            budget (Budget): The planning time shared with the other bots.
+
+        Returns:
+            None
+        """
+        self.solver = solver
+        self.budget = budget
+        self.position = None
+        self.search = None
+        self.best = None
+        self.left = np.inf
+        self.waited = 0
+
+    def act(self, golf):
+        """
+        Returns the action of the player for this frame, while the ball is stopped.
+
+        Parameters:
+            golf (Golf): The game.
+
+        Returns:
+            Action: What to press.
+        """
+        grid = golf.currentCourse()
+        if grid is course.EMPTY_COURSE:
+            return IDLE
+        position = (golf.holes, golf.bX, golf.bY)
+        if position != self.position:
+            self.position = position
+            self.best = None
+            self.left = np.inf
+            self.waited = 0
+            self.search = self.think(golf, grid)
+        if self.search is not None and advance(self.search, self.budget.allot()):
+            self.search = None
+        self.waited += 1
+        if self.best is None:
+            return IDLE
+
+        rotation, power = self.best
+        if golf.power < power:
+            return Action(up=True)
+        if golf.power > power:
+            return Action(down=True)
+        # Golf wraps the rotation between 0 and 360
+        turn = (rotation - golf.rotation) % 360
+        if turn:
+            return Action(right=True) if turn <= 180 else Action(left=True)
+        if self.search is None or self.waited >= PATIENCE:
+            return Action(fire=True)
+        return IDLE
+
+    def think(self, golf, grid):
+        """
+        Searches for the shot ending closest to the hole from where the ball is.
+
+        Parameters:
+            golf (Golf): The game.
+            grid (Course): The compiled course of the hole.
+
+        Returns:
+            generator: Yields after every simulated frame, sets best after every checked shot.
+        """
+        x, y = golf.bX, golf.bY
+        rotations, powers = golfsolver.ROTATIONS, golfsolver.POWERS
+        cells = np.frombuffer(bytes(grid.cells), dtype=np.uint8).reshape(grid.height, grid.width)
+        hole = np.nonzero(cells == course.HOLE)
+        if len(hole[0]) == 0:
+            return
+        # The way to the hole goes around the walls, a ball behind one is not close
+        field = yield from flood(grid, hole)
+        known = self.solver.known(golf.holeKey(), x, y)
+        tried = np.zeros(len(rotations), dtype=bool)
+        if known is not None:
+            screened = self.rank(grid, field, known)
+            tried[:] = True
+        else:
+            screened = np.full((len(rotations), len(powers)), np.inf)
+            masks = grid.masks(lazy=True)
+            yield from masks.building()
+        chunk = rotations[~tried][::COARSE]
+        checked = np.zeros(screened.shape, dtype=bool)
+
+        for _ in range(VERIFY):
+            if len(chunk):
+                simulation = golfsolver.Simulation(grid, x, y, chunk, powers, masks)
+                while simulation.step():
+                    yield
+                screened[chunk] = self.rank(grid, field, simulation.result())
+                tried[chunk] = True
+
+            # The softest of the shots the solver ranks best, among the ones not checked yet
+            unchecked = ~checked
+            rows, columns = np.nonzero(unchecked & (screened == screened[unchecked].min()))
+            column, row = min(zip(columns.tolist(), rows.tolist()))
+            checked[row, column] = True
+            left = yield from self.play(golf, grid, field, int(rotations[row]), int(powers[column]))
+            if self.best is None or left < self.left:
+                self.best, self.left = (int(rotations[row]), int(powers[column])), left
+            if self.left == 0:
+                return
+
+            # The untried rotations nearest to the best one next
+            rest = rotations[~tried]
+            nearest = np.argsort(np.abs((rest - self.best[0] + 180) % 360 - 180), kind="stable")
+            chunk = rest[nearest[:CHUNK]]
+
+    def distance(self, grid, field, x, y):
+        """
+        Returns how far balls are from the hole, along the way around the walls.
+
+        Parameters:
+            grid (Course): The compiled course of the hole.
+            field (numpy.ndarray): The cells to the hole from every cell, from flood.
+            x (numpy.ndarray): The x-coordinates of the balls.
+            y (numpy.ndarray): The y-coordinates of the balls.
+
+        Returns:
+            numpy.ndarray: The distances in pixels, roughly.
+        """
+        centerX, centerY = golfsolver.holeCenter(grid)
+        # The straight line only tells apart the balls in the same cell
+        return field[cellOf(grid, x + 4, y + 4)] * grid.scale + 0.1 * np.hypot(x + 4 - centerX, y + 4 - centerY)
+
+    def rank(self, grid, field, result):
+        """
+        Returns the distance left to the hole after every shot of a solver result.
+
+        Parameters:
+            grid (Course): The compiled course of the hole.
+            field (numpy.ndarray): The cells to the hole from every cell, from flood.
+            result (dict): The arrays returned by golfsolver.simulate.
+
+        Returns:
+            numpy.ndarray: The distances, 0 for the shots in the hole, infinite for the lost ones.
+        """
+        left = self.distance(grid, field, result["x"], result["y"])
+        left[result["outcome"] == golfsolver.HOLED] = 0
+        left[(result["outcome"] == golfsolver.WATER) | (result["outcome"] == golfsolver.OUT)] = np.inf
+        return left
+
+    def play(self, golf, grid, field, rotation, power):
+        """
+        Plays a shot on a copy of the game with its own physics.
+
+        Only the physics steps of Golf.update run on the copy, moveBall, residual and
+        checkBall: think and the controls would share the solver searches and the budget
+        with the game.
+
+        Parameters:
+            golf (Golf): The game.
+            grid (Course): The compiled course of the hole.
+            field (numpy.ndarray): The cells to the hole from every cell, from flood.
+            rotation (int): The rotation of the shot.
+            power (int): The power of the shot.
+
+        Returns:
+            generator: Yields after every frame, returns the distance left to the hole,
+            0 if the ball went in.
+        """
+        shadow = copy.copy(golf)
+        shadow.rotation, shadow.power = rotation, power
+        # The frame of the shot, as Golf.update runs it
+        shadow.shoot()
+        shadow.checkBall()
+        for _ in range(golfsolver.MAX_FRAMES):
+            if shadow.stopped:
+                break
+            yield
+            shadow.moveBall()
+            shadow.residual()
+            shadow.checkBall()
+        if shadow.holes != golf.holes:
+            return 0.0
+        return float(self.distance(grid, field, np.array(shadow.bX), np.array(shadow.bY)))
@@ -0,0 +1,96 @@
+from math import *
+import pyxel
+
+RADIUS = 4
+SUBPIXEL = 4
+
+def buildOffsets(radius, subpixel):
+    """
+    Builds the integer perimeter offsets of a circle for every sub-pixel position of its center.
+
+    The points are generated the same way the old collisionCircle did it (360 directions,
+    truncated to whole pixels, duplicates removed), but only once per sub-pixel bucket
+    instead of on every call.
+
+    This is an approximation: every center in a bucket uses the probes of the bucket's
+    top left corner. The old code used the exact position, a probe can then land one pixel
+    left of or above the one it had, never further. Integer positions probe exactly the
+    same pixels. Near the walls of the Golf holes and the Tag arena at most 0.1% of centers
+    see a different wall contact, tests/test_collision.py checks both bounds. Reproducing
+    the exact probes takes about 180 thresholds per axis instead of 4, too many for the
+    masks of course.Masks, which must agree with these tables.
+
+    Parameters:
+        radius (int): The radius of the circle.
+        subpixel (int): The number of sub-pixel buckets per axis.
+
+    Returns:
+        dict: A dict mapping (bucketX, bucketY) to a tuple of (dx, dy) offsets.
+    """
+    tables = {}
+    for bucketX in range(subpixel):
+        for bucketY in range(subpixel):
+            fracX = bucketX / subpixel
+            fracY = bucketY / subpixel
+            offsets = []
+            seen = set()
+            for direction in range(360):
+                end = (floor(fracX + cos(radians(direction)) * radius),
+                       floor(fracY + sin(radians(direction)) * radius))
+                if end not in seen:
+                    seen.add(end)
+                    offsets.append(end)
+            tables[(bucketX, bucketY)] = tuple(offsets)
+    return tables
+
+OFFSETS = buildOffsets(RADIUS, SUBPIXEL)
+
+def offsets(x, y):
+    """
+    Returns the pixel the center falls in and the perimeter offsets to use around it.
+
+    Parameters:
+        x (float): The x-coordinate of the center of the circle.
+        y (float): The y-coordinate of the center of the circle.
+
+    Returns:
+        tuple: The integer center (ix, iy) and the tuple of (dx, dy) offsets.
+    """
+    ix = floor(x)
+    iy = floor(y)
+    return ix, iy, OFFSETS[(int((x - ix) * SUBPIXEL), int((y - iy) * SUBPIXEL))]
+
+def circle(x, y):
+    """
+    Returns the pixels on the perimeter of the collision circle around a point.
+
+    Parameters:
+        x (float): The x-coordinate of the center of the circle.
+        y (float): The y-coordinate of the center of the circle.
+
+    Returns:
+        list: A list of (x, y) pixel positions.
+    """
+    ix, iy, table = offsets(x, y)
+    return [(ix + dx, iy + dy) for dx, dy in table]
+
+def touches(x, y, color, sample=None):
+    """
+    Checks if any pixel on the perimeter of the collision circle has a given color.
+
+    Parameters:
+        x (float): The x-coordinate of the center of the circle.
+        y (float): The y-coordinate of the center of the circle.
+        color (int): The color to look for.
+        sample (callable): The function used to read a pixel, pyxel.pget by default.
+
+    Returns:
+        bool: True if at least one perimeter pixel has the color, False otherwise.
+    """
+    if sample is None:
+        sample = pyxel.pget
+    ix, iy, table = offsets(x, y)
+    for dx, dy in table:
+        if sample(ix + dx, iy + dy) == color:
+            return True
+    return False
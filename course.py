@@ -0,0 +1,367 @@
+from math import *
+import numpy as np
+import pyxel
+import collision
+import resources
+
+EMPTY = 0
+WALL = 1
+HOLE = 2
+SAND = 3
+WATER = 4
+
+# Palette colors the course art uses for each material
+COLORS = {4: WALL, 8: HOLE, 15: SAND, 10: WATER}
+PAD = 32  # Ball centers a little off screen still get a mask entry
+
+class Course:
+    def __init__(self, cells, width, height, scale, left, top):
+        """
+        Initializes a new instance of the Course class.
+
+        A course is a grid of materials at the resolution of the source image, placed on
+        the screen the same way the scaled blt of checkHoles draws it.
+
+        Parameters:
+            cells (bytearray): One material per source pixel, row by row.
+            width (int): The width of the source image.
+            height (int): The height of the source image.
+            scale (int): The scale the image is drawn with.
+            left (int): The screen x-coordinate of the top left corner of the drawn image.
+            top (int): The screen y-coordinate of the top left corner of the drawn image.
+
+        Returns:
+            None
+        """
+        self.cells = cells
+        self.width = width
+        self.height = height
+        self.scale = scale
+        self.left = left
+        self.top = top
+        self.field = None
+        self.collisionMasks = None
+
+    def at(self, x, y):
+        """
+        Returns the material under a screen pixel.
+
+        Parameters:
+            x (int): The screen x-coordinate.
+            y (int): The screen y-coordinate.
+
+        Returns:
+            int: The material (EMPTY, WALL, HOLE, SAND or WATER).
+        """
+        column = (x - self.left) // self.scale
+        row = (y - self.top) // self.scale
+        if 0 <= column < self.width and 0 <= row < self.height:
+            return self.cells[row * self.width + column]
+        return EMPTY
+
+    def distanceField(self):
+        """
+        Returns the distance from every screen pixel of the course to the nearest wall.
+
+        The field is computed the first time it is needed and kept with the course.
+
+        Parameters:
+            None
+
+        Returns:
+            numpy.ndarray: The distances in pixels, one row per screen row of the course.
+        """
+        if self.field is None:
+            size = self.scale
+            width, height = self.width * size, self.height * size
+            walls = np.flatnonzero(np.frombuffer(bytes(self.cells), dtype=np.uint8) == WALL)
+            if len(walls) == 0:
+                self.field = np.full((height, width), np.inf)
+                return self.field
+            # Distance along each axis from every pixel column and row to every wall square
+            left = (walls % self.width) * size
+            top = (walls // self.width) * size
+            x = np.arange(width)[:, None]
+            y = np.arange(height)[:, None]
+            dx = np.maximum(np.maximum(left - x, x - (left + size)), 0) ** 2
+            dy = np.maximum(np.maximum(top - y, y - (top + size)), 0) ** 2
+            field = np.empty((height, width))
+            for row in range(height):
+                field[row] = np.min(dx + dy[row], axis=1)
+            self.field = np.sqrt(field)
+        return self.field
+
+    def masks(self, lazy=False):
+        """
+        Returns the collision masks of the course, built the first time they are needed.
+
+        Parameters:
+            lazy (bool): Whether to return masks that may still be building, see Masks.
+
+        Returns:
+            Masks: The masks, kept with the course.
+        """
+        if self.collisionMasks is None:
+            self.collisionMasks = Masks(self, lazy=True)
+        if not lazy:
+            self.collisionMasks.finish()
+        return self.collisionMasks
+
+    def clearance(self, x, y):
+        """
+        Returns how far a point is at least from the nearest wall, with one field lookup.
+
+        Parameters:
+            x (float): The screen x-coordinate.
+            y (float): The screen y-coordinate.
+
+        Returns:
+            float: A lower bound of the distance to the nearest wall.
+        """
+        field = self.distanceField()
+        height, width = field.shape
+        column = min(max(floor(x - self.left + 0.5), 0), width - 1)
+        row = min(max(floor(y - self.top + 0.5), 0), height - 1)
+        # The distance changes at most as fast as the point moves away from the sample
+        return field[row, column] - hypot(x - self.left - column, y - self.top - row)
+
+    def sweep(self, x, y, dx, dy, radius):
+        """
+        Moves a circle along a segment and finds where it first touches a wall.
+
+        When the distance field shows the whole segment is clear this is a single lookup,
+        otherwise the walls the circle can reach are tested exactly.
+
+        Parameters:
+            x (float): The x-coordinate of the center at the start.
+            y (float): The y-coordinate of the center at the start.
+            dx (float): The x component of the movement.
+            dy (float): The y component of the movement.
+            radius (float): The radius of the circle.
+
+        Returns:
+            tuple: (t, contact x, contact y, normal x, normal y) where t is the fraction of the
+            movement done before the contact, or None if the circle does not touch a wall.
+        """
+        length = hypot(dx, dy)
+        if length == 0 or self.clearance(x, y) - radius > length:
+            return None
+        size = self.scale
+        first = max(0, floor((min(x, x + dx) - radius - self.left) / size))
+        last = min(self.width - 1, floor((max(x, x + dx) + radius - self.left) / size))
+        top = max(0, floor((min(y, y + dy) - radius - self.top) / size))
+        bottom = min(self.height - 1, floor((max(y, y + dy) + radius - self.top) / size))
+        best = None
+        for row in range(top, bottom + 1):
+            for column in range(first, last + 1):
+                if self.cells[row * self.width + column] != WALL:
+                    continue
+                hit = sweepSquare(x, y, dx, dy, radius, self.left + column * size, self.top + row * size, size)
+                if hit is not None and (best is None or hit[0] < best[0]):
+                    best = hit
+        return best
+
+def sweepSquare(x, y, dx, dy, radius, left, top, size):
+    """
+    Finds where a moving circle first touches a square.
+
+    Parameters:
+        x (float): The x-coordinate of the center at the start.
+        y (float): The y-coordinate of the center at the start.
+        dx (float): The x component of the movement.
+        dy (float): The y component of the movement.
+        radius (float): The radius of the circle.
+        left (float): The x-coordinate of the left side of the square.
+        top (float): The y-coordinate of the top side of the square.
+        size (float): The side of the square.
+
+    Returns:
+        tuple: (t, contact x, contact y, normal x, normal y), or None if there is no contact
+        or the circle moves away from the square.
+    """
+    right, bottom = left + size, top + size
+    # Already overlapping, a contact right away if the circle goes further in
+    nearX, nearY = min(max(x, left), right), min(max(y, top), bottom)
+    distance = hypot(x - nearX, y - nearY)
+    if distance < radius:
+        if distance == 0:
+            length = hypot(dx, dy)
+            normalX, normalY = -dx / length, -dy / length
+        else:
+            normalX, normalY = (x - nearX) / distance, (y - nearY) / distance
+        if dx * normalX + dy * normalY < 0:
+            return (0.0, nearX, nearY, normalX, normalY)
+        return None
+    # The sides of the square pushed out by the radius, only the ones the circle moves towards
+    if dx > 0:
+        t = (left - radius - x) / dx
+        if 0 <= t <= 1 and top <= y + t * dy <= bottom:
+            return (t, left, y + t * dy, -1.0, 0.0)
+    elif dx < 0:
+        t = (right + radius - x) / dx
+        if 0 <= t <= 1 and top <= y + t * dy <= bottom:
+            return (t, right, y + t * dy, 1.0, 0.0)
+    if dy > 0:
+        t = (top - radius - y) / dy
+        if 0 <= t <= 1 and left <= x + t * dx <= right:
+            return (t, x + t * dx, top, 0.0, -1.0)
+    elif dy < 0:
+        t = (bottom + radius - y) / dy
+        if 0 <= t <= 1 and left <= x + t * dx <= right:
+            return (t, x + t * dx, bottom, 0.0, 1.0)
+    # The rounded corners
+    best = None
+    a = dx * dx + dy * dy
+    for cornerX, cornerY in ((left, top), (right, top), (left, bottom), (right, bottom)):
+        offsetX, offsetY = x - cornerX, y - cornerY
+        b = dx * offsetX + dy * offsetY
+        discriminant = b * b - a * (offsetX * offsetX + offsetY * offsetY - radius * radius)
+        if b >= 0 or discriminant < 0:
+            continue
+        t = (-b - sqrt(discriminant)) / a
+        if 0 <= t <= 1 and (best is None or t < best[0]):
+            normalX = (offsetX + t * dx) / radius
+            normalY = (offsetY + t * dy) / radius
+            best = (t, cornerX, cornerY, normalX, normalY)
+    return best
+
+class Masks:
+    def __init__(self, grid, lazy=False):
+        """
+        Initializes a new instance of the Masks class.
+
+        For every pixel and every sub-pixel bucket a ball center can be in, the masks hold
+        what Golf.checkCollision and Golf.wouldCollide would find on the collision circle:
+        a wall, the hole, water and the number of sand pixels, scanned in the same order.
+
+        Building them takes tens of milliseconds. Lazy masks are built by iterating over
+        building(), one perimeter offset at a time, or all at once by finish.
+
+        Parameters:
+            grid (Course): The compiled course of the hole.
+            lazy (bool): Whether to leave the masks empty until building() is iterated.
+
+        Returns:
+            None
+        """
+        size = 256 + 2 * PAD
+        # Material under every screen pixel, the course drawn at its scale
+        materials = np.zeros((size + 16, size + 16), dtype=np.uint8)
+        cells = np.frombuffer(bytes(grid.cells), dtype=np.uint8).reshape(grid.height, grid.width)
+        drawn = np.repeat(np.repeat(cells, grid.scale, axis=0), grid.scale, axis=1)
+        top, left = grid.top + PAD + 8, grid.left + PAD + 8
+        materials[top:top + drawn.shape[0], left:left + drawn.shape[1]] = drawn
+
+        shape = (collision.SUBPIXEL, collision.SUBPIXEL, size, size)
+        self.wall = np.zeros(shape, dtype=bool)
+        self.hole = np.zeros(shape, dtype=bool)
+        self.water = np.zeros(shape, dtype=bool)
+        self.sand = np.zeros(shape, dtype=np.uint8)
+        self.steps = self.build(materials, size)
+        if not lazy:
+            self.finish()
+
+    def build(self, materials, size):
+        """
+        Fills the masks, yielding after every perimeter offset of every bucket.
+
+        Parameters:
+            materials (numpy.ndarray): The material under every screen pixel, with a margin of 8.
+            size (int): The side of the masks.
+
+        Returns:
+            generator: Yields None until the masks are complete.
+        """
+        for (bucketX, bucketY), table in collision.OFFSETS.items():
+            wall = self.wall[bucketX, bucketY]
+            hole = self.hole[bucketX, bucketY]
+            water = self.water[bucketX, bucketY]
+            sand = self.sand[bucketX, bucketY]
+            done = np.zeros((size, size), dtype=bool)
+            for dx, dy in table:
+                material = materials[8 + dy:8 + dy + size, 8 + dx:8 + dx + size]
+                wall |= material == WALL
+                # checkCollision stops at the first wall or hole pixel
+                active = ~done
+                hole |= active & (material == HOLE)
+                water |= active & (material == WATER)
+                sand += active & (material == SAND)
+                done |= (material == WALL) | (material == HOLE)
+                yield
+
+    def building(self):
+        """
+        Returns a generator moving the build of the masks on, for a search to yield from.
+
+        Every search gets its own generator over the one shared build: a search that is
+        dropped closes its generator, which would end the build half done if it was shared.
+
+        Parameters:
+            None
+
+        Returns:
+            generator: Yields after every step of the build until the masks are complete.
+        """
+        for _ in self.steps:
+            yield
+
+    def finish(self):
+        for _ in self.steps:
+            pass
+
+    def lookup(self, x, y):
+        """
+        Returns the index of the mask entries for ball centers.
+
+        Parameters:
+            x (numpy.ndarray): The x-coordinates of the centers.
+            y (numpy.ndarray): The y-coordinates of the centers.
+
+        Returns:
+            tuple: The index to use on the mask arrays.
+        """
+        ix = np.floor(x)
+        iy = np.floor(y)
+        bucketX = ((x - ix) * collision.SUBPIXEL).astype(int)
+        bucketY = ((y - iy) * collision.SUBPIXEL).astype(int)
+        size = self.wall.shape[-1]
+        column = np.clip(ix.astype(int) + PAD, 0, size - 1)
+        row = np.clip(iy.astype(int) + PAD, 0, size - 1)
+        return bucketX, bucketY, row, column
+
+EMPTY_COURSE = Course(bytearray(1), 1, 1, 1, 0, 0)
+
+cache = {}
+
+def bake(img, u, v, w, h, x, y, scale):
+    """
+    Turns a course image from an image bank into a material grid.
+
+    The arguments are the ones given to the scaled pyxel.blt that draws the course, so the
+    grid lines up with what is on screen. Compiled courses are cached per resource file.
+
+    Parameters:
+        img (int): The image bank holding the course.
+        u (int): The x-coordinate of the course in the image bank.
+        v (int): The y-coordinate of the course in the image bank.
+        w (int): The width of the course image.
+        h (int): The height of the course image.
+        x (float): The x-coordinate given to blt.
+        y (float): The y-coordinate given to blt.
+        scale (int): The scale given to blt.
+
+    Returns:
+        Course: The compiled course.
+    """
+    key = (resources.current(), img, u, v, w, h, x, y, scale)
+    if key not in cache:
+        bank = pyxel.images[img]
+        cells = bytearray(w * h)
+        for row in range(h):
+            for column in range(w):
+                cells[row * w + column] = COLORS.get(bank.pget(u + column, v + row), EMPTY)
+        # blt scales around the center of the destination rectangle
+        left = int(x + w / 2 - w * scale / 2)
+        top = int(y + h / 2 - h * scale / 2)
+        cache[key] = Course(cells, w, h, scale, left, top)
+    return cache[key]
@@ -1,13 +1,15 @@
 import pyxel
-import time
 import random
+import batch
+import redraw
+import timing
 
 class Clock:
     def __init__(self):
         """
         Initializes a new instance of the Clock class, setting up the initial game state.
         
-        Sets the target time to a random value between 5 and 20 seconds, records the start time, 
+        Sets the target time to a random value between 5 and 20 seconds, starts the timer, 
         and initializes other game state variables to their default values.
         
         Parameters:
@@ -17,7 +19,7 @@ class Clock:
             None
         """
         self.target_time = random.randint(5, 20)
-        self.start_time = time.time()
+        self.timer = timing.Timer()
         self.current_time = 0.0
         self.stopped = False
         self.score = 0
@@ -27,6 +29,8 @@ class Clock:
         self.timer_faded = False
         self.fade_alpha = 1.0
         self.done = False
+        self.batch = batch.Batch()
+        self.skip = redraw.Skip()
 
     def update(self):
         """
@@ -42,7 +46,7 @@ class Clock:
             None
         """
         if not self.stopped and not self.game_over:
-            self.current_time = time.time() - self.start_time
+            self.current_time = self.timer.elapsed()
             
             # Check if timer should start fading (after 1/3 of target time)
             fade_start_time = self.target_time / 3
@@ -75,7 +79,7 @@ class Clock:
         """
         Resets the game state to its initial values.
 
-        Randomly generates a new target time, resets the start time, current time, and other game state variables.
+        Randomly generates a new target time, restarts the timer, resets the current time, and other game state variables.
 
         Parameters:
             None
@@ -84,7 +88,7 @@ class Clock:
             None
         """
         self.target_time = random.randint(5, 20)  # New random target
-        self.start_time = time.time()
+        self.timer.restart()
         self.current_time = 0.0
         self.stopped = False
         self.game_over = False
@@ -97,6 +101,8 @@ class Clock:
         """
         Draws the game clock on the screen, including the current time, target time, 
         and result messages. The clock display changes depending on the game state.
+        The text goes through the batch, the faded timer is its only dithered call.
+        Nothing is drawn when the screen already shows the same texts.
 
         Parameters:
             None
@@ -104,27 +110,31 @@ class Clock:
         Returns:
             None
         """
+        time_str = f"{self.current_time:.2f}s"
+        state = (time_str, self.stopped, self.timer_faded, self.show_result, self.fade_timer > 60,
+                 self.target_time, self.score, pyxel.mouse_x, pyxel.mouse_y)
+        if not self.skip.needed(state):
+            return
         pyxel.cls(1)  # Dark blue background
+        batch = self.batch
         
         if not self.stopped:
             # Draw running clock (faded after 1/3 of target time)
-            time_str = f"{self.current_time:.2f}s"
             if self.timer_faded:
                 # Use dither to make text disappear gradually
-                pyxel.dither(0.3)  # Make text very faint
-                pyxel.text(100 - len(time_str)*2, 90, time_str, 7)
-                pyxel.dither(1.0)  # Reset dither
+                batch.dither(0.3)  # Make text very faint
+                batch.text(100 - len(time_str)*2, 90, time_str, 7)
+                batch.dither(1.0)  # Reset dither
             else:
                 # Normal timer
-                pyxel.text(100 - len(time_str)*2, 90, time_str, 7)  # White
+                batch.text(100 - len(time_str)*2, 90, time_str, 7)  # White
             
             # Instructions
-            pyxel.text(60, 50, "Press SPACE to stop!", 10)
+            batch.text(60, 50, "Press SPACE to stop!", 10)
             
         else:
             # Show stopped time
-            time_str = f"{self.current_time:.2f}s"
-            pyxel.text(100 - len(time_str)*2, 70, time_str, 7)
+            batch.text(100 - len(time_str)*2, 70, time_str, 7)
             
             # Show result
             if self.show_result:
@@ -142,23 +152,25 @@ class Clock:
                     result_text = "TRY AGAIN"
                     result_color = 8   # Red
                     
-                pyxel.text(100 - len(result_text)*2, 100, result_text, result_color)
-                pyxel.text(80, 120, f"Error: {error:.2f}s", 7)
+                batch.text(100 - len(result_text)*2, 100, result_text, result_color)
+                batch.text(80, 120, f"Error: {error:.2f}s", 7)
                 
                 # Show restart instruction after a delay
                 if self.fade_timer > 60:
-                    pyxel.text(70, 150, "Press R to restart", 6)
-                    pyxel.text(70, 158, "Press Q to go back", 6)
+                    batch.text(70, 150, "Press R to restart", 6)
+                    batch.text(70, 158, "Press Q to go back", 6)
         
         # Target hint (always visible)
-        pyxel.text(70, 30, f"Target: {self.target_time}s", 12)
+        batch.text(70, 30, f"Target: {self.target_time}s", 12)
         
         # Score
-        pyxel.text(10, 10, f"Score: {self.score}", 7)
+        batch.text(10, 10, f"Score: {self.score}", 7)
         
         # Instructions at bottom
         if not self.stopped:
             fade_time = self.target_time // 3
-            pyxel.text(10, 180, f"Timer fades at {fade_time}s!", 6)
+            batch.text(10, 180, f"Timer fades at {fade_time}s!", 6)
+
+        batch.flush(pyxel)
 
 #Clock()
\ No newline at end of file
@@ -1,6 +1,6 @@
 import pyxel
 import random  # <-- ADDED
-import time
+import timing
 
 class Coin:
     def __init__(self):
@@ -13,7 +13,8 @@ class Coin:
         """
         self.coins = [[random.randint(0, 600), random.randint(0, 400)] for _ in range(10)]
         self.score = 0
-        self.time_left = 30
+        self.timer = timing.Timer(30)
+        self.time_left = self.timer.remaining()
         self.player_x = pyxel.width//2
         self.player_y = pyxel.height//2 
         self.done = False
@@ -45,7 +46,7 @@ class Coin:
                 # Add new coin to keep total at 10
                 self.coins.append([random.randint(0, pyxel.width), random.randint(0, pyxel.height)])
 
-        self.time_left -= 60 / (pyxel.frame_count + 1)  # <-- ADDED pyxel.frame_count
+        self.time_left = self.timer.remaining()
         if self.time_left <= 0:
             print("Game Over! Score:", self.score)
             pyxel.quit()
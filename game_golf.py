@@ -1,11 +1,31 @@
 import pyxel
 from math import *
+import resources
+import collision
+import course
+import actions
+import layers
+
+# x-coordinate of each hole in image bank 1
+HOLES = [0, 16, 32, 48, 64]
+continuous = False  # Set by main.py --golf-continuous, whether new games sweep the ball against the walls
+golfBot = False  # Set by main.py --golf-bot, whether new games are played by the computer
+difficultyReport = False  # Set by main.py --golf-report, whether new games rate every hole from the tee
+golfsolver = bots = None  # Loaded by Golf.startSolver once a game needs the solver, they pull in NumPy
+MAX_BOUNCES = 8  # Wall contacts sweepBall follows in one frame
 
 class Golf:
 
-    def __init__(self):
+    def __init__(self, bot=None, report=None):
             """
             Initializes a new instance of the Golf class, setting initial values for ball position, velocity, game state, and loading the golf game resources.
+
+            The solver is only started for the bot and the difficulty report, or when a hint
+            is asked for, a plain game does not load it.
+
+            Parameters:
+                bot (bool): Whether a GolfBot plays instead of the keyboard, golfBot by default.
+                report (bool): Whether to rate every hole, difficultyReport by default.
             """
             self.bX = 20
             self.bY = 228
@@ -18,7 +38,29 @@ class Golf:
             self.power = 3
             self.rotation = 270
             self.holes = 0
-            pyxel.load("golf.pyxres")
+            self.continuous = continuous  # Sweep the ball against the walls instead of testing where it lands
+            self.solver = None
+            self.showReport = difficultyReport if report is None else report
+            self.reports = {}
+            self.reportSearch = None  # (hole, search) of the difficulty report being solved
+            self.aim = None  # (hole, x, y) of the ball autoAim was asked for
+            self.aimSearch = None
+            self.background = layers.Layer()
+            if bot is None:
+                bot = golfBot
+            self.bot = None
+            if bot or self.showReport:
+                self.startSolver()
+            if bot:
+                self.bot = bots.GolfBot(self.solver)
+            resources.use("golf.pyxres")
+
+    def startSolver(self):
+        # Loads the solver modules the first time a game needs them
+        global golfsolver, bots
+        if self.solver is None:
+            import golfsolver, bots
+            self.solver = golfsolver.Solver()
 
     def controls(self):
         """
@@ -32,22 +74,30 @@ class Golf:
             - Left arrow: Decreases the rotation
             - Right arrow: Increases the rotation
             - R: Resets the ball to its initial position
+            - H: Aims at the best shot found by the solver
+
+        With a bot, the aim and the shot come from it instead of the arrow keys and Space.
         """
         if pyxel.btnp(pyxel.KEY_A):
             self.done = True
 
-        if pyxel.btnp(pyxel.KEY_SPACE):
-            self.stopped = False
-            self.bvX = cos(radians(self.rotation)) * self.power
-            self.bvY = sin(radians(self.rotation)) * self.power
+        if self.bot is not None:
+            action = self.bot.act(self)
+        else:
+            action = actions.Action(left=pyxel.btn(pyxel.KEY_LEFT), right=pyxel.btn(pyxel.KEY_RIGHT),
+                                 up=pyxel.btnp(pyxel.KEY_UP), down=pyxel.btnp(pyxel.KEY_DOWN),
+                                 fire=pyxel.btnp(pyxel.KEY_SPACE))
+
+        if action.fire:
+            self.shoot()
 
-        elif pyxel.btnp(pyxel.KEY_UP) and self.power < 10:
+        elif action.up and self.power < 10:
             self.power += 1
-        elif pyxel.btnp(pyxel.KEY_DOWN) and self.power > 1:
+        elif action.down and self.power > 1:
             self.power -= 1
-        elif pyxel.btn(pyxel.KEY_LEFT):
+        elif action.left:
             self.rotation -= 1
-        elif pyxel.btn(pyxel.KEY_RIGHT):
+        elif action.right:
             self.rotation += 1
         elif pyxel.btnp(pyxel.KEY_R):
             self.bX = 20
@@ -55,6 +105,13 @@ class Golf:
             self.bvX = 0
             self.bvY = 0
             self.stopped = True
+        elif pyxel.btnp(pyxel.KEY_H):
+            self.autoAim()
+
+    def shoot(self):
+        self.stopped = False
+        self.bvX = cos(radians(self.rotation)) * self.power
+        self.bvY = sin(radians(self.rotation)) * self.power
 
     def residual(self):
         """
@@ -104,10 +161,7 @@ class Golf:
 
     def wouldCollide(self, x, y):
         """Check if position (x,y) would collide with walls"""
-        for px, py in self.collisionCircle(x+4, y+4):
-            if pyxel.pget(px, py) == 4:  # Wall color
-                return True
-        return False
+        return collision.touches(x+4, y+4, course.WALL, self.currentCourse().at)
 
     def checkCollision(self):
         """
@@ -120,25 +174,26 @@ class Golf:
             bool: True if a collision with a wall is detected, False otherwise.
         """
         circleCollision = self.collisionCircle((self.bX+4),(self.bY+4))
+        material = self.currentCourse().at
         oldX=self.bX-self.bvX
         oldY=self.bY-self.bvY
-        for i in circleCollision:
-            x,y=i[0],i[1]
-            if pyxel.pget(x,y) == 4:
+        for x, y in circleCollision:
+            cell = material(x, y)
+            if cell == course.WALL:
                 return True
-            elif pyxel.pget(x,y) == 8:
+            elif cell == course.HOLE:
                 self.holes += 1
                 self.stopped = True
                 self.playing = False
                 self.bX = 20
                 self.bY = 228
                 break
-            elif pyxel.pget(x, y) == 10:
+            elif cell == course.WATER:
                 self.stopNow()
                 self.bX = oldX
                 self.bY = oldY
             
-            elif pyxel.pget(x, y) == 15:
+            elif cell == course.SAND:
                 self.bvX *= 0.99
                 self.bvY *= 0.99
 
@@ -154,6 +209,7 @@ class Golf:
             pyxel.text(120, 30, "and the space bar to shoot.", 7)
             pyxel.text(120, 40, "Press R to reset the ball.", 7)
             pyxel.text(120, 50, "Press space to shoot.", 7)
+            pyxel.text(120, 60, "Press H for a hint.", 7)
         if self.holes == 1 or 2 or 3:
             pyxel.text(120, 10, "Nice!", 7)
         if self.holes == 4:
@@ -163,7 +219,7 @@ class Golf:
     def update(self):
         """
         Updates the game state by handling user input, moving the ball, checking for collisions, 
-        and updating the game flags accordingly.
+        and updating the game flags accordingly. The solver then thinks for the rest of its share.
 
         Parameters:
             None
@@ -176,6 +232,19 @@ class Golf:
         else:
             self.moveBall()
             self.residual()
+        self.checkBall()
+        self.think()
+
+    def checkBall(self):
+        """
+        Runs the checks update makes every frame, once the ball moved or the player aimed.
+
+        Parameters:
+            None
+
+        Returns:
+            None
+        """
         self.checkCollision()
         self.circle360()
         self.outOfBounds()
@@ -187,6 +256,7 @@ class Golf:
 
         This function applies a friction factor to the ball's velocity, calculates its new position, and checks for collisions with walls.
         If a collision is detected, it updates the ball's velocity and position accordingly.
+        In continuous mode the whole movement is swept against the walls, see sweepBall.
 
         Parameters:
             None
@@ -196,6 +266,9 @@ class Golf:
         """
         self.bvX *= 0.985
         self.bvY *= 0.985
+        if self.continuous:
+            self.sweepBall()
+            return
         
         new_x = self.bX + self.bvX
         new_y = self.bY + self.bvY
@@ -212,6 +285,43 @@ class Golf:
             self.bvY *= -0.6
             self.bY += 1 if self.bvY > 0 else -1
 
+    def sweepBall(self):
+        """
+        Moves the ball along its velocity and bounces it off the first wall on the way.
+
+        The ball stops exactly where it touches the wall, the part of the velocity going into
+        the wall is reflected with 60% of its speed, and what is left of the frame's movement
+        goes on in the new direction, so fast balls can not go through thin walls. A ball
+        wedged in a corner could bounce forever, after MAX_BOUNCES contacts it stays where
+        it is for the rest of the frame.
+
+        Parameters:
+            None
+
+        Returns:
+            None
+        """
+        grid = self.currentCourse()
+        remaining = 1.0  # Fraction of the frame still to move
+        for _ in range(MAX_BOUNCES):
+            moveX = self.bvX * remaining
+            moveY = self.bvY * remaining
+            hit = grid.sweep(self.bX+4, self.bY+4, moveX, moveY, collision.RADIUS)
+            if hit is None:
+                self.bX += moveX
+                self.bY += moveY
+                return
+            t, contactX, contactY, normalX, normalY = hit
+            # Stop at the contact, a hair away from the wall
+            self.bX += moveX * t + normalX * 0.01
+            self.bY += moveY * t + normalY * 0.01
+            # Reflect along the normal of the wall
+            speed = self.bvX * normalX + self.bvY * normalY
+            if speed < 0:
+                self.bvX -= 1.6 * speed * normalX
+                self.bvY -= 1.6 * speed * normalY
+            remaining *= 1 - t
+
     def inWall(self):
         """
         Moves the ball out of a wall if it is stopped and colliding with one.
@@ -228,22 +338,55 @@ class Golf:
             max_attempts = 10
             attempts = 0
             while attempts < max_attempts:
-                colliding = False
-                for x, y in self.collisionCircle((self.bX+4), (self.bY+4)):
-                    if pyxel.pget(x, y) == 4:
-                        colliding = True
-                        break
-                
-                if not colliding:
+                if not collision.touches((self.bX+4), (self.bY+4), course.WALL, self.currentCourse().at):
                     break
 
                 self.bX += cos(radians(self.rotation + 180)) * 2 
                 self.bY += sin(radians(self.rotation + 180)) * 2
                 attempts += 1
 
-    def checkHoles(self):
+    def currentCourse(self):
         """
-        Draws the current hole on the screen based on the number of holes completed.
+        Returns the material grid of the current hole.
+
+        The grid is baked from the same image checkHoles draws, so collisions no longer
+        depend on what is on screen.
+
+        Parameters:
+            None
+
+        Returns:
+            Course: The compiled course of the current hole.
+        """
+        if self.holes < len(HOLES):
+            return course.bake(1, HOLES[self.holes], 0, 16, 16, 7.5*16, 7.5*16, 16)
+        return course.EMPTY_COURSE
+
+    def shotSearch(self, x, y, cached=False):
+        """
+        Starts playing every (rotation, power) shot of the current hole from a ball position.
+
+        Parameters:
+            x (float): The x-coordinate of the ball.
+            y (float): The y-coordinate of the ball.
+            cached (bool): Whether to read the results from disk if golfsolver.py saved them, used for the tee.
+
+        Returns:
+            generator: The search of golfsolver.Solver.solving, solver.known has the results once it ends.
+        """
+        return self.solver.solving(self.currentCourse(), self.holeKey(), x, y, cached)
+
+    def holeKey(self):
+        return self.solver.holeKey(1, HOLES[self.holes], 0, 16, 16)
+
+    def autoAim(self):
+        """
+        Asks for the rotation and power of the shot that ends closest to the hole from where the ball is.
+
+        The solver plays every shot over the next frames, see think, and the aim is set when
+        it is done, unless the ball moved in the meantime. The solver plays the per axis
+        bounce Golf uses by default. With continuous on, its shots are not the ones the ball
+        really makes, and the hint can end far from where it says.
 
         Parameters:
             None
@@ -251,42 +394,90 @@ class Golf:
         Returns:
             None
         """
-        scale=16
+        if self.holes < len(HOLES):
+            self.startSolver()
+            self.aim = (self.holes, self.bX, self.bY)
+            self.aimSearch = None
 
-        if self.holes == 0:
-            pyxel.blt(7.5*scale,7.5*scale,(1),0,0,16,16, scale=scale)
-            if not self.playing:
-                self.bX = 20
-                self.bY = 228
-                self.playing = True
+    def think(self):
+        """
+        Moves the solver searches on within the share of the frame bots.budget gives.
 
-        elif self.holes == 1:
-            pyxel.blt(7.5*scale,7.5*scale,(1),16,0,16,16, scale=scale)
-            if not self.playing:
-                self.bX = 20
-                self.bY = 228
-                self.playing = True
+        The difficulty report of the tee comes first, once per hole and only when it is
+        shown, then the shot autoAim asked for. Each step plays one frame of every shot, so
+        a hole is solved over a few frames instead of stalling one for a few hundred
+        milliseconds. Without the report, the bot or a hint, there is nothing to do.
 
-        elif self.holes == 2:
-            pyxel.blt(7.5*scale,7.5*scale,(1),32,0,16,16, scale=scale)
-            if not self.playing:
-                self.bX = 20
-                self.bY = 228
-                self.playing = True
+        Parameters:
+            None
 
-        elif self.holes == 3:
-            pyxel.blt(7.5*scale,7.5*scale,(1),48,0,16,16, scale=scale)
-            if not self.playing:
-                self.bX = 20
-                self.bY = 228
-                self.playing = True
+        Returns:
+            None
+        """
+        if self.holes >= len(HOLES) or (self.aim is None and (not self.showReport or self.holes in self.reports)):
+            return
+        expired = bots.budget.allot()
+        if self.showReport and self.holes not in self.reports:
+            if self.reportSearch is None or self.reportSearch[0] != self.holes:
+                # On a fixed step budget a hit on disk would end the search sooner than in the recorded session
+                self.reportSearch = (self.holes, self.shotSearch(20, 228, cached=bots.budget.steps is None))
+            if not bots.advance(self.reportSearch[1], expired):
+                return
+            self.reports[self.holes] = self.solver.report(self.solver.known(self.holeKey(), 20, 228))
+            self.reportSearch = None
+        if self.aim is None:
+            return
+        if self.aim != (self.holes, self.bX, self.bY) or not self.stopped:
+            self.aim = self.aimSearch = None
+            return
+        if self.aimSearch is None:
+            self.aimSearch = self.shotSearch(self.bX, self.bY)
+        if bots.advance(self.aimSearch, expired):
+            self.rotation, self.power, _ = self.solver.best(self.solver.known(self.holeKey(), self.bX, self.bY))
+            self.aim = self.aimSearch = None
+
+    def difficulty(self):
+        """
+        Draws how hard the current hole is, from every shot the solver played from the tee.
+
+        Until think is done with the hole, only that it is being worked out is drawn.
+
+        Parameters:
+            None
+
+        Returns:
+            None
+        """
+        report = self.reports.get(self.holes)
+        if report is None:
+            pyxel.text(0, 32, "Difficulty: ...", 7)
+            return
+        pyxel.text(0, 32, f"Difficulty: {report['rating']}", 7)
+        pyxel.text(0, 40, f"Hole in one: {report['holed']}/{report['shots']} shots", 7)
+
+    def checkHoles(self):
+        """
+        Draws the current hole on the screen based on the number of holes completed,
+        with its difficulty report when it is shown.
+
+        Parameters:
+            None
+
+        Returns:
+            None
+        """
+        scale=16
 
-        elif self.holes == 4:
-            pyxel.blt(7.5*scale,7.5*scale,(1),64,0,16,16, scale=scale)
+        if self.holes < len(HOLES):
+            # The course is upscaled into the background layer once per hole, then copied
+            u = HOLES[self.holes]
+            self.background.draw(self.holes, lambda image: image.blt(7.5*scale,7.5*scale,(1),u,0,16,16, scale=scale))
             if not self.playing:
                 self.bX = 20
                 self.bY = 228
                 self.playing = True
+            if self.showReport:
+                self.difficulty()
 
     def arrow(self):
         """
@@ -381,8 +572,7 @@ class Golf:
         """
         Generates a circle of positions around a given point.
 
-        This function takes in x and y coordinates and returns a list of positions that form a circle around the point.
-        The circle is defined by a size parameter, which determines the radius of the circle.
+        The offsets are precomputed once in the collision module, so this is only a lookup.
 
         Parameters:
             x (int): The x-coordinate of the center of the circle.
@@ -391,14 +581,6 @@ class Golf:
         Returns:
             list: A list of positions that form a circle around the given point.
         """
-        size = 4
-        positions=[]
-        for direction in range(360):
-            changeX = cos(radians(direction)) * size
-            changeY = sin(radians(direction)) * size
-            end = [int(x + changeX), int(y + changeY)]
-            if end not in positions:
-                positions.append(end)
-        return positions
+        return collision.circle(x, y)
 
 #Golf()
\ No newline at end of file
@@ -1,22 +1,95 @@
 import random
 import pyxel
 import math
+import numpy as np
+import resources
+import batch
+import particles
+import pool
+import swarm
+
+HIT_RADIUS = 24  # Distance under which a shot hits an enemy
+BROAD_PHASE = 32  # Shots from which they only test the enemies Swarm.near finds, sorting the swarm costs about that many passes over it
+SMOKE = 256  # Smoke particles at most
+# The smoke by distance to the engine: limit, radius range, color, position jitter and dither range in tenths
+SMOKE_BANDS = [
+    (10, (1, 3), 7, 0, None),
+    (15, (4, 6), 8, 0, None),
+    (25, (7, 9), 9, 0, None),
+    (35, (3, 5), 10, 0, None),
+    (60, (2, 4), 13, 5, (5, 10)),
+    (65, (1, 2), 13, 2, (0, 5)),
+]
+SMOKE_VARIANTS = 16  # Pre-rolled random looks of every age, one is picked per frame
+SMOKE_SEED = 1
+BULLETS = 1024  # Enemy shots at most
+BULLET_SPEED = 2
+BULLET_LIFE = 200  # Frames, more than enough to cross the screen
+PLAYER_RADIUS = 6  # Distance under which an enemy shot hits the player
+# Draw layers, in the order the parts of the scene are painted
+STARS, ENEMIES, EXPLOSIONS, SHOTS, SMOKE_LAYER, SHIP = range(6)
+
+class Shot:
+    __slots__ = ("x", "y", "hit")
+
+class Star:
+    __slots__ = ("x", "y", "speed")
+
+def shotAlive(shot):
+    return shot.y > -10 and not shot.hit
+
+def starAlive(star):
+    return star.y < pyxel.height + 10
+
+def smokeTable(speed):
+    """
+    Returns how a smoke particle looks at every age, with the random parts rolled in advance.
+
+    A particle falls straight down from the engine at the smoke speed, so its age tells its
+    distance to the engine and the band it is drawn with. The radius, jitter and dither of
+    every band are rolled SMOKE_VARIANTS times from a generator of their own, the game's
+    random numbers are not used.
+
+    Parameters:
+        speed (float): How far the smoke falls every frame.
+
+    Returns:
+        list: For every age, SMOKE_VARIANTS (x offset, y offset, radius, color, dither) tuples.
+    """
+    rng = random.Random(SMOKE_SEED)
+    life = math.ceil(SMOKE_BANDS[-1][0] / speed)
+    table = []
+    for age in range(life):
+        distance = age * speed
+        _, (low, high), color, jitter, dither = next(band for band in SMOKE_BANDS if distance < band[0])
+        variants = []
+        for _ in range(SMOKE_VARIANTS):
+            alpha = rng.randint(*dither) / 10 if dither else 1.0
+            variants.append((rng.randint(-jitter, jitter), rng.randint(-jitter, jitter), rng.randint(low, high), color, alpha))
+        table.append(variants)
+    return table
 
 class Shooter:
-    def __init__(self):
+    def __init__(self, stress=0, waves=None):
         """
         Initializes a new instance of the Shooter class, loading the game resources, 
         setting up the game environment, and initializing the game state.
         
         Parameters:
-            None
+            stress (int): Stress mode, the number of enemies kept on screen (0 for the normal game).
+            waves (str or swarm.Schedule): The waves of enemies, a name from swarm.PRESETS (swarm.preset by default).
         
         Returns:
             None
         """
-        pyxel.load("shooter.pyxres")
+        resources.use("shooter.pyxres")
+        if waves is None:
+            waves = swarm.preset
+        if isinstance(waves, str):
+            waves = swarm.PRESETS[waves]
         self.terrain = Terrain()
-        self.enemies = Enemies()
+        self.enemies = Enemies(stress, waves)
+        self.batch = batch.Batch()
         self.player = Player(self.enemies)
         self.score = 0
         self.game_over = False
@@ -36,6 +109,7 @@ class Shooter:
         if not self.game_over:
             self.terrain.update()
             self.enemies.update()
+            self.enemies.fire(self.player.x + 8, self.player.y + 8)
             self.player.update()
         if pyxel.btnp(pyxel.KEY_A):
                     self.done = True
@@ -43,6 +117,7 @@ class Shooter:
     def draw(self):
         """
         Draws the game environment, including the terrain, enemies, and player.
+        They submit their calls to the batch, which draws them once they are all in.
         
         Parameters:
             None
@@ -52,9 +127,10 @@ class Shooter:
         """
         if not self.game_over:
             pyxel.cls(0)
-            self.terrain.draw()
-            self.enemies.draw()
-            self.player.draw()
+            self.terrain.draw(self.batch)
+            self.enemies.draw(self.batch)
+            self.player.draw(self.batch)
+            self.batch.flush(pyxel)
     
 class Player:
     def __init__(self, enemies):
@@ -72,9 +148,14 @@ class Player:
         self.y = pyxel.height*2//3
         self.bulletSpeed = 20
         self.smokeSpeed = 2
-        self.shots = []
-        self.particles = []
+        # A shot crosses the screen in about 10 frames and one is fired every 3 frames
+        self.shots = pool.Pool(Shot, 64)
+        self.shots.reserve(4)
+        self.particles = particles.ParticleSystem(SMOKE)
+        self.smokeTable = smokeTable(self.smokeSpeed)
+        self.smokeLife = len(self.smokeTable)
         self.enemies = enemies
+        self.hits = 0  # Enemy shots taken
 
     def shootNow(self):
         """
@@ -87,25 +168,31 @@ class Player:
             None
         """
         if pyxel.frame_count % 3 == 0:
-            self.shots.append([self.x, self.y, False])
+            shot = self.shots.acquire()
+            if shot is not None:
+                shot.x = self.x
+                shot.y = self.y
+                shot.hit = False
 
     def checkBulletCollision(self, bullet, enemie):
         """
-        Checks if a bullet has collided with an enemy.
+        Checks if a bullet has collided with enemies.
 
         Parameters:
             bullet (list): The bullet's position and status.
-            enemie (list): The enemy's position and status.
+            enemie (tuple): The x and y coordinates of the enemies, numbers or arrays.
 
         Returns:
-            bool: True if the bullet has collided with the enemy, False otherwise.
+            numpy.ndarray: True for every enemy the bullet has collided with.
         """
-        distance = math.sqrt((bullet[0] - enemie[0])**2 + (bullet[1] - enemie[1])**2)
-        return distance < 24
+        dx = bullet[0] - enemie[0]
+        dy = bullet[1] - enemie[1]
+        return dx * dx + dy * dy < HIT_RADIUS * HIT_RADIUS
 
     def updateBullets(self):
         """
         Updates the bullets shot by the player, checking for collisions with enemies and removing bullets that are off-screen or have collided with an enemy.
+        Removed bullets go back to the pool.
 
         Parameters:
             None
@@ -113,18 +200,58 @@ class Player:
         Returns:
             None
         """
-        for shot in self.shots:
-            shot[1] -= self.bulletSpeed
-            for i in self.enemies.enemies:
-                shot[2] = self.checkBulletCollision((shot[0],shot[1]),i)
-                if shot[2] == True: 
-                    # Check if enemy has 1 life left before reducing it
-                    if i[2] == 1:
-                        # Trigger death animation
-                        self.enemies.createExplosion(i[0], i[1])
-                    i[2] -= 1
-                    break
-        self.shots = [shot for shot in self.shots if shot[1] > -10 and shot[2] == False]
+        shots = self.shots
+        enemies = self.enemies.swarm
+        n = len(enemies)
+        xs, ys, hp = enemies.x[:n], enemies.y[:n], enemies.hp[:n]
+        for shot in shots:
+            shot.y -= self.bulletSpeed
+        if len(shots) < BROAD_PHASE:
+            # Few shots, each against every enemy at once
+            first = []
+            for shot in shots:
+                hits = np.flatnonzero(self.checkBulletCollision((shot.x,shot.y),(xs,ys)))
+                first.append(hits[0] if len(hits) else n)
+        else:
+            # Many shots, only against the enemies in a square around them, a pixel wider so the exact test decides
+            shotX = np.array([shot.x for shot in shots])
+            shotY = np.array([shot.y for shot in shots])
+            pairs, near = enemies.near(shotX, shotY, HIT_RADIUS + 1)
+            hit = self.checkBulletCollision((shotX[pairs],shotY[pairs]),(xs[near],ys[near]))
+            first = np.full(len(shots), n)
+            np.minimum.at(first, pairs[hit], near[hit])
+            first = first.tolist()
+        # The first enemy in spawn order a shot overlaps takes the hit, n means none
+        for shot, i in zip(shots, first):
+            shot.hit = i < n
+            if shot.hit:
+                # Check if enemy has 1 life left before reducing it
+                if hp[i] == 1:
+                    # Trigger death animation
+                    self.enemies.createExplosion(float(xs[i]), float(ys[i]))
+                hp[i] -= 1
+        self.shots.keep(shotAlive)
+
+    def checkHits(self):
+        """
+        Counts the enemy shots that reached the player and removes them.
+
+        Parameters:
+            None
+
+        Returns:
+            None
+        """
+        bullets = self.enemies.bullets
+        n = len(bullets)
+        if n == 0:
+            return
+        dx = bullets.x[:n] - (self.x + 8)
+        dy = bullets.y[:n] - (self.y + 8)
+        hit = dx * dx + dy * dy < PLAYER_RADIUS * PLAYER_RADIUS
+        if hit.any():
+            self.hits += int(np.count_nonzero(hit))
+            bullets.keep(~hit)
 
     def getDistance(self, object1, object2):
         """
@@ -141,48 +268,45 @@ class Player:
 
     def powerSmoke(self):
         """
-        Generates and updates the smoke particles effect for the player.
-        
-        The function appends new particles to the list at regular intervals, 
-        updates the position of existing particles, removes particles that are 
-        off-screen or have reached the end of their life cycle, and draws the 
-        particles on the screen with varying sizes and colors based on their 
-        distance from the player.
-        
+        Updates the smoke particles of the player's engine.
+
+        New particles are emitted at regular intervals and move down, the ones that left
+        the screen or outlived the smoke table are removed.
+
         Parameters:
             None
-        
+
         Returns:
             None
         """
+        smoke = self.particles
         if pyxel.frame_count % 2 == 0:
-            self.particles.append([self.x+8, self.y+14, False])
-
-        for particle in self.particles:
-            particle[1] += self.smokeSpeed
-
-        self.particles = [particle for particle in self.particles if particle[1] < pyxel.width+20 and particle[2] == False]
-
-        for particle in self.particles:
-            particleDistance = self.getDistance((particle[0], particle[1]), (self.x+8, self.y+14))
-            if  particleDistance < 10:
-                pyxel.circ(particle[0], particle[1], random.randint(1,3), 7)
-            elif particleDistance < 15:
-                pyxel.circ(particle[0], particle[1], random.randint(4, 6), 8)
-            elif particleDistance < 25:
-                pyxel.circ(particle[0], particle[1], random.randint(7, 9), 9)
-            elif particleDistance < 35:
-                pyxel.circ(particle[0], particle[1], random.randint(3, 5), 10)
-            elif particleDistance < 60:
-                pyxel.dither(random.randint(5, 10) / 10)
-                pyxel.circ(random.randint(particle[0]-5,particle[0]+5), random.randint(particle[1]-5,particle[1]+5), random.randint(2, 4), 13)
-                pyxel.dither(1)
-            elif particleDistance < 65:
-                pyxel.dither(random.randint(0, 5) / 10)
-                pyxel.circ(random.randint(particle[0]-2,particle[0]+2), random.randint(particle[1]-2,particle[1]+2), random.randint(1, 2), 13)
-                pyxel.dither(1)
-            else:
-                particle[2] = True
+            smoke.emit(self.x+8, self.y+14, vy=self.smokeSpeed, life=self.smokeLife)
+        smoke.step()
+        n = len(smoke)
+        smoke.keep((smoke.life[:n] > 0) & (smoke.y[:n] < pyxel.width+20))
+
+    def drawSmoke(self, batch):
+        """
+        Draws the smoke particles, looking up their size, color and dither by age in the smoke table.
+
+        Parameters:
+            batch (batch.Batch): The batch the circles are submitted to.
+
+        Returns:
+            None
+        """
+        smoke = self.particles
+        n = len(smoke)
+        table = self.smokeTable
+        variant = pyxel.frame_count % SMOKE_VARIANTS
+        ages = (self.smokeLife - smoke.life[:n]).tolist()
+        # Oldest first, the puffs next to the engine are drawn over the older ones
+        for age, x, y in sorted(zip(ages, smoke.x[:n].tolist(), smoke.y[:n].tolist()), reverse=True):
+            dx, dy, radius, color, dither = table[age][variant]
+            batch.dither(dither)
+            batch.circ(int(x)+dx, int(y)+dy, radius, color)
+        batch.dither(1.0)
 
     def update(self):
         """
@@ -195,6 +319,7 @@ class Player:
             None
         """
         self.updateBullets()
+        self.checkHits()
         if pyxel.btn(pyxel.KEY_UP):
             self.y -= 5
         if pyxel.btn(pyxel.KEY_DOWN):
@@ -205,44 +330,62 @@ class Player:
             self.x += 6
         if pyxel.btn(pyxel.KEY_SPACE):
             self.shootNow()
+        self.powerSmoke()
 
-    def draw(self):
+    def draw(self, batch):
         """
         Draws the player's shots and the player itself on the screen.
 
         Parameters:
-            None
+            batch (batch.Batch): The batch the calls are submitted to.
 
         Returns:
             None
         """
+        batch.setLayer(SHOTS)
         for shot in self.shots:
-            pyxel.blt(shot[0],shot[1],0,32,0,16,16,colkey=0, scale=2)
-        self.powerSmoke()
-        pyxel.blt(self.x, self.y, 0, 0, 0, 16, 16, 0, scale=2)
+            batch.blt(shot.x,shot.y,0,32,0,16,16,colkey=0, scale=2)
+        batch.setLayer(SMOKE_LAYER)
+        self.drawSmoke(batch)
+        batch.setLayer(SHIP)
+        batch.blt(self.x, self.y, 0, 0, 0, 16, 16, 0, scale=2)
+        if self.hits:
+            batch.text(0, 8, f"Hits taken:{self.hits}", 8)
 
 class Enemies:
-    def __init__(self):
+    def __init__(self, stress=0, waves=None):
         """
         Initializes a new instance of the Enemies class, setting up the initial state of the enemies and their properties.
 
+        The enemies live in the arrays of a swarm.Swarm and are moved all at once, the waves
+        of a swarm.Schedule decide when and where new ones appear.
+
         Parameters:
-            None
+            stress (int): The number of enemies kept on screen in stress mode, 0 to play normally.
+            waves (swarm.Schedule): The waves of enemies, the classic trickle by default.
 
         Returns:
             None
         """
-        self.enemies = []
+        if waves is None:
+            waves = swarm.PRESETS["classic"]
+        self.waves = waves
+        self.swarm = swarm.Swarm(waves.capacity + stress)
+        self.bullets = particles.ParticleSystem(BULLETS)
         self.enemieSpeed = 1
-        self.explosions = []
-        self.nbTargetOfEnemies = 20
+        self.explosions = particles.ParticleSystem(2048)
+        self.nbTargetOfEnemies = waves.target
+        self.stress = stress
+        # The sprite at twice its size, scaled once: a scaled blt costs several plain ones
+        self.sprite = pyxel.Image(32, 32)
+        self.sprite.blt(8, 8, 0, 16, 0, 16, 16, scale=2)
 
-    def enemiesLeftText(self):
+    def enemiesLeftText(self, batch):
         """
         Displays the number of enemies left to kill or a win message if all enemies have been defeated.
         
         Parameters:
-            None
+            batch (batch.Batch): The batch the text is submitted to.
         
         Returns:
             None
@@ -251,9 +394,9 @@ class Enemies:
         if self.nbTargetOfEnemies < 0:
             self.nbTargetOfEnemies = 0
         elif self.nbTargetOfEnemies == 0:
-            pyxel.text(((pyxel.width-len(winText)*4)/2),50,winText,7)
+            batch.text(((pyxel.width-len(winText)*4)/2),50,winText,7)
         else:
-            pyxel.text(0,0,f"Enemies left to kill:{self.nbTargetOfEnemies}",7)
+            batch.text(0,0,f"Enemies left to kill:{self.nbTargetOfEnemies}",7)
 
     def createExplosion(self, x, y):
         """
@@ -274,16 +417,15 @@ class Enemies:
             velocity_x = random.uniform(-3, 3)
             velocity_y = random.uniform(-3, 3)
             life = random.randint(20, 40)
-            max_life = life  # Store original life for fade calculation
             size = random.randint(2, 6)
             color = random.choice([8, 9, 10, 14])  # Red, orange, yellow colors
-            self.explosions.append([particle_x, particle_y, velocity_x, velocity_y, life, size, color, max_life])
+            self.explosions.emit(particle_x, particle_y, velocity_x, velocity_y, life, size, color)
 
     def updateExplosions(self):
         """
         Updates the state of all explosion particles in the game.
 
-        This function iterates through each explosion particle, updating its position based on its velocity, reducing its life, and decreasing its size over time.
+        This function moves every explosion particle by its velocity, reduces its life, and decreases its size over time, all at once on the particle arrays.
         It then removes any explosion particles that have reached the end of their life cycle.
 
         Parameters:
@@ -292,18 +434,16 @@ class Enemies:
         Returns:
             None
         """
-        for explosion in self.explosions:
-            # Update position
-            explosion[0] += explosion[2]  # x += velocity_x
-            explosion[1] += explosion[3]  # y += velocity_y
-            # Reduce life
-            explosion[4] -= 1
-            # Reduce size over time
-            if explosion[4] < 10:
-                explosion[5] = max(1, explosion[5] - 0.2)
+        explosions = self.explosions
+        # Update position and reduce life
+        explosions.step()
+        n = len(explosions)
+        # Reduce size over time
+        size = explosions.size[:n]
+        size[:] = np.where(explosions.life[:n] < 10, np.maximum(1, size - 0.2), size)
         
         # Remove dead explosion particles
-        self.explosions = [explosion for explosion in self.explosions if explosion[4] > 0]
+        explosions.keep(explosions.life[:n] > 0)
 
     def update(self):
         """
@@ -318,62 +458,124 @@ class Enemies:
         Returns:
             None
         """
-        if pyxel.frame_count % 60 == 0 and self.nbTargetOfEnemies > 0:
-            x = random.randint(60, pyxel.width-60)
-            self.enemies.append([x, -10, 10])        
+        enemies = self.swarm
+        if self.nbTargetOfEnemies > 0:
+            for enemie in self.waves.spawns(pyxel.frame_count):
+                enemies.spawn(*enemie)
+
+        # Stress mode, refill the screen with enemies
+        while len(enemies) < self.stress:
+            enemies.spawn(random.randint(0, pyxel.width-32), random.randint(-10, pyxel.height), 10, self.enemieSpeed)
 
-        for enemie in self.enemies:
-            enemie[1] += self.enemieSpeed
+        enemies.step()
 
         # Update explosions
         self.updateExplosions()
+        self.updateBullets()
 
         # Remove enemies that are off screen or have no life
-        self.enemies = [enemie for enemie in self.enemies if enemie[1] < pyxel.height+10 and enemie[2] > 0]
+        n = len(enemies)
+        enemies.keep((enemies.y[:n] < pyxel.height+10) & (enemies.hp[:n] > 0))
 
-    def draw(self):
+    def fire(self, x, y):
+        """
+        Makes the enemies on screen shoot at a point, each one about every waves.fire frames.
+
+        The enemies take turns by their place in the swarm, so a frame only fires a slice
+        of them and the shots come in a steady stream, all aimed and emitted at once.
+
+        Parameters:
+            x (float): The x-coordinate of the target.
+            y (float): The y-coordinate of the target.
+
+        Returns:
+            None
+        """
+        every = self.waves.fire
+        if not every:
+            return
+        enemies = self.swarm
+        n = len(enemies)
+        start = pyxel.frame_count % every
+        # From the center of the sprite
+        startX = enemies.x[start:n:every] + 8
+        startY = enemies.y[start:n:every] + 8
+        onScreen = (startX > 0) & (startX < pyxel.width) & (startY > 0) & (startY < pyxel.height)
+        startX, startY = startX[onScreen], startY[onScreen]
+        if len(startX) == 0:
+            return
+        dx = x - startX
+        dy = y - startY
+        length = np.maximum(np.hypot(dx, dy), 1)
+        self.bullets.emitMany(startX, startY, dx / length * BULLET_SPEED, dy / length * BULLET_SPEED, BULLET_LIFE, 2, 14)
+
+    def updateBullets(self):
+        """
+        Moves the enemy shots and removes the ones that left the screen or are too old.
+
+        Parameters:
+            None
+
+        Returns:
+            None
+        """
+        bullets = self.bullets
+        if len(bullets) == 0:
+            return
+        bullets.step()
+        n = len(bullets)
+        x, y = bullets.x[:n], bullets.y[:n]
+        bullets.keep((bullets.life[:n] > 0) & (x > -4) & (x < pyxel.width + 4) & (y > -4) & (y < pyxel.height + 4))
+
+    def draw(self, batch):
         """
         Draws the game elements, including enemies and explosions, on the screen.
         
-        This function iterates through the list of enemies and draws each one at its current position.
-        It also draws explosion particles with a fade effect, based on their remaining life.
+        This function draws the enemies whose sprite overlaps the screen, the others are culled, and the enemy shots.
+        It also draws explosion particles with a fade effect, based on their remaining life, on a layer above the enemies, one dither level per level of fade.
         
         Parameters:
-            None
+            batch (batch.Batch): The batch the calls are submitted to.
         
         Returns:
             None
         """
         # Draw enemies
-        for enemie in self.enemies:
-            pyxel.blt(enemie[0],enemie[1],0,16,0,16,16,colkey=0, scale=2)
-        
+        batch.setLayer(ENEMIES)
+        enemies = self.swarm
+        shown = enemies.visible(pyxel.width, pyxel.height, 32)
+        # Thousands of calls in bullet hell, the lookups are done once
+        blt = batch.blt
+        sprite = self.sprite
+        for x, y in zip((enemies.x[shown] - 8).tolist(), (enemies.y[shown] - 8).tolist()):
+            blt(x,y,sprite,0,0,32,32,colkey=0)
+
+        # Draw enemy shots
+        bullets = self.bullets
+        n = len(bullets)
+        circ = batch.circ
+        for x, y in zip(bullets.x[:n].tolist(), bullets.y[:n].tolist()):
+            circ(x, y, 2, 14)
+
         # Draw explosions with fade effect
-        for explosion in self.explosions:
-            # Calculate fade based on remaining life (0.0 to 1.0)
-            fade_factor = explosion[4] / explosion[7]  # current_life / max_life
-            
+        batch.setLayer(EXPLOSIONS)
+        explosions = self.explosions
+        n = len(explosions)
+        # Calculate fade based on remaining life (0.0 to 1.0)
+        fade_factor = explosions.life[:n] / explosions.max_life[:n]  # current_life / max_life
+        # Very high, high, medium transparency and full opacity
+        levels = np.digitize(fade_factor, [0.2, 0.4, 0.7], right=True)
+        for level, alpha in enumerate([0.2, 0.4, 0.7, 1.0]):
+            chosen = np.flatnonzero(levels == level)
+            if len(chosen) == 0:
+                continue
             # Use dither for transparency effect
-            if fade_factor > 0.7:
-                # Full opacity - no dither
-                pyxel.circ(explosion[0], explosion[1], explosion[5], explosion[6])
-            elif fade_factor > 0.4:
-                # Medium transparency
-                pyxel.dither(0.7)
-                pyxel.circ(explosion[0], explosion[1], explosion[5], explosion[6])
-                pyxel.dither(1.0)  # Reset dither
-            elif fade_factor > 0.2:
-                # High transparency
-                pyxel.dither(0.4)
-                pyxel.circ(explosion[0], explosion[1], explosion[5], explosion[6])
-                pyxel.dither(1.0)  # Reset dither
-            else:
-                # Very high transparency
-                pyxel.dither(0.2)
-                pyxel.circ(explosion[0], explosion[1], explosion[5], explosion[6])
-                pyxel.dither(1.0)  # Reset dither
+            batch.dither(alpha)
+            for x, y, size, color in zip(explosions.x[chosen].tolist(), explosions.y[chosen].tolist(), explosions.size[chosen].tolist(), explosions.color[chosen].tolist()):
+                batch.circ(x, y, size, color)
+        batch.dither(1.0)  # Reset dither
     
-        self.enemiesLeftText()
+        self.enemiesLeftText(batch)
 
 class Terrain:
     def __init__(self):
@@ -391,14 +593,16 @@ class Terrain:
         self.sea = False
         self.sky = False    
         self.space = True
-        self.stars = []
+        # A star lives 27 to 69 frames and one appears every 5 frames
+        self.stars = pool.Pool(Star, 32)
+        self.stars.reserve(14)
 
     def doStars(self):
         """
         Updates the state of the stars in the game.
 
         This function adds new stars to the game at regular intervals, updates the position of existing stars, 
-        and removes stars that are off the bottom of the screen.
+        and removes stars that are off the bottom of the screen, they go back to the pool.
 
         Parameters:
             None
@@ -408,20 +612,26 @@ class Terrain:
         """
         if pyxel.frame_count % 5 == 0:
             x = random.randint(0, pyxel.width)
-            self.stars.append([x, -10, random.randint(4,10)])
+            speed = random.randint(4,10)
+            star = self.stars.acquire()
+            if star is not None:
+                star.x = x
+                star.y = -10
+                star.speed = speed
 
         for star in self.stars:
-            star[1] += star[2]
+            star.y += star.speed
 
-        self.stars = [star for star in self.stars if star[1] < pyxel.height + 10]
+        self.stars.keep(starAlive)
 
     def update(self):
         self.doStars()
         
 
-    def draw(self):
+    def draw(self, batch):
+        batch.setLayer(STARS)
         if self.space:
             for star in self.stars:
-                pyxel.circ(star[0], star[1], random.randint(star[2]-5,star[2]-3), pyxel.COLOR_WHITE)
+                batch.circ(star.x, star.y, random.randint(star.speed-5,star.speed-3), pyxel.COLOR_WHITE)
 
 #Shooter()
\ No newline at end of file
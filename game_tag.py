@@ -1,32 +1,98 @@
 import pyxel
 from math import *
 import random
-import time
+import resources
+import actions
+import ballworld
+import collision
+import course
+import layers
+import timing
+
+tagPlayers = 2  # Set by main.py --tag-players, the number of balls of new games
+tagBots = 0  # Set by main.py --tag-bots, how many of them the computer plays
 
 class ball():
-    def __init__(self, n):
+    def __init__(self, n, world):
         """
         Initializes a ball object with the given player number.
+
+        The state of the ball lives in the arrays of the world, the object only reads and
+        writes its own entries.
         
         Parameters:
-            n (int): The player number (1 or 2) to determine the starting position.
+            n (int): The player number, players 1 and 2 are on the keyboard.
+            world (BallWorld): The world holding the state of every ball.
         
         Returns:
             None
         """
-        self.bX = 20 if n == 1 else 235 # Different starting positions
-        self.bY = 228
-        self.bvX = 0
-        self.bvY = 0
-        self.g = 0.1
-        self.jump = 2
-        self.upPressed = False
         self.player = n
-        self.tag = 0
+        self.index = n - 1
+        self.world = world
+        self.course = world.course
+        self.bot = None  # A TagBot playing the ball instead of the keyboard
+
+    @property
+    def bX(self):
+        return float(self.world.x[self.index])
+
+    @bX.setter
+    def bX(self, value):
+        self.world.x[self.index] = value
+
+    @property
+    def bY(self):
+        return float(self.world.y[self.index])
+
+    @bY.setter
+    def bY(self, value):
+        self.world.y[self.index] = value
+
+    @property
+    def bvX(self):
+        return float(self.world.vx[self.index])
+
+    @bvX.setter
+    def bvX(self, value):
+        self.world.vx[self.index] = value
+
+    @property
+    def bvY(self):
+        return float(self.world.vy[self.index])
+
+    @bvY.setter
+    def bvY(self, value):
+        self.world.vy[self.index] = value
+
+    @property
+    def jump(self):
+        return int(self.world.jump[self.index])
+
+    @jump.setter
+    def jump(self, value):
+        self.world.jump[self.index] = value
+
+    @property
+    def upPressed(self):
+        return bool(self.world.up[self.index])
+
+    @upPressed.setter
+    def upPressed(self, value):
+        self.world.up[self.index] = value
+
+    @property
+    def tag(self):
+        # Every ball knows which player is it
+        return self.world.tag
+
+    @tag.setter
+    def tag(self, value):
+        self.world.tag = value
 
     def controls(self):
         """
-        Handles the controls for a ball object based on the player number.
+        Handles the controls for a ball object based on the player number, or asks its bot.
         
         Parameters:
             None
@@ -34,18 +100,12 @@ class ball():
         Returns:
             None
         """
-        if self.player == 2:  # Arrow keys for player 1
-            if pyxel.btnp(pyxel.KEY_UP):
-                if self.jump > 0:
-                    self.bvY -= 2.5
-                    self.jump -= 1
-                self.upPressed = True
-            if pyxel.btn(pyxel.KEY_DOWN):
-                self.bvY += 1
-            if pyxel.btn(pyxel.KEY_LEFT):
-                self.bvX -= 0.12/1.18
-            if pyxel.btn(pyxel.KEY_RIGHT):
-                self.bvX += 0.12/1.18
+        if self.bot is not None:
+            self.press(self.bot.act(self))
+
+        elif self.player == 2:  # Arrow keys for player 1
+            self.press(actions.Action(up=pyxel.btnp(pyxel.KEY_UP), down=pyxel.btn(pyxel.KEY_DOWN),
+                                      left=pyxel.btn(pyxel.KEY_LEFT), right=pyxel.btn(pyxel.KEY_RIGHT)))
             if pyxel.btnp(pyxel.KEY_R):
                 self.bX = 20
                 self.bY = 228
@@ -53,202 +113,110 @@ class ball():
                 self.bvY = 0
         
         elif self.player == 1:  # ZQSD keys for player 2
-            if pyxel.btnp(pyxel.KEY_Z):  # Z = jump
-                if self.jump > 0:
-                    self.bvY -= 2.5
-                    self.jump -= 1
-                self.upPressed = True
-            if pyxel.btn(pyxel.KEY_S):  # S = down
-                self.bvY += 1
-            if pyxel.btn(pyxel.KEY_Q):  # Q = left
-                self.bvX -= 0.12/1.18
-            if pyxel.btn(pyxel.KEY_D):  # D = right
-                self.bvX += 0.12/1.18
+            # Z = jump, S = down, Q = left, D = right
+            self.press(actions.Action(up=pyxel.btnp(pyxel.KEY_Z), down=pyxel.btn(pyxel.KEY_S),
+                                      left=pyxel.btn(pyxel.KEY_Q), right=pyxel.btn(pyxel.KEY_D)))
             if pyxel.btnp(pyxel.KEY_T):  # T = reset for player 2
                 self.bX = 50
                 self.bY = 228
                 self.bvX = 0
                 self.bvY = 0
-            
-
-    def gravity(self):
-        if not self.upPressed:
-            self.bvY += self.g
 
-    def residual(self):
-        if abs(self.bvX) < 0.1:
-            self.bvX = 0
-
-        if abs(self.bvY) < 0.1:
-            self.bvY = 0
+    def press(self, action):
+        """
+        Applies the controls of one frame to the ball, up jumps while jumps are left.
 
-    def outOfBounds(self):
-        if self.bX < 0 or self.bX > 256 or self.bY < 0 or self.bY > 256:
-            self.bX = 20
-            self.bY = 228
-            self.bvX = 0
-            self.bvY = 0
+        Parameters:
+            action (Action): The controls held this frame.
 
-    def stopNow(self):
-        self.bvX = 0
-        self.bvY = 0
+        Returns:
+            None
+        """
+        if action.up:
+            if self.jump > 0:
+                self.bvY -= ballworld.JUMP
+                self.jump -= 1
+            self.upPressed = True
+        if action.down:
+            self.bvY += ballworld.DOWN
+        if action.left:
+            self.bvX -= ballworld.STEER
+        if action.right:
+            self.bvX += ballworld.STEER
 
     def wouldCollide(self, x, y):
         """Check if position (x,y) would collide with walls"""
-        for px, py in self.collisionCircle(x+4, y+4):
-            if pyxel.pget(px, py) == 4:
-                self.jump = 2
-                return True
-        return False
+        return self.world.wallAt(self.index, x, y)
 
     def checkCollision(self):
-        circleCollision = self.collisionCircle((self.bX+4),(self.bY+4))
-        for i in circleCollision:
-            x, y = i[0], i[1]
-            if pyxel.pget(x, y) == 4:
-                return True
-        return False
-
-    def moveBall(self):
-        self.bvX *= 0.985
-        self.bvY *= 0.985
-        
-        new_x = self.bX + self.bvX
-        new_y = self.bY + self.bvY
-        
-        if not self.wouldCollide(new_x, self.bY):
-            self.bX = new_x
-        else:
-            self.bvX *= -0.8
-        
-        if not self.wouldCollide(self.bX, new_y):
-            self.bY = new_y
-        else:
-            self.bvY *= -0.8
+        return collision.touches((self.bX+4), (self.bY+4), course.WALL, self.course.at)
 
     def collisionCircle(self, x, y):
-        size = 4
-        positions = []
-        for direction in range(360):
-            changeX = cos(radians(direction)) * size
-            changeY = sin(radians(direction)) * size
-            end = [int(x + changeX), int(y + changeY)]
-            if end not in positions:
-                positions.append(end)
-        return positions
-
-    def checkBallCollision(self, other_ball):
-        """Check collision with another ball"""
-        # Calculate distance between ball centers
-        dx = (self.bX + 4) - (other_ball.bX + 4)  # +4 to get center of 8x8 sprite
-        dy = (self.bY + 4) - (other_ball.bY + 4)
-        distance = sqrt(dx*dx + dy*dy)
-        
-        # If balls are overlapping (collision radius = 4 pixels each, so 8 total)
-        if distance < 8 and distance > 0:
-            # Calculate collision normal
-            nx = dx / distance
-            ny = dy / distance
-            
-            # Separate balls to prevent overlap
-            overlap = 8 - distance
-            separation = overlap / 2
-            
-            # Store original positions
-            orig_self_x, orig_self_y = self.bX, self.bY
-            orig_other_x, orig_other_y = other_ball.bX, other_ball.bY
-            
-            # Try to separate balls
-            new_self_x = self.bX + nx * separation
-            new_self_y = self.bY + ny * separation
-            new_other_x = other_ball.bX - nx * separation
-            new_other_y = other_ball.bY - ny * separation
-            
-            # Check if separation would cause wall collision
-            if not self.wouldCollide(new_self_x, new_self_y):
-                self.bX = new_self_x
-                self.bY = new_self_y
-            
-            if not other_ball.wouldCollide(new_other_x, new_other_y):
-                other_ball.bX = new_other_x
-                other_ball.bY = new_other_y
-            
-            # Calculate relative velocity
-            dvx = self.bvX - other_ball.bvX
-            dvy = self.bvY - other_ball.bvY
-            
-            # Calculate collision impulse
-            impulse = 2 * (dvx * nx + dvy * ny) / 2  # Assuming equal mass
-            
-            # Apply impulse (with some energy loss)
-            bounce_factor = 0.8
-            self.bvX -= impulse * nx * bounce_factor
-            self.bvY -= impulse * ny * bounce_factor
-            other_ball.bvX += impulse * nx * bounce_factor
-            other_ball.bvY += impulse * ny * bounce_factor
-            return True
-        return False
-
-    def update(self):
-        self.controls()
-        self.moveBall()
-        self.gravity()
-        self.residual()
-        self.checkCollision()
-        self.outOfBounds()
-        self.upPressed = False
+        return collision.circle(x, y)
 
     def draw(self):
-        if self.player == 1:
-            if self.tag != 1:
-                pyxel.blt(self.bX, self.bY, 0, 0, 0, 8, 8, colkey=0)
-            else:
-                pyxel.blt(self.bX, self.bY, 0, 0, 8, 8, 8, colkey=0)
-        elif self.player ==2:
-            if self.tag != 2:
-                pyxel.blt(self.bX, self.bY, 0, 8, 0, 8, 8, colkey=0)
-            else:
-                pyxel.blt(self.bX, self.bY, 0, 8, 8, 8, 8, colkey=0)
+        # Odd players use the first sprite column, even ones the second, the row below when it
+        u = 0 if self.player % 2 else 8
+        v = 8 if self.tag == self.player else 0
+        pyxel.blt(self.bX, self.bY, 0, u, v, 8, 8, colkey=0)
 
 class terrain():
     def __init__(self):
-        pass  # Initialize terrain data here if needed
+        # Material grid baked from the same image checkHoles draws
+        self.course = course.bake(1, 0, 0, 32, 32, 14*8, 14*8, 8)
+        self.background = layers.Layer()
 
     def checkHoles(self):
         scale = 8
-        pyxel.blt(14*scale, 14*scale, 1, 0, 0, 32, 32, scale=scale)
+        # Upscaled once into the background layer, then copied every frame
+        self.background.draw(0, lambda image: image.blt(14*scale, 14*scale, 1, 0, 0, 32, 32, scale=scale))
 
 class Tag:
-    def __init__(self):
+    def __init__(self, players=None, computers=None):
         """
         Initializes a new instance of the Tag class.
         
         Loads the necessary resources from the "tag.pyxres" file and sets up the 
-        initial state of the game, including the creation of two ball objects and 
+        initial state of the game, including the creation of the ball objects and 
         a terrain object. It also initializes various game state variables, such 
         as the game over status, timer, and start time.
         
         Parameters:
-            None
+            players (int): The number of balls, tagPlayers by default.
+            computers (int): How many of them bots play, the last ones, tagBots by default.
+                Balls after the first two without a bot stand still.
         
         Returns:
             None
         """
-        pyxel.load("tag.pyxres")  # Make sure this file exists
+        resources.use("tag.pyxres")  # Make sure this file exists
         
         # Create instances as class attributes
         self.tag = random.randint(1,2)
-        self.ball1 = ball(1)
-        self.ball2 = ball(2)
-        self.tag = random.randint(1,2)
-        self.ball1.tag = self.tag
-        self.ball2.tag= self.tag
         self.terrain = terrain()
+        if players is None:
+            players = tagPlayers
+        if computers is None:
+            computers = tagBots
+        # The two keyboard players start in the corners, the others on a line in the open top rows
+        positions = [(20, 228), (235, 228)]
+        for k in range(players - 2):
+            positions.append((16 + (k % 14) * 16, 24 + (k // 14) * 16))
+        self.world = ballworld.BallWorld(self.terrain.course, positions)
+        self.balls = [ball(n, self.world) for n in range(1, players + 1)]
+        if computers:
+            import bots  # Only loaded when the computer plays
+            for b in self.balls[players - computers:]:
+                b.bot = bots.TagBot()
+        self.ball1 = self.balls[0]
+        self.ball2 = self.balls[1]
+        self.tag = random.randint(1,players)
+        self.world.tag = self.tag
         self.gameOver = False
         self.timerIs = 0
         self.done = False
         
-        self.startTime = time.monotonic()*100
+        self.roundTimer = timing.Timer()
 
     def timer(self):
         """
@@ -263,9 +231,7 @@ class Tag:
         Returns:
             None
         """
-        self.currentTime = time.monotonic()*100
-        
-        self.timerIs = (int(self.currentTime) - int(self.startTime))/100
+        self.timerIs = int(self.roundTimer.elapsed()*100)/100
         if self.timerIs > 0:
             self.remainingTime = 50 - self.timerIs
         else:
@@ -297,37 +263,22 @@ class Tag:
         if pyxel.btnp(pyxel.KEY_A):
             self.done = True
         
-        self.ball1.update()
-        self.ball2.update()
+        for b in self.balls:
+            b.controls()
+        self.world.step()
         
-        # Check ball-to-ball collision
+        # Check ball-to-ball collisions, the tag passes on a contact with the ball that is it
         if not self.gameOver:
-            if self.ball1.checkBallCollision(self.ball2):
-                if self.ball1.tag <2:
-                    self.ball1.tag+=1
-                    self.ball2.tag+=1
-                else:
-                    self.ball1.tag=1
-                    self.ball2.tag=1
+            self.world.collide()
         
         # Re-check wall collisions after ball collision (to prevent pushing through walls)
-        if self.ball1.wouldCollide(self.ball1.bX, self.ball1.bY):
-            self.ball1.bX -= self.ball1.bvX * 0.1  # Small step back
-            self.ball1.bY -= self.ball1.bvY * 0.1
-            self.ball1.bvX *= -0.5  # Reduce velocity
-            self.ball1.bvY *= -0.5
-            
-        if self.ball2.wouldCollide(self.ball2.bX, self.ball2.bY):
-            self.ball2.bX -= self.ball2.bvX * 0.1  # Small step back
-            self.ball2.bY -= self.ball2.bvY * 0.1
-            self.ball2.bvX *= -0.5  # Reduce velocity
-            self.ball2.bvY *= -0.5
+        self.world.pushBack()
 
     def draw(self):
         pyxel.cls(0)
         self.terrain.checkHoles()
-        self.ball1.draw()
-        self.ball2.draw()
+        for b in self.balls:
+            b.draw()
         #self.debug()
         self.timer()
         self.isGameOver()
@@ -1,6 +1,7 @@
 import pyxel
-import time
 import random
+import redraw
+import timing
 
 class Wam:
     def __init__(self):
@@ -26,8 +27,10 @@ class Wam:
             {"x": 160, "y": 100, "visible": 0, "points": 1},
         ]
         self.score = 0
-        self.time_left = 60  # 60 seconds
+        self.timer = timing.Timer(60)  # 60 seconds
+        self.time_left = self.timer.remaining()
         self.done = False
+        self.skip = redraw.Skip()
 
     def update(self):
         """
@@ -63,7 +66,7 @@ class Wam:
                         mole["visible"] = 0  # Hide immediately
 
         # Update timer
-        self.time_left -= 60 / (pyxel.frame_count + 1)
+        self.time_left = self.timer.remaining()
         if self.time_left <= 0:
             print(f"Game Over! Final Score: {self.score}")
 
@@ -74,12 +77,18 @@ class Wam:
         """
         Draws the current state of the game, including holes, visible moles, and the user interface.
 
+        Nothing is drawn when the same moles, score and time are on the screen already.
+
         Parameters:
             None
 
         Returns:
             None
         """
+        state = (tuple(mole["visible"] > 0 for mole in self.moles), self.score, int(self.time_left),
+                 pyxel.mouse_x, pyxel.mouse_y)
+        if not self.skip.needed(state):
+            return
         pyxel.cls(0)
         
         # Draw holes (brown circles)
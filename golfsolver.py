@@ -0,0 +1,399 @@
+import hashlib
+import os
+from math import *
+import numpy as np
+import pyxel
+import course
+import resources
+
+VERSION = 2  # Bump when the simulated physics change, old cache files are then ignored
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".golf_cache")
+ROTATIONS = np.arange(360)
+POWERS = np.arange(1, 11)
+MAX_FRAMES = 1200
+
+# Outcome of a shot
+REST = 0
+HOLED = 1
+WATER = 2
+OUT = 3
+
+class Simulation:
+    def __init__(self, grid, startX, startY, rotations=ROTATIONS, powers=POWERS, masks=None):
+        """
+        Initializes a new instance of the Simulation class.
+
+        Plays every (rotation, power) shot of a hole at once with NumPy arrays, one frame per
+        call to step, so the work can be spread over several frames of the game.
+
+        This is the physics of Golf with continuous off: friction 0.985, per axis bounce of
+        -0.6, sand drag, water putting the ball back and the hole ending the shot.
+
+        Parameters:
+            grid (Course): The compiled course of the hole.
+            startX (float): The x-coordinate of the ball (Golf.bX).
+            startY (float): The y-coordinate of the ball (Golf.bY).
+            rotations (numpy.ndarray): The rotations to try, in degrees.
+            powers (numpy.ndarray): The powers to try.
+            masks (Masks): The collision masks of the hole, the ones of the course when not given.
+
+        Returns:
+            None
+        """
+        self.masks = grid.masks() if masks is None else masks
+        self.rotations = rotations
+        self.powers = powers
+        # Same math calls as Golf.controls, so every shot starts with the very same velocity
+        self.vx = np.array([cos(radians(rotation)) * power for rotation in rotations.tolist() for power in powers.tolist()])
+        self.vy = np.array([sin(radians(rotation)) * power for rotation in rotations.tolist() for power in powers.tolist()])
+        count = len(self.vx)
+        self.x = np.full(count, float(startX))
+        self.y = np.full(count, float(startY))
+        self.outcome = np.full(count, REST, dtype=np.uint8)
+        self.frames = np.zeros(count, dtype=np.int16)
+        self.moving = np.ones(count, dtype=bool)
+        self.frame = 0
+
+    def step(self):
+        """
+        Plays one frame of every shot still moving.
+
+        Parameters:
+            None
+
+        Returns:
+            bool: False once every shot has ended, nothing is played then.
+        """
+        if self.frame >= MAX_FRAMES:
+            return False
+        index = np.flatnonzero(self.moving)
+        if len(index) == 0:
+            return False
+        masks = self.masks
+        bx, by, bvx, bvy = self.x[index], self.y[index], self.vx[index], self.vy[index]
+        # moveBall
+        bvx *= 0.985
+        bvy *= 0.985
+        newX = bx + bvx
+        hit = masks.wall[masks.lookup(newX + 4, by + 4)]
+        bvx = np.where(hit, bvx * -0.6, bvx)
+        bx = np.where(hit, bx + np.where(bvx > 0, 1, -1), newX)
+        newY = by + bvy
+        hit = masks.wall[masks.lookup(bx + 4, newY + 4)]
+        bvy = np.where(hit, bvy * -0.6, bvy)
+        by = np.where(hit, by + np.where(bvy > 0, 1, -1), newY)
+        # residual
+        stopped = (np.abs(bvx) < 0.1) & (np.abs(bvy) < 0.1)
+        bvx = np.where(stopped, 0.0, bvx)
+        bvy = np.where(stopped, 0.0, bvy)
+        # checkCollision
+        where = masks.lookup(bx + 4, by + 4)
+        holed = masks.hole[where]
+        water = masks.water[where] & ~holed
+        bx = np.where(water, bx - bvx, bx)
+        by = np.where(water, by - bvy, by)
+        sand = masks.sand[where]
+        for pixel in range(int(sand.max())):
+            # One 0.99 drag per sand pixel, multiplied one at a time like the game does
+            bvx = np.where(sand > pixel, bvx * 0.99, bvx)
+            bvy = np.where(sand > pixel, bvy * 0.99, bvy)
+        # outOfBounds
+        out = (bx < 0) | (bx > 256) | (by < 0) | (by > 256)
+
+        self.x[index], self.y[index], self.vx[index], self.vy[index] = bx, by, bvx, bvy
+        self.frame += 1
+        self.frames[index] = self.frame
+        finished = stopped | holed | water | out
+        self.outcome[index] = np.select([holed, water, out], [HOLED, WATER, OUT], REST)
+        self.moving[index[finished]] = False
+        return True
+
+    def result(self):
+        """
+        Returns where every shot ended.
+
+        Parameters:
+            None
+
+        Returns:
+            dict: Arrays of shape (rotations, powers): outcome, frames, x and y where the ball ended.
+        """
+        shape = (len(self.rotations), len(self.powers))
+        return {
+            "outcome": self.outcome.reshape(shape),
+            "frames": self.frames.reshape(shape),
+            "x": self.x.reshape(shape),
+            "y": self.y.reshape(shape),
+        }
+
+def simulate(grid, startX, startY, rotations=ROTATIONS, powers=POWERS, masks=None):
+    """
+    Plays every (rotation, power) shot of a hole to the end, see Simulation.
+
+    Parameters:
+        grid (Course): The compiled course of the hole.
+        startX (float): The x-coordinate of the ball (Golf.bX).
+        startY (float): The y-coordinate of the ball (Golf.bY).
+        rotations (numpy.ndarray): The rotations to try, in degrees.
+        powers (numpy.ndarray): The powers to try.
+        masks (Masks): The collision masks of the hole, the ones of the course when not given.
+
+    Returns:
+        dict: Arrays of shape (rotations, powers): outcome, frames, x and y where the ball ended.
+    """
+    simulation = Simulation(grid, startX, startY, rotations, powers, masks)
+    while simulation.step():
+        pass
+    return simulation.result()
+
+def remaining(grid, result):
+    """
+    Returns the distance left to the hole after every shot of a result.
+
+    Parameters:
+        grid (Course): The compiled course of the hole.
+        result (dict): The arrays returned by simulate.
+
+    Returns:
+        numpy.ndarray: The distances, 0 for the shots in the hole, infinite for the lost ones.
+    """
+    target = holeCenter(grid)
+    if target is None:
+        left = np.full(result["x"].shape, np.inf)
+    else:
+        left = np.hypot(result["x"] + 4 - target[0], result["y"] + 4 - target[1])
+    # Shots in the hole are done, shots in the water or out are the worst
+    left[result["outcome"] == HOLED] = 0
+    left[(result["outcome"] == WATER) | (result["outcome"] == OUT)] = np.inf
+    return left
+
+def holeCenter(grid):
+    """
+    Returns the screen position of the middle of the hole cells of a course.
+
+    Parameters:
+        grid (Course): The compiled course.
+
+    Returns:
+        tuple: The x and y coordinates, or None if the course has no hole.
+    """
+    cells = np.frombuffer(bytes(grid.cells), dtype=np.uint8).reshape(grid.height, grid.width)
+    rows, columns = np.nonzero(cells == course.HOLE)
+    if len(rows) == 0:
+        return None
+    return (grid.left + (columns.mean() + 0.5) * grid.scale, grid.top + (rows.mean() + 0.5) * grid.scale)
+
+def imageHash(img, u, v, w, h):
+    """
+    Hashes the pixels of a hole image, so cached results follow the course art.
+
+    Parameters:
+        img (int): The image bank holding the hole.
+        u (int): The x-coordinate of the hole in the image bank.
+        v (int): The y-coordinate of the hole in the image bank.
+        w (int): The width of the hole image.
+        h (int): The height of the hole image.
+
+    Returns:
+        str: The hex digest.
+    """
+    bank = pyxel.images[img]
+    pixels = bytes(bank.pget(u + column, v + row) for row in range(h) for column in range(w))
+    return hashlib.sha1(pixels).hexdigest()
+
+class Solver:
+    def __init__(self, cacheDir=CACHE_DIR):
+        """
+        Initializes a new instance of the Solver class.
+
+        The solver plays every shot of a hole with Simulation and keeps the results in memory.
+        The ones from the tee can be saved on disk under the hash of the hole image by running
+        this module, the game only reads them, so it never writes files from its frames.
+
+        Parameters:
+            cacheDir (str): The directory of the cache files, None to keep everything in memory.
+
+        Returns:
+            None
+        """
+        self.cacheDir = cacheDir
+        self.results = {}
+        self.hashes = {}
+
+    def holeKey(self, img, u, v, w, h):
+        """
+        Returns the hash of a hole image, computed once per image.
+
+        Parameters:
+            img (int): The image bank holding the hole.
+            u (int): The x-coordinate of the hole in the image bank.
+            v (int): The y-coordinate of the hole in the image bank.
+            w (int): The width of the hole image.
+            h (int): The height of the hole image.
+
+        Returns:
+            str: The hex digest.
+        """
+        key = (resources.current(), img, u, v, w, h)
+        if key not in self.hashes:
+            self.hashes[key] = imageHash(img, u, v, w, h)
+        return self.hashes[key]
+
+    def name(self, key, startX, startY):
+        return f"{key}-{VERSION}-{startX!r}-{startY!r}"
+
+    def known(self, key, startX, startY):
+        """
+        Returns the results solve already has in memory for a ball position.
+
+        Parameters:
+            key (str): The hash of the hole image.
+            startX (float): The x-coordinate of the ball (Golf.bX).
+            startY (float): The y-coordinate of the ball (Golf.bY).
+
+        Returns:
+            dict: The results, or None if this position was not solved yet.
+        """
+        return self.results.get(self.name(key, startX, startY))
+
+    def path(self, key, startX, startY):
+        return os.path.join(self.cacheDir, self.name(key, startX, startY) + ".npz")
+
+    def solving(self, grid, key, startX, startY, cached=False):
+        """
+        Plays every shot from a ball position like solve, one step at a time.
+
+        A whole hole takes a few hundred milliseconds, iterating lets the game spread it
+        over its frames. Results in memory or on disk end the search right away.
+
+        Parameters:
+            grid (Course): The compiled course of the hole.
+            key (str): The hash of the hole image.
+            startX (float): The x-coordinate of the ball (Golf.bX).
+            startY (float): The y-coordinate of the ball (Golf.bY).
+            cached (bool): Whether to read the result from disk when it was saved there.
+
+        Returns:
+            generator: Yields after every step of the masks and of the simulation, known
+            returns the results once it is done.
+        """
+        name = self.name(key, startX, startY)
+        if name in self.results:
+            return
+        path = self.path(key, startX, startY) if cached and self.cacheDir else None
+        if path and os.path.exists(path):
+            with np.load(path) as data:
+                result = {field: data[field] for field in data.files}
+        else:
+            masks = grid.masks(lazy=True)
+            yield from masks.building()
+            simulation = Simulation(grid, startX, startY, masks=masks)
+            while simulation.step():
+                yield
+            result = simulation.result()
+            result["left"] = remaining(grid, result)
+        self.results[name] = result
+
+    def save(self, key, startX, startY):
+        """
+        Writes the results of a ball position to the cache directory.
+
+        Parameters:
+            key (str): The hash of the hole image.
+            startX (float): The x-coordinate of the ball (Golf.bX).
+            startY (float): The y-coordinate of the ball (Golf.bY).
+
+        Returns:
+            str: The path of the file written.
+        """
+        path = self.path(key, startX, startY)
+        os.makedirs(self.cacheDir, exist_ok=True)
+        np.savez_compressed(path, **self.known(key, startX, startY))
+        return path
+
+    def solve(self, grid, key, startX, startY, persist=False):
+        """
+        Returns the results of every shot from a ball position, played all at once.
+
+        Parameters:
+            grid (Course): The compiled course of the hole.
+            key (str): The hash of the hole image.
+            startX (float): The x-coordinate of the ball (Golf.bX).
+            startY (float): The y-coordinate of the ball (Golf.bY).
+            persist (bool): Whether to read the result from disk, and write it there when it was not.
+
+        Returns:
+            dict: The arrays returned by simulate, plus the distance left to the hole.
+        """
+        name = self.name(key, startX, startY)
+        found = name in self.results or (persist and self.cacheDir and os.path.exists(self.path(key, startX, startY)))
+        for _ in self.solving(grid, key, startX, startY, persist):
+            pass
+        if persist and self.cacheDir and not found:
+            self.save(key, startX, startY)
+        return self.known(key, startX, startY)
+
+    def best(self, result, rotations=ROTATIONS, powers=POWERS):
+        """
+        Returns the shot that ends closest to the hole, the weakest one on a tie.
+
+        Parameters:
+            result (dict): The results returned by solve.
+            rotations (numpy.ndarray): The rotations the results were played with.
+            powers (numpy.ndarray): The powers the results were played with.
+
+        Returns:
+            tuple: The rotation, the power and the distance left to the hole.
+        """
+        left = result["left"]
+        rows, columns = np.nonzero(left == left.min())
+        # Softest shot first, then the smallest rotation
+        column, row = min(zip(columns.tolist(), rows.tolist()))
+        return int(rotations[row]), int(powers[column]), float(left[row, column])
+
+    def report(self, result):
+        """
+        Sums up how hard a hole is from the results of every shot.
+
+        Parameters:
+            result (dict): The results returned by solve.
+
+        Returns:
+            dict: The share of shots holed, in the water and out of bounds, and a rating.
+        """
+        outcome = result["outcome"]
+        total = outcome.size
+        holed = int(np.count_nonzero(outcome == HOLED))
+        share = holed / total
+        if share >= 0.05:
+            rating = "easy"
+        elif share >= 0.01:
+            rating = "medium"
+        elif holed:
+            rating = "hard"
+        else:
+            rating = "no hole in one"
+        return {
+            "holed": holed,
+            "water": int(np.count_nonzero(outcome == WATER)),
+            "out": int(np.count_nonzero(outcome == OUT)),
+            "shots": total,
+            "rating": rating,
+        }
+
+if __name__ == "__main__":
+    import argparse
+    import headless
+    parser = argparse.ArgumentParser(description="Solve the tee of every golf hole and save it for the difficulty report.")
+    parser.add_argument("--cache-dir", default=CACHE_DIR, help="directory of the cache files")
+    args = parser.parse_args()
+    headless.install()
+    import game_golf
+    # Through the game, so the solver is the golfsolver module it imports and not this script
+    golf = game_golf.Golf(bot=False, report=False)
+    golf.startSolver()
+    golf.solver.cacheDir = args.cache_dir
+    for hole in range(len(game_golf.HOLES)):
+        golf.holes = hole
+        result = golf.solver.solve(golf.currentCourse(), golf.holeKey(), 20, 228, persist=True)
+        print(f"hole {hole + 1}: {golf.solver.report(result)['rating']}")
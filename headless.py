@@ -0,0 +1,551 @@
+import os
+import sys
+import math
+import functools
+import string
+import tomllib
+import zipfile
+import numpy as np
+import timing
+import binding
+
+# pyxel's built-in 4x6 font, characters 32 to 127, one nibble per row
+FONT_DATA = [
+    0x000000, 0x444040, 0xaa0000, 0xaeaea0, 0x6c6c40, 0x824820, 0x4a4ac0, 0x440000,
+    0x244420, 0x844480, 0xa4e4a0, 0x04e400, 0x000480, 0x00e000, 0x000040, 0x224880,
+    0x6aaac0, 0x4c4440, 0xc248e0, 0xc242c0, 0xaae220, 0xe8c2c0, 0x68eae0, 0xe24880,
+    0xeaeae0, 0xeae2c0, 0x040400, 0x040480, 0x248420, 0x0e0e00, 0x842480, 0xe24040,
+    0x4aa860, 0x4aeaa0, 0xcacac0, 0x688860, 0xcaaac0, 0xe8e8e0, 0xe8e880, 0x68ea60,
+    0xaaeaa0, 0xe444e0, 0x222a40, 0xaacaa0, 0x8888e0, 0xaeeaa0, 0xcaaaa0, 0x4aaa40,
+    0xcac880, 0x4aae60, 0xcaeca0, 0x6842c0, 0xe44440, 0xaaaa60, 0xaaaa40, 0xaaeea0,
+    0xaa4aa0, 0xaa4440, 0xe248e0, 0x644460, 0x884220, 0xc444c0, 0x4a0000, 0x0000e0,
+    0x840000, 0x06aa60, 0x8caac0, 0x068860, 0x26aa60, 0x06ac60, 0x24e440, 0x06ae24,
+    0x8caaa0, 0x404440, 0x2022a4, 0x8acca0, 0xc444e0, 0x0eeea0, 0x0caaa0, 0x04aa40,
+    0x0caac8, 0x06aa62, 0x068880, 0x06c6c0, 0x4e4460, 0x0aaa60, 0x0aaa40, 0x0aaee0,
+    0x0a44a0, 0x0aa624, 0x0e24e0, 0x64c460, 0x444440, 0xc464c0, 0x6c0000, 0xeeeee0,
+]
+FONT_WIDTH = 4
+FONT_HEIGHT = 6
+
+def buildGlyphs():
+    """
+    Turns the font data into one boolean mask per character.
+
+    Parameters:
+        None
+
+    Returns:
+        list: A list of 6x4 NumPy boolean arrays, indexed by character code minus 32.
+    """
+    glyphs = []
+    for data in FONT_DATA:
+        glyph = np.zeros((FONT_HEIGHT, FONT_WIDTH), dtype=bool)
+        for row in range(FONT_HEIGHT):
+            bits = (data >> (20 - row * 4)) & 0xf
+            for column in range(FONT_WIDTH):
+                glyph[row, column] = bool(bits & (0x8 >> column))
+        glyphs.append(glyph)
+    return glyphs
+
+GLYPHS = buildGlyphs()
+
+@functools.lru_cache(maxsize=1024)
+def textMask(s):
+    """
+    Renders a string with the built-in font into a boolean mask.
+
+    Parameters:
+        s (str): The text, newlines start a new line.
+
+    Returns:
+        ndarray: A boolean array with the pixels of the text set.
+    """
+    lines = s.split("\n")
+    width = max(len(line) for line in lines)
+    mask = np.zeros((FONT_HEIGHT * len(lines), FONT_WIDTH * max(width, 1)), dtype=bool)
+    for row, line in enumerate(lines):
+        for column, char in enumerate(line):
+            code = ord(char) - 32
+            if 0 <= code < len(GLYPHS):
+                mask[row * FONT_HEIGHT:(row + 1) * FONT_HEIGHT, column * FONT_WIDTH:(column + 1) * FONT_WIDTH] = GLYPHS[code]
+    return mask
+
+# Pixels with a Bayer value whose threshold is below the dither alpha get drawn
+BAYER = np.array([[0, 8, 2, 10], [12, 4, 14, 6], [3, 11, 1, 9], [15, 7, 13, 5]])
+BAYER_THRESHOLD = (BAYER | 1) / 16
+
+def toInt(value):
+    """
+    Rounds a coordinate the way pyxel does (half away from zero).
+
+    Parameters:
+        value (float): The coordinate.
+
+    Returns:
+        int: The rounded coordinate.
+    """
+    return math.floor(value + 0.5) if value >= 0 else -math.floor(-value + 0.5)
+
+circleCache = {}
+
+def circleMasks(r):
+    """
+    Returns the filled and outlined circle masks of a radius, rasterized like pyxel does it.
+
+    Parameters:
+        r (int): The radius.
+
+    Returns:
+        tuple: The filled mask and the outline mask, both (2r+1)x(2r+1) boolean arrays.
+    """
+    if r not in circleCache:
+        offsets = np.abs(np.arange(-r, r + 1))
+        # Rounding slightly up matches pyxel's rasterizer pixel for pixel
+        heights = np.floor(np.sqrt(r * r - offsets * offsets) + 0.51).astype(int)
+        filled = (offsets[:, None] <= heights[None, :]) | (offsets[None, :] <= heights[:, None])
+        outline = (offsets[:, None] == heights[None, :]) | (offsets[None, :] == heights[:, None])
+        circleCache[r] = (filled, outline)
+    return circleCache[r]
+
+class Image:
+    def __init__(self, width, height):
+        """
+        Initializes a new instance of the Image class, an image bank backed by a NumPy array.
+
+        Parameters:
+            width (int): The width of the image.
+            height (int): The height of the image.
+
+        Returns:
+            None
+        """
+        self.width = width
+        self.height = height
+        self.data = np.zeros((height, width), dtype=np.uint8)
+        self.alpha = 1.0
+        self.clipRect = (0, 0, width, height)
+        self.banks = []
+
+    def region(self, x0, y0, x1, y1):
+        """
+        Clamps a rectangle to the clip area.
+
+        Parameters:
+            x0 (int): The left edge.
+            y0 (int): The top edge.
+            x1 (int): The right edge (excluded).
+            y1 (int): The bottom edge (excluded).
+
+        Returns:
+            tuple: The clamped (x0, y0, x1, y1), empty rectangles have x0 >= x1 or y0 >= y1.
+        """
+        cx, cy, cw, ch = self.clipRect
+        return max(x0, cx), max(y0, cy), min(x1, cx + cw), min(y1, cy + ch)
+
+    def paint(self, x0, y0, mask, col):
+        """
+        Writes a color where a mask is set, honoring the clip area and dither.
+
+        Parameters:
+            x0 (int): The x-coordinate of the top left corner of the mask.
+            y0 (int): The y-coordinate of the top left corner of the mask.
+            mask (ndarray): A boolean array of the pixels to paint, or None for all of them.
+            col (ndarray or int): The color, or an array of colors the size of the mask.
+
+        Returns:
+            None
+        """
+        height, width = mask.shape
+        left, top, right, bottom = self.region(x0, y0, x0 + width, y0 + height)
+        if left >= right or top >= bottom:
+            return
+        mask = mask[top - y0:bottom - y0, left - x0:right - x0]
+        if isinstance(col, np.ndarray):
+            col = col[top - y0:bottom - y0, left - x0:right - x0]
+        if self.alpha < 1.0:
+            ys = np.arange(top, bottom)[:, None] % 4
+            xs = np.arange(left, right)[None, :] % 4
+            mask = mask & (BAYER_THRESHOLD[ys, xs] < self.alpha)
+        target = self.data[top:bottom, left:right]
+        if not isinstance(col, np.ndarray):
+            target[mask] = col
+        else:
+            target[mask] = col[mask]
+
+    def clip(self, x=None, y=None, w=None, h=None):
+        if x is None:
+            self.clipRect = (0, 0, self.width, self.height)
+        else:
+            # Like pyxel, the clip area never reaches past the image
+            x, y = toInt(x), toInt(y)
+            left, top = max(x, 0), max(y, 0)
+            right, bottom = min(x + toInt(w), self.width), min(y + toInt(h), self.height)
+            self.clipRect = (left, top, max(0, right - left), max(0, bottom - top))
+
+    def dither(self, alpha):
+        self.alpha = alpha
+
+    def cls(self, col):
+        # Like pyxel, clearing ignores the clip rectangle and the dither alpha
+        self.data.fill(col)
+
+    def pget(self, x, y):
+        x = toInt(x)
+        y = toInt(y)
+        if 0 <= x < self.width and 0 <= y < self.height:
+            return int(self.data[y, x])
+        return 0
+
+    def pset(self, x, y, col):
+        x = toInt(x)
+        y = toInt(y)
+        left, top, right, bottom = self.region(x, y, x + 1, y + 1)
+        if left < right and top < bottom:
+            if self.alpha >= 1.0 or BAYER_THRESHOLD[y % 4, x % 4] < self.alpha:
+                self.data[y, x] = col
+
+    def rect(self, x, y, w, h, col):
+        x = toInt(x)
+        y = toInt(y)
+        w = toInt(w)
+        h = toInt(h)
+        if w > 0 and h > 0:
+            self.paint(x, y, np.ones((h, w), dtype=bool), col)
+
+    def rectb(self, x, y, w, h, col):
+        x = toInt(x)
+        y = toInt(y)
+        w = toInt(w)
+        h = toInt(h)
+        if w > 0 and h > 0:
+            mask = np.ones((h, w), dtype=bool)
+            mask[1:-1, 1:-1] = False
+            self.paint(x, y, mask, col)
+
+    def circ(self, x, y, r, col):
+        r = toInt(r)
+        if r >= 0:
+            self.paint(toInt(x) - r, toInt(y) - r, circleMasks(r)[0], col)
+
+    def circb(self, x, y, r, col):
+        r = toInt(r)
+        if r >= 0:
+            self.paint(toInt(x) - r, toInt(y) - r, circleMasks(r)[1], col)
+
+    def text(self, x, y, s, col):
+        self.paint(toInt(x), toInt(y), textMask(s), col)
+
+    def blt(self, x, y, img, u, v, w, h, colkey=None, rotate=0.0, scale=1.0):
+        """
+        Copies a region of an image bank, with the same flip, colkey, rotate and scale rules as pyxel.
+
+        Parameters:
+            x (float): The destination x-coordinate.
+            y (float): The destination y-coordinate.
+            img (int or Image): The image bank number or an Image instance.
+            u (float): The source x-coordinate.
+            v (float): The source y-coordinate.
+            w (float): The width of the region, negative to flip it horizontally.
+            h (float): The height of the region, negative to flip it vertically.
+            colkey (int): The transparent color, None for no transparency.
+            rotate (float): The rotation in degrees, around the center of the region.
+            scale (float): The scale factor, around the center of the region.
+
+        Returns:
+            None
+        """
+        source = self.banks[img] if isinstance(img, int) else img
+        u = toInt(u)
+        v = toInt(v)
+        w = toInt(w)
+        h = toInt(h)
+        width = abs(w)
+        height = abs(h)
+        if width == 0 or height == 0:
+            return
+        pixels = np.zeros((height, width), dtype=np.uint8)
+        inside = np.zeros((height, width), dtype=bool)
+        sx0 = max(u, 0)
+        sy0 = max(v, 0)
+        sx1 = min(u + width, source.width)
+        sy1 = min(v + height, source.height)
+        if sx0 < sx1 and sy0 < sy1:
+            pixels[sy0 - v:sy1 - v, sx0 - u:sx1 - u] = source.data[sy0:sy1, sx0:sx1]
+            inside[sy0 - v:sy1 - v, sx0 - u:sx1 - u] = True
+        if w < 0:
+            pixels = pixels[:, ::-1]
+            inside = inside[:, ::-1]
+        if h < 0:
+            pixels = pixels[::-1, :]
+            inside = inside[::-1, :]
+        if colkey is not None:
+            inside = inside & (pixels != colkey)
+        rotate = rotate or 0.0
+        scale = 1.0 if scale is None else scale
+        if rotate == 0.0 and scale == 1.0:
+            self.paint(toInt(x), toInt(y), inside, pixels)
+            return
+        if scale <= 0:
+            return
+        if rotate == 0.0:
+            # Without rotation every column and row maps to a single source column and row
+            left = math.floor(x + width / 2 - width * scale / 2)
+            top = math.floor(y + height / 2 - height * scale / 2)
+            right = math.ceil(x + width / 2 + width * scale / 2)
+            bottom = math.ceil(y + height / 2 + height * scale / 2)
+            srcX = np.floor((np.arange(left, right) + 0.5 - x - width / 2) / scale + width / 2).astype(int)
+            srcY = np.floor((np.arange(top, bottom) + 0.5 - y - height / 2) / scale + height / 2).astype(int)
+            validX = (srcX >= 0) & (srcX < width)
+            validY = (srcY >= 0) & (srcY < height)
+            rows = np.clip(srcY, 0, height - 1)[:, None]
+            columns = np.clip(srcX, 0, width - 1)[None, :]
+            self.paint(left, top, validY[:, None] & validX[None, :] & inside[rows, columns], pixels[rows, columns])
+            return
+        # Map every destination pixel back to the source region
+        centerX = x + width / 2
+        centerY = y + height / 2
+        radius = np.hypot(width, height) * scale / 2 + 1
+        left = int(np.floor(centerX - radius))
+        top = int(np.floor(centerY - radius))
+        size = int(np.ceil(radius * 2)) + 1
+        dx, dy = np.meshgrid(np.arange(size) + left + 0.5 - centerX, np.arange(size) + top + 0.5 - centerY)
+        angle = np.radians(rotate)
+        cos = np.cos(angle)
+        sin = np.sin(angle)
+        srcX = np.floor((dx * cos + dy * sin) / scale + width / 2).astype(int)
+        srcY = np.floor((-dx * sin + dy * cos) / scale + height / 2).astype(int)
+        valid = (srcX >= 0) & (srcX < width) & (srcY >= 0) & (srcY < height)
+        srcX = np.clip(srcX, 0, width - 1)
+        srcY = np.clip(srcY, 0, height - 1)
+        self.paint(left, top, valid & inside[srcY, srcX], pixels[srcY, srcX])
+
+class Backend:
+    def __init__(self, render=True):
+        """
+        Initializes a new instance of the Backend class, a windowless stand-in for the pyxel module.
+
+        It implements the part of the pyxel API the games use. Input comes from a script
+        instead of the keyboard and drawing goes to NumPy arrays, so games can be stepped as
+        fast as the CPU allows.
+
+        Parameters:
+            render (bool): False turns every drawing call into a no-op for pure simulation.
+
+        Returns:
+            None
+        """
+        self.render = render
+        self.width = 256
+        self.height = 256
+        self.fps = 30
+        self.frame_count = 0
+        self.mouse_x = 0
+        self.mouse_y = 0
+        self.script = None
+        self.limit = None
+        self.running = False
+        self.held = set()
+        self.previous = set()
+        self.images = [Image(256, 256) for _ in range(3)]
+        self.screen = Image(self.width, self.height)
+        self.linkBanks()
+
+    def linkBanks(self):
+        """
+        Points the screen and the image banks at each other so blt can take a bank number.
+
+        Parameters:
+            None
+
+        Returns:
+            None
+        """
+        for image in self.images + [self.screen]:
+            image.banks = self.images
+
+    def Image(self, width, height):
+        image = Image(width, height)
+        image.banks = self.images
+        return image
+
+    # System
+    def init(self, width, height, title="Pyxel", fps=30, **kwargs):
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.frame_count = 0
+        self.screen = Image(width, height)
+        self.linkBanks()
+
+    def run(self, update, draw):
+        """
+        Runs the game loop without any frame pacing until quit is called or the frame limit is reached.
+
+        Parameters:
+            update (callable): The function called to update the game each frame.
+            draw (callable): The function called to draw the game each frame.
+
+        Returns:
+            None
+        """
+        self.running = True
+        frames = 0
+        while self.running and (self.limit is None or frames < self.limit):
+            self.step(update, draw)
+            frames += 1
+        self.running = False
+
+    def step(self, update, draw):
+        """
+        Runs a single frame: reads the scripted input, then calls update and draw.
+
+        Parameters:
+            update (callable): The function called to update the game.
+            draw (callable): The function called to draw the game.
+
+        Returns:
+            None
+        """
+        self.previous = self.held
+        self.held = set()
+        if self.script is not None:
+            self.script(self)
+        update()
+        draw()
+        self.frame_count += 1
+
+    def quit(self):
+        self.running = False
+
+    def mouse(self, visible):
+        pass
+
+    # Input
+    def hold(self, *keys):
+        """
+        Holds keys or mouse buttons down for the current frame, meant to be called from the script.
+
+        Parameters:
+            keys (int): The pyxel key or button constants.
+
+        Returns:
+            None
+        """
+        self.held.update(keys)
+
+    def moveMouse(self, x, y):
+        self.mouse_x = x
+        self.mouse_y = y
+
+    def btn(self, key):
+        return key in self.held
+
+    def btnp(self, key, hold=None, repeat=None):
+        return key in self.held and key not in self.previous
+
+    def btnr(self, key):
+        return key in self.previous and key not in self.held
+
+    # Resources
+    def load(self, filename, **kwargs):
+        """
+        Loads the image banks of a .pyxres file.
+
+        Parameters:
+            filename (str): The resource file.
+
+        Returns:
+            None
+        """
+        if not os.path.isabs(filename) and sys.argv and sys.argv[0] not in ("", "-", "-c"):
+            # Like pyxel, relative to the directory of the script that was run
+            filename = os.path.join(os.path.dirname(os.path.abspath(sys.argv[0])), filename)
+        with zipfile.ZipFile(filename) as archive:
+            resource = tomllib.loads(archive.read("pyxel_resource.toml").decode())
+        for image, entry in zip(self.images, resource.get("images", [])):
+            image.data.fill(0)
+            rows = entry["data"]
+            # Trailing repeated values and rows are left out of the file
+            for y in range(image.height):
+                row = rows[min(y, len(rows) - 1)]
+                image.data[y, :len(row)] = row[:image.width]
+                image.data[y, len(row):] = row[-1]
+
+    # Graphics
+    def clip(self, x=None, y=None, w=None, h=None):
+        self.screen.clip(x, y, w, h)
+
+    def dither(self, alpha):
+        self.screen.dither(alpha)
+
+    def pget(self, x, y):
+        return self.screen.pget(x, y)
+
+    def pset(self, x, y, col):
+        if self.render:
+            self.screen.pset(x, y, col)
+
+    def cls(self, col):
+        if self.render:
+            self.screen.cls(col)
+
+    def rect(self, x, y, w, h, col):
+        if self.render:
+            self.screen.rect(x, y, w, h, col)
+
+    def rectb(self, x, y, w, h, col):
+        if self.render:
+            self.screen.rectb(x, y, w, h, col)
+
+    def circ(self, x, y, r, col):
+        if self.render:
+            self.screen.circ(x, y, r, col)
+
+    def circb(self, x, y, r, col):
+        if self.render:
+            self.screen.circb(x, y, r, col)
+
+    def text(self, x, y, s, col):
+        if self.render:
+            self.screen.text(x, y, s, col)
+
+    def blt(self, x, y, img, u, v, w, h, colkey=None, rotate=0.0, scale=1.0):
+        if self.render:
+            self.screen.blt(x, y, img, u, v, w, h, colkey, rotate=rotate, scale=scale)
+
+# Same constants as pyxel so scripts can use either module
+for letter in string.ascii_uppercase:
+    setattr(Backend, "KEY_" + letter, ord(letter.lower()))
+for digit in string.digits:
+    setattr(Backend, "KEY_" + digit, ord(digit))
+Backend.KEY_SPACE = 32
+Backend.KEY_RETURN = 13
+Backend.KEY_ESCAPE = 27
+Backend.KEY_RIGHT = 1073741903
+Backend.KEY_LEFT = 1073741904
+Backend.KEY_DOWN = 1073741905
+Backend.KEY_UP = 1073741906
+Backend.MOUSE_BUTTON_LEFT = 1342177540
+Backend.MOUSE_BUTTON_MIDDLE = 1342177541
+Backend.MOUSE_BUTTON_RIGHT = 1342177542
+for index, name in enumerate(["BLACK", "NAVY", "PURPLE", "GREEN", "BROWN", "DARK_BLUE", "LIGHT_BLUE", "WHITE",
+                              "RED", "ORANGE", "YELLOW", "LIME", "CYAN", "GRAY", "PINK", "PEACH"]):
+    setattr(Backend, "COLOR_" + name, index)
+
+def install(render=True):
+    """
+    Creates a headless backend and binds it in place of pyxel.
+
+    The game clock follows the backend's frame counter, so every frame is exactly one
+    fixed step no matter how fast the loop runs.
+
+    Parameters:
+        render (bool): False turns every drawing call into a no-op for pure simulation.
+
+    Returns:
+        Backend: The installed backend.
+    """
+    backend = Backend(render)
+    binding.bind(backend)
+    timing.clock.useFrames(backend)
+    return backend
@@ -0,0 +1,63 @@
+import pyxel
+import resources
+
+class Layer:
+    def __init__(self, width=None, height=None):
+        """
+        Initializes a new instance of the Layer class.
+
+        A layer is an off-screen image holding a part of the scene that does not change from
+        frame to frame, like the course of a hole. It is rendered once for a key and then
+        put back on the screen with a single unscaled blit, the moving sprites and the text
+        are drawn on top of it as before.
+
+        Parameters:
+            width (int): The width of the layer, the screen width by default.
+            height (int): The height of the layer, the screen height by default.
+
+        Returns:
+            None
+        """
+        self.width = width or pyxel.width
+        self.height = height or pyxel.height
+        self.image = pyxel.Image(self.width, self.height)
+        self.key = None
+        self.source = None
+        self.renders = 0
+
+    def render(self, key, paint):
+        """
+        Returns the image of the layer, painting it again when the key or the active resource file changed.
+
+        Parameters:
+            key (object): What the layer shows, like the number of the hole.
+            paint (callable): Called with the image to paint it, the image is cleared to color 0 first.
+
+        Returns:
+            pyxel.Image: The image of the layer.
+        """
+        if key != self.key or resources.current() != self.source:
+            self.image.cls(0)
+            paint(self.image)
+            self.key = key
+            self.source = resources.current()
+            self.renders += 1
+        return self.image
+
+    def draw(self, key, paint, x=0, y=0):
+        """
+        Draws the layer on the screen, without a transparent color so it covers what is under it.
+
+        Parameters:
+            key (object): What the layer shows, like the number of the hole.
+            paint (callable): Called with the image to paint it when the key changed.
+            x (int): The x-coordinate of the layer on the screen.
+            y (int): The y-coordinate of the layer on the screen.
+
+        Returns:
+            None
+        """
+        pyxel.blt(x, y, self.render(key, paint), 0, 0, self.width, self.height)
+
+    def invalidate(self):
+        self.key = None
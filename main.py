@@ -1,31 +1,54 @@
+import startup
+import argparse
 import sys
 import pyxel
 import random
 from math import *
-import game_clock, game_coin, game_golf, game_shooter, game_tag, game_wam
+import batch
+import minigames
+import redraw
+import resources
+import scenes
+import timing
+import spatial
+import spritestack
 
-print("Starting game...")
+startup.mark("imports")
+
+TRIGGER_DISTANCE = 4  # Manhattan distance under which the balloon can start a minigame
 
 class HotAirBalloonGame:
-    def __init__(self):
+    def __init__(self, startupReport=False):
         """
         Initializes a new instance of the HotAirBalloonGame class.
         
         Sets up the game window, loads the game resources, and initializes the game state.
+        Minigames are only imported when they are started.
         
         Parameters:
-            None
+            startupReport (bool): Print the startup report after the first frame and quit.
         
         Returns:
             None
         """
         print("Initializing game...")
         pyxel.init(256, 256, title="Hot Air Balloon Adventure", display_scale=4, fps=70)
-        pyxel.load("my_resource.pyxres")
+        startup.mark("pyxel.init")
+        timing.clock.setRate(70)
+        # Edge input is read once per frame, whatever the number of steps it runs
+        self.input = timing.StepInput(pyxel).install()
+        resources.use("my_resource.pyxres")
+        startup.mark("resources")
         
         # Game state
         self.current_game = "balloon"
         self.minigame = None
+        self.minigames = minigames.Registry()
+        # The overworld stays at the bottom of the stack, minigames are pushed on top of it
+        self.scenes = scenes.SceneStack()
+        self.scenes.push("balloon", self)
+        self.startupReport = startupReport
+        self.firstFrame = True
         
         # Balloon properties
         self.balloon_x = pyxel.width // 2
@@ -40,6 +63,11 @@ class HotAirBalloonGame:
             (126, 165), (120, 139), (116, 123), 
             (50, 38), (109, 181), (184, 160)
         ]
+        # Trigger points can be added and removed while playing, see addTrigger
+        self.triggers = spatial.Points(16, self.dot_positions)
+        self.triggerKey = None
+        self.trigger = None
+        self.balloonSkip = redraw.Skip()
         self.isMenu = True
         
         # 3D Menu properties (from your paste.txt)
@@ -50,18 +78,42 @@ class HotAirBalloonGame:
         self.letterSize = 16
         self.big = 3
         self.medium = 2
+        self.menuStack = None
+        self.menuBatch = batch.Batch()
         
         print("Starting game loop...")
         pyxel.run(self.update, self.draw)
     
     def update(self):
+        """
+        Runs as many fixed game steps as the game clock says have passed since the last frame.
+
+        A slow frame runs several steps and an early one may run none, so the game speed
+        and the timers do not depend on the frame rate. A key press is seen by the first
+        step run after it, by one step only.
+
+        Parameters:
+            None
+
+        Returns:
+            None
+        """
+        steps = timing.clock.tick()
+        self.input.frame()
+        for _ in range(steps):
+            self.step()
+            self.input.stepped()
+            timing.clock.advance()
+        self.input.end()
+
+    def step(self):
         """
         Updates the game state based on the current game mode.
 
         If the game is in the menu state, it calls the menuUpdate method.
         Otherwise, it updates the game state based on the current game type.
         If a minigame is active, it updates the minigame state and checks if it's done.
-        If the minigame is done, it resets the game state to the balloon game.
+        If the minigame is done, it is suspended and the balloon game resumes.
 
         Parameters:
             None
@@ -77,6 +129,7 @@ class HotAirBalloonGame:
             elif self.minigame:
                 self.minigame.update()
                 if getattr(self.minigame, "done", False):
+                    self.scenes.pop()
                     self.current_game = "balloon"
                     self.minigame = None
 
@@ -100,16 +153,54 @@ class HotAirBalloonGame:
         if pyxel.btn(pyxel.KEY_RIGHT):
             self.balloon_x += 1
 
+        # Cache the resources of the prewarmed minigame once it is imported
+        self.minigames.poll()
+
         # Check for minigame trigger
-        distance = min(abs(self.balloon_x - x) + abs(self.balloon_y - y) for x, y in self.dot_positions)
-        if distance < 4 and pyxel.btnp(pyxel.KEY_SPACE):
+        if self.nearestTrigger() is not None and pyxel.btnp(pyxel.KEY_SPACE):
             self.start_minigame()
+
+    def nearestTrigger(self):
+        """
+        Returns the trigger point the balloon is close enough to, looked up once per balloon position.
+
+        update_balloon and draw_balloon both ask, the answer is cached until the balloon
+        moves or the trigger points change.
+
+        Parameters:
+            None
+
+        Returns:
+            tuple: The id of the trigger point and its distance, or None if none is in reach.
+        """
+        key = (self.balloon_x, self.balloon_y, self.triggers.version)
+        if key != self.triggerKey:
+            self.triggerKey = key
+            self.trigger = self.triggers.nearest(self.balloon_x, self.balloon_y, TRIGGER_DISTANCE)
+        return self.trigger
+
+    def addTrigger(self, x, y):
+        """
+        Adds a minigame trigger point to the overworld.
+
+        Parameters:
+            x (int): The x-coordinate of the point.
+            y (int): The y-coordinate of the point.
+
+        Returns:
+            int: The id of the point, to remove it with removeTrigger.
+        """
+        return self.triggers.add(x, y)
+
+    def removeTrigger(self, point):
+        self.triggers.remove(point)
     
     def start_minigame(self):
         """
         Starts a randomly selected minigame.
 
-        Sets the current game state to "minigame" and initializes a new instance of a randomly chosen minigame.
+        Sets the current game state to "minigame" and resumes the randomly chosen minigame where it was left,
+        or creates it the first time, the registry imports its module on first use.
 
         Parameters:
             None
@@ -118,15 +209,7 @@ class HotAirBalloonGame:
             None
         """
         self.current_game = "minigame"
-        games = [
-            game_clock.Clock,
-            game_coin.Coin,
-            game_golf.Golf,
-            game_shooter.Shooter,
-            game_tag.Tag,
-            game_wam.Wam
-        ]
-        self.minigame = random.choice(games)()
+        self.minigame = self.scenes.enter(self.minigames.pick(), self.minigames.create)
     
     def menuUpdate(self):
         """
@@ -149,51 +232,45 @@ class HotAirBalloonGame:
         if pyxel.btnp(pyxel.KEY_SPACE):
             self.isMenu = False
 
-    def menuDraw(self):
+    def menuParts(self):
         """
-        Draws the game's menu screen, including the 3D hot air balloon, 
-        balloon rope/string, basket connection, basket parts, and title text.
-
-        The menu screen is drawn with a light blue background and includes 
-        game instructions and optional debug information.
+        Lists the sprites of the rotating part of the menu: the 3D hot air balloon, 
+        balloon rope/string, basket connection, basket parts, and the title letters.
 
         Parameters:
             None
 
         Returns:
-            None
+            list: (x, y, img, u, v, w, h, scale) tuples in drawing order.
         """
-        pyxel.cls(6)  # Light blue background like in your 3D code
-        
-        # Draw background sprite
-        pyxel.blt(0, 0, 1, 0, 0, 256, 256)
-        
+        parts = []
+
         # Get center position for the 3D balloon
         imgX, imgY = self.getSpriteCenter()
         imgY += 10
         
         # Draw the 3D hot air balloon (adapted from your code)
-        pyxel.blt(imgX, imgY, 0, 0, 0, 8, 8, colkey=0, scale=self.menu_scale+1, rotate=self.menu_rotation)
+        parts.append((imgX, imgY, 0, 0, 0, 8, 8, self.menu_scale+1))
 
         # Draw balloon rope/string
         for i in range(3 * self.big):
-            pyxel.blt(imgX, imgY, 0, 8, 0, 8, 8, colkey=0, scale=self.menu_scale+1, rotate=self.menu_rotation)
+            parts.append((imgX, imgY, 0, 8, 0, 8, 8, self.menu_scale+1))
             imgY -= self.menu_yAxis / self.big
             imgX -= self.menu_xAxis / self.big
 
         # Draw basket connection
-        pyxel.blt(imgX, imgY, 0, 0, 8, 8, 8, colkey=0, scale=self.menu_scale+1, rotate=self.menu_rotation)
+        parts.append((imgX, imgY, 0, 0, 8, 8, 8, self.menu_scale+1))
         imgY -= self.menu_yAxis
         imgX -= self.menu_xAxis
         
         # Draw more rope
         for i in range(3 * self.big):
-            pyxel.blt(imgX, imgY, 0, 8, 8, 8, 8, colkey=0, scale=self.menu_scale+1, rotate=self.menu_rotation)
+            parts.append((imgX, imgY, 0, 8, 8, 8, 8, self.menu_scale+1))
             imgY -= self.menu_yAxis / self.big
             imgX -= self.menu_xAxis / self.big
 
         # Draw basket parts
-        pyxel.blt(imgX, imgY, 0, 16, 8, 8, 8, colkey=0, scale=self.menu_scale+1, rotate=self.menu_rotation)
+        parts.append((imgX, imgY, 0, 16, 8, 8, 8, self.menu_scale+1))
         imgY -= self.menu_yAxis
         imgX -= self.menu_xAxis
 
@@ -203,7 +280,7 @@ class HotAirBalloonGame:
         ]
         
         for part_x, part_y in balloon_parts:
-            pyxel.blt(imgX, imgY, 0, part_x, part_y, 8, 8, colkey=0, scale=self.menu_scale+6, rotate=self.menu_rotation)
+            parts.append((imgX, imgY, 0, part_x, part_y, 8, 8, self.menu_scale+6))
             imgY -= self.menu_yAxis
             imgX -= self.menu_xAxis
 
@@ -214,18 +291,47 @@ class HotAirBalloonGame:
         
         letter_positions = [(0, 16), (16, 16), (32, 16), (48, 16), (64, 16)]  # M O N G O
         for i, (letter_x, letter_y) in enumerate(letter_positions):
-            pyxel.blt(title_x + i * self.letterSize * textRealScale, title_y, 0, 
-                     letter_x, letter_y, 16, 16, scale=textRealScale, colkey=0 ,rotate=self.menu_rotation)
+            parts.append((title_x + i * self.letterSize * textRealScale, title_y, 0, 
+                         letter_x, letter_y, 16, 16, textRealScale))
+        return parts
+
+    def menuDraw(self):
+        """
+        Draws the game's menu screen, including the 3D hot air balloon, 
+        balloon rope/string, basket connection, basket parts, and title text.
+
+        The menu screen is drawn with a light blue background and includes 
+        game instructions and optional debug information. The rotating sprites 
+        are composited once per angle by a sprite stack and drawn with one blit.
+        Everything after the clear goes through the menu batch.
+
+        Parameters:
+            None
+
+        Returns:
+            None
+        """
+        pyxel.cls(6)  # Light blue background like in your 3D code
+        menu = self.menuBatch
+        
+        # Draw background sprite
+        menu.blt(0, 0, 1, 0, 0, 256, 256)
+
+        parts = self.menuParts()
+        if self.menuStack is None or self.menuStack.parts != parts:
+            self.menuStack = spritestack.SpriteStack(parts)
+        self.menuStack.draw(self.menu_rotation, menu)
         
         # Game instructions
         text = "Hot Air Balloon Adventure"
         textX, textY = self.getTextCenter(text)
         textY += 8
-        pyxel.text(textX, textY, text, pyxel.COLOR_RED)
+        menu.text(textX, textY, text, pyxel.COLOR_RED)
         text = "Press SPACE to start"
         textX, textY = self.getTextCenter(text)
         textY += 16
-        pyxel.text(textX, textY, text, pyxel.COLOR_RED)
+        menu.text(textX, textY, text, pyxel.COLOR_RED)
+        menu.flush(pyxel)
         
         # Debug info (optional)
         #pyxel.text(0, 0, f"xAxis: {int(self.menu_xAxis*10)/10}, yAxis: {int(self.menu_yAxis*10)/10}, rot: {self.menu_rotation}, scale: {int(self.menu_scale*10)/10}", pyxel.COLOR_WHITE)
@@ -248,16 +354,24 @@ class HotAirBalloonGame:
             self.menuDraw()
         else:
             if self.current_game == "balloon":
-                pyxel.load("my_resource.pyxres")
                 self.draw_balloon()
             elif self.minigame:
                 self.minigame.draw()
+        if self.firstFrame:
+            self.firstFrame = False
+            startup.mark("first frame")
+            if self.startupReport:
+                startup.report()
+                pyxel.quit()
+            # Startup is over, the next minigame can be imported in the background
+            self.minigames.prewarmNext()
     
     def draw_balloon(self):
         """
         Draws the hot air balloon game state, including the background, collected dots, 
         and the hot air balloon itself. It also displays a prompt to play a minigame 
-        when the balloon is close to a dot.
+        when the balloon is close to a dot. Nothing is drawn when the balloon, the dots
+        and the prompt did not change since the last frame.
 
         Parameters:
             None
@@ -265,6 +379,11 @@ class HotAirBalloonGame:
         Returns:
             None
         """
+        near = self.nearestTrigger() is not None
+        state = (self.balloon_x, self.balloon_y, self.bg_x, self.bg_y, self.triggers.version,
+                 pyxel.mouse_x, pyxel.mouse_y)
+        if not self.balloonSkip.needed(state):
+            return
         pyxel.cls(0)
         
         # Draw background sprite
@@ -278,14 +397,13 @@ class HotAirBalloonGame:
         )
         
         # Draw all collected dots
-        for x, y in self.dot_positions:
+        for x, y in self.triggers:
             pyxel.circ(x, y, 2, pyxel.COLOR_YELLOW)
         
         # Draw the hot air balloon
         pyxel.circ(self.balloon_x, self.balloon_y, 4, pyxel.COLOR_RED)
 
-        distance = min(abs(self.balloon_x - x) + abs(self.balloon_y - y) for x, y in self.dot_positions)
-        if distance < 4:
+        if near:
             text = "Want to play a minigame? (SPACE)"
             pyxel.text((pyxel.width - len(text) * 4)//2, 10, text, pyxel.COLOR_WHITE)
 
@@ -315,5 +433,42 @@ class HotAirBalloonGame:
         return ((pyxel.width - len(text) * 4)//2), ((pyxel.height - 4) / 2)+50
 
 
-# Create and run the game
-game = HotAirBalloonGame()
\ No newline at end of file
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Hot Air Balloon Adventure")
+    parser.add_argument("--startup-report", action="store_true", help="print the time to the first frame and quit")
+    parser.add_argument("--record", metavar="FILE", help="record the input of the session to a log file")
+    parser.add_argument("--replay", metavar="FILE", help="play the input of a recorded session back")
+    parser.add_argument("--seed", type=int, help="seed of the random module when recording")
+    parser.add_argument("--profile", action="store_true", help="time the game and minigame hooks, P toggles the overlay")
+    parser.add_argument("--profile-export", metavar="FILE", help="profile and write the timings of every frame to a JSONL file")
+    parser.add_argument("--tag-players", type=int, default=2, metavar="N", help="number of balls in tag, 2 to 32")
+    parser.add_argument("--tag-bots", type=int, default=0, metavar="N", help="number of tag balls played by the computer, the last ones")
+    parser.add_argument("--golf-bot", action="store_true", help="let the computer play golf")
+    parser.add_argument("--golf-report", action="store_true", help="rate every golf hole from the shots of the solver")
+    parser.add_argument("--golf-continuous", action="store_true", help="sweep the golf ball against the walls instead of the per axis bounce")
+    parser.add_argument("--shooter-waves", choices=["classic", "bullethell"], default="classic", help="waves of enemies in the shooter")
+    args = parser.parse_args()
+    if args.tag_players != 2 or args.tag_bots:
+        import game_tag
+        game_tag.tagPlayers = max(2, min(32, args.tag_players))
+        game_tag.tagBots = max(0, min(game_tag.tagPlayers, args.tag_bots))
+    if args.golf_bot or args.golf_continuous or args.golf_report:
+        import game_golf
+        game_golf.golfBot = args.golf_bot
+        game_golf.continuous = args.golf_continuous
+        game_golf.difficultyReport = args.golf_report
+    if args.shooter_waves != "classic":
+        import swarm  # Only loaded when needed, it pulls in NumPy
+        swarm.preset = args.shooter_waves
+    if args.record or args.replay:
+        import replay  # Only loaded when needed, it pulls in the bots and NumPy
+        if args.record:
+            replay.record(args.record, args.seed)
+        else:
+            replay.replay(args.replay)
+    if args.profile or args.profile_export:
+        import profiler
+        profiler.Profiler(export=args.profile_export).install(HotAirBalloonGame)
+    print("Starting game...")
+    # Create and run the game
+    game = HotAirBalloonGame(startupReport=args.startup_report)
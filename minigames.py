@@ -0,0 +1,133 @@
+import importlib
+import random
+import threading
+import time
+import resources
+
+# Module, class and resource file of every minigame, imported only when first played
+GAMES = {
+    "clock": ("game_clock", "Clock", None),
+    "coin": ("game_coin", "Coin", None),
+    "golf": ("game_golf", "Golf", "golf.pyxres"),
+    "shooter": ("game_shooter", "Shooter", "shooter.pyxres"),
+    "tag": ("game_tag", "Tag", "tag.pyxres"),
+    "wam": ("game_wam", "Wam", None),
+}
+
+class Registry:
+    def __init__(self, games=GAMES, prewarm=True):
+        """
+        Initializes a new instance of the Registry class.
+
+        The registry knows every minigame by name but only imports its module when it is
+        started. The game played next is drawn in advance, so its module can be imported
+        by a background thread while the player is still flying around.
+
+        Parameters:
+            games (dict): The minigames, name -> (module, class, resource file or None).
+            prewarm (bool): Whether to import the upcoming game in the background.
+
+        Returns:
+            None
+        """
+        self.games = games
+        self.prewarm = prewarm
+        self.upcoming = random.choice(list(games))
+        self.thread = None
+        self.loadTimes = {}
+
+    def load(self, name):
+        """
+        Imports the module of a minigame and returns its class.
+
+        Parameters:
+            name (str): The name of the minigame.
+
+        Returns:
+            type: The minigame class.
+        """
+        module, cls, _ = self.games[name]
+        start = time.perf_counter()
+        game = getattr(importlib.import_module(module), cls)
+        self.loadTimes.setdefault(name, time.perf_counter() - start)
+        return game
+
+    def prewarmNext(self):
+        """
+        Starts importing the upcoming minigame in a background thread.
+
+        Only the import runs in the thread, pyxel is not thread safe so the resource file is
+        cached later from the game loop by poll.
+
+        Parameters:
+            None
+
+        Returns:
+            None
+        """
+        if not self.prewarm or self.thread is not None:
+            return
+        self.thread = threading.Thread(target=self.load, args=(self.upcoming,), daemon=True)
+        self.thread.start()
+
+    def poll(self):
+        """
+        Caches the resource file of the upcoming minigame once its module is imported.
+
+        Called from the game loop, so the load happens between two frames of the overworld
+        instead of when the minigame starts.
+
+        Parameters:
+            None
+
+        Returns:
+            None
+        """
+        if self.thread is None or self.thread.is_alive():
+            return
+        filename = self.games[self.upcoming][2]
+        if filename:
+            resources.preload(filename)
+        self.thread = None
+
+    def pick(self):
+        """
+        Returns the upcoming minigame and draws the one after it, which starts prewarming.
+
+        Parameters:
+            None
+
+        Returns:
+            str: The name of the minigame to play now.
+        """
+        name = self.upcoming
+        self.upcoming = random.choice(list(self.games))
+        self.thread = None
+        self.prewarmNext()
+        return name
+
+    def create(self, name):
+        """
+        Creates a new instance of a minigame, importing its module if needed.
+
+        Parameters:
+            name (str): The name of the minigame.
+
+        Returns:
+            object: The new minigame instance.
+        """
+        return self.load(name)()
+
+    def start(self, name=None):
+        """
+        Creates the upcoming minigame, or a given one, and draws the next one.
+
+        Parameters:
+            name (str): The minigame to start, None for the upcoming one.
+
+        Returns:
+            object: The new minigame instance.
+        """
+        if name is None:
+            return self.create(self.pick())
+        return self.create(name)
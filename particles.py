@@ -0,0 +1,143 @@
+import numpy as np
+
+class ParticleSystem:
+    def __init__(self, capacity):
+        """
+        Initializes a new instance of the ParticleSystem class.
+
+        Particles live in preallocated arrays, one per field, and the live ones are always
+        packed at the front: a frame moves all of them with a few array operations and dead
+        ones are replaced by the last live ones (swap-remove), nothing is allocated.
+
+        Parameters:
+            capacity (int): The maximum number of live particles, new ones are dropped beyond it.
+
+        Returns:
+            None
+        """
+        self.capacity = capacity
+        self.count = 0
+        self.x = np.zeros(capacity)
+        self.y = np.zeros(capacity)
+        self.vx = np.zeros(capacity)
+        self.vy = np.zeros(capacity)
+        self.size = np.zeros(capacity)
+        self.life = np.zeros(capacity, dtype=np.int32)
+        self.max_life = np.ones(capacity, dtype=np.int32)
+        self.color = np.zeros(capacity, dtype=np.int32)
+        self.fields = [self.x, self.y, self.vx, self.vy, self.size, self.life, self.max_life, self.color]
+
+    def __len__(self):
+        return self.count
+
+    def emit(self, x, y, vx=0.0, vy=0.0, life=1, size=1, color=7):
+        """
+        Adds a particle.
+
+        Parameters:
+            x (float): The x-coordinate of the particle.
+            y (float): The y-coordinate of the particle.
+            vx (float): The horizontal velocity in pixels per frame.
+            vy (float): The vertical velocity in pixels per frame.
+            life (int): The number of frames the particle lives.
+            size (float): The radius of the particle.
+            color (int): The color of the particle.
+
+        Returns:
+            bool: False if the system is full and the particle was dropped.
+        """
+        i = self.count
+        if i >= self.capacity:
+            return False
+        self.x[i] = x
+        self.y[i] = y
+        self.vx[i] = vx
+        self.vy[i] = vy
+        self.life[i] = life
+        self.max_life[i] = life  # Original life for fade calculation
+        self.size[i] = size
+        self.color[i] = color
+        self.count = i + 1
+        return True
+
+    def emitMany(self, x, y, vx, vy, life, size, color):
+        """
+        Adds many particles at once, the fields are arrays or numbers shared by all of them.
+
+        Parameters:
+            x (numpy.ndarray): The x-coordinates of the particles.
+            y (numpy.ndarray): The y-coordinates of the particles.
+            vx (numpy.ndarray): The horizontal velocities in pixels per frame.
+            vy (numpy.ndarray): The vertical velocities in pixels per frame.
+            life (int): The number of frames the particles live.
+            size (float): The radius of the particles.
+            color (int): The color of the particles.
+
+        Returns:
+            int: The number of particles added, the ones beyond the capacity are dropped.
+        """
+        start = self.count
+        added = min(len(x), self.capacity - start)
+        end = start + added
+        for field, value in ((self.x, x), (self.y, y), (self.vx, vx), (self.vy, vy)):
+            field[start:end] = value[:added]
+        self.life[start:end] = life
+        self.max_life[start:end] = life
+        self.size[start:end] = size
+        self.color[start:end] = color
+        self.count = end
+        return added
+
+    def step(self):
+        """
+        Moves every live particle by its velocity and ages it by one frame.
+
+        Parameters:
+            None
+
+        Returns:
+            None
+        """
+        n = self.count
+        self.x[:n] += self.vx[:n]
+        self.y[:n] += self.vy[:n]
+        self.life[:n] -= 1
+
+    def keep(self, alive):
+        """
+        Removes the live particles that are not flagged as alive.
+
+        The holes left in the front of the arrays are filled with the survivors from the
+        back, so the order of the particles is not kept.
+
+        Parameters:
+            alive (numpy.ndarray): One boolean per live particle.
+
+        Returns:
+            None
+        """
+        n = self.count
+        remaining = int(np.count_nonzero(alive))
+        if remaining == n:
+            return
+        holes = np.flatnonzero(~alive[:remaining])
+        movers = np.flatnonzero(alive[remaining:]) + remaining
+        for field in self.fields:
+            field[holes] = field[movers]
+        self.count = remaining
+
+    def update(self):
+        """
+        Steps every particle and removes the ones whose life ran out.
+
+        Parameters:
+            None
+
+        Returns:
+            None
+        """
+        self.step()
+        self.keep(self.life[:self.count] > 0)
+
+    def clear(self):
+        self.count = 0
@@ -0,0 +1,90 @@
+class Pool:
+    def __init__(self, record, capacity):
+        """
+        Initializes a new instance of the Pool class.
+
+        A pool holds up to capacity records of one class. The live ones are packed at the
+        front of a list and the dead ones wait behind them to be reused, so once the pool
+        has grown to what the game needs, adding and removing entities creates nothing.
+        The created counter only moves while the pool grows, a steady state keeps it flat.
+
+        Parameters:
+            record (type): The class of the records, created without arguments.
+            capacity (int): The maximum number of live records, new ones are dropped beyond it.
+
+        Returns:
+            None
+        """
+        self.record = record
+        self.capacity = capacity
+        self.items = []
+        self.count = 0
+        self.created = 0
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        items = self.items
+        for index in range(self.count):
+            yield items[index]
+
+    def reserve(self, count):
+        """
+        Creates the records of count live ones ahead of time, so the game does not grow the pool while it plays.
+
+        Parameters:
+            count (int): The live records to make room for, at most the capacity.
+
+        Returns:
+            None
+        """
+        while len(self.items) < min(count, self.capacity):
+            self.items.append(self.record())
+            self.created += 1
+
+    def acquire(self):
+        """
+        Returns a free record, reusing a dead one when there is one.
+
+        The record keeps the values of its last life, the caller sets every field.
+
+        Parameters:
+            None
+
+        Returns:
+            object: The record, now live, or None if the pool is full.
+        """
+        if self.count == len(self.items):
+            if self.count >= self.capacity:
+                return None
+            self.items.append(self.record())
+            self.created += 1
+        item = self.items[self.count]
+        self.count += 1
+        return item
+
+    def keep(self, alive):
+        """
+        Removes the live records a predicate rejects, in place.
+
+        The survivors keep their order, the removed records move behind them for reuse.
+
+        Parameters:
+            alive (callable): Called with each live record, True to keep it.
+
+        Returns:
+            None
+        """
+        items = self.items
+        kept = 0
+        for index in range(self.count):
+            item = items[index]
+            if alive(item):
+                if kept != index:
+                    items[kept], items[index] = item, items[kept]
+                kept += 1
+        self.count = kept
+
+    def clear(self):
+        self.count = 0
@@ -0,0 +1,313 @@
+import argparse
+import atexit
+import collections
+import functools
+import json
+import platform
+import sys
+import time
+import uuid
+import pyxel
+import redraw
+from stats import summary
+
+# Methods timed in every minigame module, patched when the module is imported
+HOOKS = {
+    "bots": {"TagBot": ["act"], "GolfBot": ["act"]},
+    "game_clock": {"Clock": ["update", "draw"]},
+    "game_coin": {"Coin": ["update", "draw"]},
+    "game_golf": {"Golf": ["update", "draw", "checkCollision", "inWall", "think"]},
+    "game_shooter": {
+        "Shooter": ["update", "draw"],
+        "Player": ["updateBullets", "powerSmoke", "drawSmoke"],
+        "Enemies": ["updateExplosions"],
+        "Terrain": ["doStars"],
+    },
+    "game_tag": {"Tag": ["update", "draw"]},
+    "game_wam": {"Wam": ["update", "draw"]},
+}
+WINDOW = 120  # Frames in the rolling graph, one pixel column each
+GRAPH_HEIGHT = 40
+LINES = 6  # Hooks listed under the graph
+FLUSH_EVERY = 70  # Frames between two flushes of the export file
+
+class Profiler:
+    def __init__(self, hooks=HOOKS, window=WINDOW, export=None, fps=70):
+        """
+        Initializes a new instance of the Profiler class.
+
+        Nothing is timed until install is called: it wraps the update and draw methods of
+        the game class and the methods listed in hooks, so the game runs untouched when
+        profiling is off. Hook times are inclusive, HotAirBalloonGame.update holds the
+        update of the running minigame too.
+
+        Parameters:
+            hooks (dict): The methods to time, module -> class -> method names.
+            window (int): The number of frames kept for the overlay.
+            export (str): A JSONL file every frame is written to, None to only show the overlay.
+            fps (int): The frame rate, the graph marks the time budget of a frame.
+
+        Returns:
+            None
+        """
+        self.hooks = hooks
+        self.frames = collections.deque(maxlen=window)
+        self.window = window
+        self.budget = 1000 / fps
+        self.totals = {}
+        self.patched = {}
+        self.modules = set()
+        self.root = None
+        self.scene = None
+        self.last = None
+        self.frame = 0
+        self.visible = True
+        self.file = None
+        if export:
+            self.file = open(export, "w")
+            self.write({
+                "type": "session",
+                "session": uuid.uuid4().hex,
+                "python": platform.python_version(),
+                "machine": platform.machine(),
+                "system": platform.system(),
+                "pyxel": getattr(pyxel, "VERSION", None),
+                "fps": fps,
+            })
+            # pyxel.quit may end the process without returning
+            atexit.register(self.close)
+
+    def wrap(self, cls, method, name=None):
+        """
+        Replaces a method of a class with one that adds its duration to the running frame.
+
+        Parameters:
+            cls (type): The class holding the method.
+            method (str): The name of the method.
+            name (str): The name of the hook, Class.method by default.
+
+        Returns:
+            None
+        """
+        original = cls.__dict__[method]
+        name = name or f"{cls.__name__}.{method}"
+        totals = self.totals
+
+        @functools.wraps(original)
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return original(*args, **kwargs)
+            finally:
+                entry = totals.get(name)
+                if entry is None:
+                    totals[name] = [time.perf_counter() - start, 1]
+                else:
+                    entry[0] += time.perf_counter() - start
+                    entry[1] += 1
+        setattr(cls, method, timed)
+        self.patched[(cls, method)] = original
+
+    def install(self, root):
+        """
+        Starts profiling a game class, a frame ends each time its draw method returns.
+
+        The whole frame is credited to the scene that was running when update started.
+
+        Parameters:
+            root (type): The game class, HotAirBalloonGame.
+
+        Returns:
+            None
+        """
+        self.root = root
+        self.wrap(root, "update")
+        self.wrap(root, "draw")
+        timedUpdate = root.update
+        timedDraw = root.draw
+
+        def update(game):
+            # The scene that runs the frame, a minigame that ends pops itself in update
+            self.scene = self.sceneName(game)
+            timedUpdate(game)
+
+        def draw(game):
+            timedDraw(game)
+            self.endFrame()
+            if pyxel.btnp(pyxel.KEY_P):
+                self.visible = not self.visible
+            if self.visible:
+                self.drawOverlay()
+                redraw.overdraw()
+        root.update = update
+        root.draw = draw
+        self.watch()
+
+    def watch(self):
+        """
+        Patches the hooks of the minigame modules imported since the last call.
+
+        Parameters:
+            None
+
+        Returns:
+            None
+        """
+        for module, classes in self.hooks.items():
+            if module in self.modules or module not in sys.modules:
+                continue
+            self.modules.add(module)
+            for cls, methods in classes.items():
+                for method in methods:
+                    self.wrap(getattr(sys.modules[module], cls), method)
+
+    def uninstall(self):
+        for (cls, method), original in self.patched.items():
+            setattr(cls, method, original)
+        self.patched.clear()
+        self.modules.clear()
+        self.close()
+
+    def sceneName(self, game):
+        if getattr(game, "isMenu", False):
+            return "menu"
+        scenes = getattr(game, "scenes", None)
+        if scenes and scenes.scenes:
+            return scenes.scenes[-1][0]
+        return type(game).__name__
+
+    def endFrame(self):
+        """
+        Closes the timings of the frame, keeps them for the overlay and exports them.
+
+        Parameters:
+            None
+
+        Returns:
+            None
+        """
+        now = time.perf_counter()
+        interval = (now - self.last) * 1000 if self.last is not None else 0.0
+        self.last = now
+        hooks = {name: (seconds * 1000, calls) for name, (seconds, calls) in self.totals.items()}
+        self.totals.clear()
+        name = self.root.__name__
+        work = hooks.get(f"{name}.update", (0.0, 0))[0] + hooks.get(f"{name}.draw", (0.0, 0))[0]
+        self.frames.append((work, hooks))
+        if self.file:
+            self.write({
+                "type": "frame",
+                "frame": self.frame,
+                "scene": self.scene,
+                "interval": round(interval, 4),
+                "work": round(work, 4),
+                "hooks": {hook: [round(ms, 4), calls] for hook, (ms, calls) in hooks.items()},
+            })
+            if self.frame % FLUSH_EVERY == 0:
+                self.file.flush()
+        self.frame += 1
+        # Minigames are imported on first play, hook them from the next frame on
+        self.watch()
+
+    def breakdown(self):
+        """
+        Returns the mean and peak time per frame of every hook over the window.
+
+        Parameters:
+            None
+
+        Returns:
+            list: (name, mean ms, peak ms) tuples, the slowest first.
+        """
+        sums = {}
+        peaks = {}
+        for _, hooks in self.frames:
+            for name, (ms, _) in hooks.items():
+                sums[name] = sums.get(name, 0.0) + ms
+                peaks[name] = max(peaks.get(name, 0.0), ms)
+        count = max(1, len(self.frames))
+        rows = [(name, total / count, peaks[name]) for name, total in sums.items()]
+        return sorted(rows, key=lambda row: row[1], reverse=True)
+
+    def drawOverlay(self):
+        """
+        Draws the rolling frame time graph and the slowest hooks at the bottom of the screen.
+
+        Bars are the update and draw time of a frame, the white line is the frame budget.
+        Lime bars fit in the budget, yellow ones in twice the budget, red ones do not.
+
+        Parameters:
+            None
+
+        Returns:
+            None
+        """
+        rows = self.breakdown()[:LINES]
+        top = pyxel.height - GRAPH_HEIGHT - 8 * (len(rows) + 1) - 4
+        pyxel.rect(0, top, pyxel.width, pyxel.height - top, pyxel.COLOR_BLACK)
+        work = [frame[0] for frame in self.frames]
+        mean = sum(work) / len(work) if work else 0.0
+        pyxel.text(2, top + 2, f"frame {mean:5.2f}ms  peak {max(work, default=0.0):5.2f}ms  budget {self.budget:4.1f}ms", pyxel.COLOR_WHITE)
+        for index, (name, average, peak) in enumerate(rows):
+            pyxel.text(2, top + 10 + index * 8, f"{name[:28]:28}{average:6.2f}{peak:7.2f}", pyxel.COLOR_GRAY)
+
+        bottom = pyxel.height - 2
+        # Twice the budget fills the graph
+        scale = GRAPH_HEIGHT / (2 * self.budget)
+        left = pyxel.width - self.window - 2
+        for index, ms in enumerate(work):
+            height = max(1, min(GRAPH_HEIGHT, round(ms * scale)))
+            if ms <= self.budget:
+                col = pyxel.COLOR_LIME
+            elif ms <= 2 * self.budget:
+                col = pyxel.COLOR_YELLOW
+            else:
+                col = pyxel.COLOR_RED
+            pyxel.rect(left + index, bottom - height, 1, height, col)
+        pyxel.rect(left, bottom - round(self.budget * scale), self.window, 1, pyxel.COLOR_WHITE)
+
+    def write(self, record):
+        self.file.write(json.dumps(record) + "\n")
+
+    def close(self):
+        if self.file and not self.file.closed:
+            self.file.close()
+
+def aggregate(paths):
+    """
+    Merges the frame timings of JSONL exports, from any number of sessions and machines.
+
+    Parameters:
+        paths (list): The export files.
+
+    Returns:
+        dict: Per scene, the frame time summary and the summary of every hook.
+    """
+    sessions = []
+    scenes = {}
+    for path in paths:
+        with open(path) as file:
+            for line in file:
+                record = json.loads(line)
+                if record["type"] == "session":
+                    sessions.append(record)
+                    continue
+                scene = scenes.setdefault(record["scene"], {"work": [], "hooks": {}})
+                # summary takes seconds
+                scene["work"].append(record["work"] / 1000)
+                for name, (ms, _) in record["hooks"].items():
+                    scene["hooks"].setdefault(name, []).append(ms / 1000)
+    report = {"sessions": len(sessions), "machines": sorted({session["machine"] for session in sessions}), "scenes": {}}
+    for name, scene in scenes.items():
+        report["scenes"][name] = {
+            "frames": len(scene["work"]),
+            "work": summary(scene["work"]),
+            "hooks": {hook: summary(samples) for hook, samples in scene["hooks"].items()},
+        }
+    return report
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Merge the JSONL exports of main.py --profile-export.")
+    parser.add_argument("files", nargs="+", help="export files to merge")
+    args = parser.parse_args()
+    print(json.dumps(aggregate(args.files), indent=2, sort_keys=True))
@@ -0,0 +1,44 @@
+import pyxel
+
+overdrawn = -1  # Last frame something was drawn over the scenes, the profiler overlay
+
+class Skip:
+    def __init__(self):
+        """
+        Initializes a new instance of the Skip class.
+
+        Lets a scene that changes rarely skip its draw: the screen keeps the last frame, so
+        when the state the scene draws from is the same as in the frame before, there is
+        nothing to clear or repaint. The state is a small tuple the scene builds, it holds
+        the mouse position too as pyxel draws the cursor into the screen. A frame drawn
+        by another scene or with something drawn over it is always repainted.
+
+        Parameters:
+            None
+
+        Returns:
+            None
+        """
+        self.state = None
+        self.frame = None
+
+    def needed(self, state):
+        """
+        Tells whether the scene has to draw this frame, and remembers the state it drew.
+
+        Parameters:
+            state (tuple): Everything the scene draws from.
+
+        Returns:
+            bool: False when the screen already shows this state.
+        """
+        frame = pyxel.frame_count
+        same = state == self.state and self.frame == frame - 1 and overdrawn < self.frame
+        self.state = state
+        self.frame = frame
+        return not same
+
+def overdraw():
+    # The scene below has to repaint the next frame
+    global overdrawn
+    overdrawn = pyxel.frame_count
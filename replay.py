@@ -0,0 +1,305 @@
+import atexit
+import random
+import sys
+import binding
+import bots
+import timing
+
+MAGIC = b"HABR"
+VERSION = 1
+# Every key and button a game reads, a frame stores them as bits in this order
+KEYS = ["KEY_UP", "KEY_DOWN", "KEY_LEFT", "KEY_RIGHT", "KEY_SPACE", "KEY_A", "KEY_D", "KEY_H",
+        "KEY_Q", "KEY_R", "KEY_S", "KEY_T", "KEY_Z", "MOUSE_BUTTON_LEFT"]
+MAX_SKIP = 255  # Idle frames in a row before a record is written anyway, bounds what a hard exit loses
+
+def writeVarint(out, value):
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+def readVarint(data, pos):
+    value = 0
+    shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+def zigzag(value):
+    return value * 2 if value >= 0 else -value * 2 - 1
+
+def unzigzag(value):
+    return value // 2 if value % 2 == 0 else -(value + 1) // 2
+
+class Recorder:
+    def __init__(self, backend, path, seed):
+        """
+        Initializes a new instance of the Recorder class.
+
+        The log starts with the seed and the key table, then holds one record per frame
+        where the input changed: the number of unchanged frames before it, the held keys
+        XOR the previous ones, the pressed keys XOR the ones expected from the held keys,
+        and the mouse movement. Every number is a varint, so a quiet frame costs nothing
+        and a typical change costs 5 bytes.
+
+        Parameters:
+            backend (object): The pyxel implementation the input is read from.
+            path (str): The file the log is written to.
+            seed (int): The seed of the random module for the session.
+
+        Returns:
+            None
+        """
+        self.backend = backend
+        self.seed = seed
+        self.keys = [getattr(backend, name) for name in KEYS]
+        self.bits = {key: 1 << index for index, key in enumerate(self.keys)}
+        self.file = open(path, "wb")
+        header = bytearray(MAGIC)
+        header.append(VERSION)
+        writeVarint(header, seed)
+        writeVarint(header, len(self.keys))
+        for key in self.keys:
+            writeVarint(header, key)
+        self.file.write(header)
+        self.held = 0
+        self.pressed = 0
+        self.previous = 0
+        self.mouseX = 0
+        self.mouseY = 0
+        self.skip = 0
+        self.frames = 0
+
+    def sample(self):
+        """
+        Reads the input of the frame and appends it to the log.
+
+        Parameters:
+            None
+
+        Returns:
+            None
+        """
+        held = 0
+        pressed = 0
+        for key, bit in self.bits.items():
+            if self.backend.btn(key):
+                held |= bit
+            if self.backend.btnp(key):
+                pressed |= bit
+        mouseX, mouseY = self.backend.mouse_x, self.backend.mouse_y
+        changes = (held ^ self.held, pressed ^ (held & ~self.held), zigzag(mouseX - self.mouseX), zigzag(mouseY - self.mouseY))
+        self.previous = self.held
+        self.held, self.pressed, self.mouseX, self.mouseY = held, pressed, mouseX, mouseY
+        self.frames += 1
+        if any(changes) or self.skip >= MAX_SKIP:
+            record = bytearray()
+            writeVarint(record, self.skip)
+            for value in changes:
+                writeVarint(record, value)
+            self.file.write(record)
+            self.file.flush()
+            self.skip = 0
+        else:
+            self.skip += 1
+
+    def close(self):
+        if not self.file.closed:
+            record = bytearray()
+            writeVarint(record, self.skip)
+            self.file.write(record)
+            self.file.close()
+
+class Player:
+    def __init__(self, path):
+        """
+        Initializes a new instance of the Player class, reading a log written by Recorder.
+
+        Parameters:
+            path (str): The log file.
+
+        Returns:
+            None
+        """
+        with open(path, "rb") as file:
+            self.data = file.read()
+        if self.data[:4] != MAGIC or self.data[4] != VERSION:
+            raise ValueError(f"{path} is not an input log of version {VERSION}")
+        pos = 5
+        self.seed, pos = readVarint(self.data, pos)
+        count, pos = readVarint(self.data, pos)
+        self.keys = []
+        for _ in range(count):
+            key, pos = readVarint(self.data, pos)
+            self.keys.append(key)
+        self.bits = {key: 1 << index for index, key in enumerate(self.keys)}
+        self.idle, self.pos = readVarint(self.data, pos)
+        self.held = 0
+        self.pressed = 0
+        self.previous = 0
+        self.mouseX = 0
+        self.mouseY = 0
+        self.frames = 0
+        self.finished = False
+
+    def sample(self):
+        """
+        Moves the input on to the next frame of the log.
+
+        Parameters:
+            None
+
+        Returns:
+            bool: False once the log is over, the input then stays idle.
+        """
+        self.previous = self.held
+        self.pressed = 0
+        if self.idle > 0:
+            self.idle -= 1
+        elif self.pos < len(self.data):
+            changes = []
+            for _ in range(4):
+                value, self.pos = readVarint(self.data, self.pos)
+                changes.append(value)
+            self.held ^= changes[0]
+            self.pressed = changes[1] ^ (self.held & ~self.previous)
+            self.mouseX += unzigzag(changes[2])
+            self.mouseY += unzigzag(changes[3])
+            if self.pos < len(self.data):
+                self.idle, self.pos = readVarint(self.data, self.pos)
+        else:
+            self.finished = True
+            return False
+        self.frames += 1
+        return True
+
+    def close(self):
+        pass
+
+class Input:
+    def __init__(self, backend, source):
+        """
+        Initializes a new instance of the Input class.
+
+        Stands in for the pyxel module: the keys, buttons and mouse of the key table are
+        answered from the recorder or the player, everything else goes to the backend, so
+        the games read the very same input while recording and while replaying.
+
+        Parameters:
+            backend (object): The pyxel implementation to wrap.
+            source (Recorder or Player): Where the input of every frame comes from.
+
+        Returns:
+            None
+        """
+        self.backend = backend
+        self.source = source
+
+    def __getattr__(self, name):
+        return getattr(self.backend, name)
+
+    @property
+    def mouse_x(self):
+        return self.source.mouseX
+
+    @property
+    def mouse_y(self):
+        return self.source.mouseY
+
+    def btn(self, key):
+        bit = self.source.bits.get(key)
+        if bit is None:
+            return False if isinstance(self.source, Player) else self.backend.btn(key)
+        return bool(self.source.held & bit)
+
+    def btnp(self, key, hold=None, repeat=None):
+        bit = self.source.bits.get(key)
+        if bit is None:
+            return False if isinstance(self.source, Player) else self.backend.btnp(key, hold, repeat)
+        return bool(self.source.pressed & bit)
+
+    def btnr(self, key):
+        bit = self.source.bits.get(key)
+        if bit is None:
+            return False if isinstance(self.source, Player) else self.backend.btnr(key)
+        return bool(self.source.previous & bit and not self.source.held & bit)
+
+    def run(self, update, draw):
+        """
+        Runs the game loop of the backend, reading the input once at the start of every frame.
+
+        Parameters:
+            update (callable): The function called to update the game each frame.
+            draw (callable): The function called to draw the game each frame.
+
+        Returns:
+            None
+        """
+        def step():
+            if self.source.sample() is False:
+                self.quit()
+            update()
+        self.backend.run(step, draw)
+
+    def quit(self):
+        self.source.close()
+        self.backend.quit()
+
+def attach(source, backend=None):
+    """
+    Puts an Input in place of pyxel and makes the session deterministic.
+
+    The game clock follows the frame counter, so timers and fixed steps only depend on the
+    number of frames, the bots and the golf hints think a fixed number of steps per frame,
+    and the random module is seeded from the session.
+
+    Parameters:
+        source (Recorder or Player): Where the input comes from.
+        backend (object): The pyxel implementation to wrap, the current one by default.
+
+    Returns:
+        Input: The bound input layer.
+    """
+    layer = Input(backend or sys.modules["pyxel"], source)
+    binding.bind(layer)
+    timing.clock.useFrames(layer)
+    # Searches that go as far as the machine allows would not play the same twice
+    bots.budget.steps = bots.REPLAY_STEPS
+    random.seed(source.seed)
+    return layer
+
+def record(path, seed=None, backend=None):
+    """
+    Records the input of the session to a log file.
+
+    Parameters:
+        path (str): The file the log is written to.
+        seed (int): The seed of the random module, a random one by default.
+        backend (object): The pyxel implementation to wrap, the current one by default.
+
+    Returns:
+        Input: The bound input layer.
+    """
+    if seed is None:
+        seed = random.randrange(2 ** 32)
+    recorder = Recorder(backend or sys.modules["pyxel"], path, seed)
+    # pyxel.quit may end the process without returning, records are flushed as they go
+    atexit.register(recorder.close)
+    return attach(recorder, backend)
+
+def replay(path, backend=None):
+    """
+    Plays the input of a log file back instead of reading the keyboard and mouse.
+
+    Parameters:
+        path (str): The log file.
+        backend (object): The pyxel implementation to wrap, the current one by default.
+
+    Returns:
+        Input: The bound input layer.
+    """
+    return attach(Player(path), backend)
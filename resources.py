@@ -0,0 +1,139 @@
+import pyxel
+
+class ResourceManager:
+    def __init__(self):
+        """
+        Initializes a new instance of the ResourceManager class.
+
+        Keeps a copy of the image banks of every .pyxres file loaded so far, so switching
+        between scenes only copies pixels between images instead of reading the file again.
+
+        Parameters:
+            None
+
+        Returns:
+            None
+        """
+        self.banks = {}
+        self.active = None
+
+    def use(self, filename):
+        """
+        Makes the image banks of a resource file the active ones.
+
+        The file is read from disk the first time it is used, its banks are then kept in
+        memory and copied back into pyxel.images when the scene changes. Nothing happens
+        if the file is already the active one.
+
+        Parameters:
+            filename (str): The .pyxres file to activate.
+
+        Returns:
+            None
+        """
+        if filename == self.active:
+            return
+        if filename in self.banks:
+            self.restore(self.banks[filename])
+        else:
+            pyxel.load(filename)
+            self.banks[filename] = self.snapshot()
+        self.active = filename
+
+    def preload(self, filename):
+        """
+        Reads a resource file into the cache without changing the active image banks.
+
+        Parameters:
+            filename (str): The .pyxres file to cache.
+
+        Returns:
+            None
+        """
+        if filename in self.banks:
+            return
+        pyxel.load(filename)
+        self.banks[filename] = self.snapshot()
+        if self.active in self.banks:
+            self.restore(self.banks[self.active])
+
+    def snapshot(self):
+        """
+        Copies every image bank currently loaded in pyxel.
+
+        Parameters:
+            None
+
+        Returns:
+            list: A list of pyxel.Image copies, one per image bank.
+        """
+        banks = []
+        for bank in pyxel.images:
+            copy = pyxel.Image(bank.width, bank.height)
+            copy.blt(0, 0, bank, 0, 0, bank.width, bank.height)
+            banks.append(copy)
+        return banks
+
+    def restore(self, banks):
+        """
+        Copies previously saved image banks back into pyxel.
+
+        Parameters:
+            banks (list): The pyxel.Image copies returned by snapshot.
+
+        Returns:
+            None
+        """
+        for bank, copy in zip(pyxel.images, banks):
+            bank.blt(0, 0, copy, 0, 0, copy.width, copy.height)
+
+    def forget(self):
+        """
+        Drops every cached resource file, the next use will read them from disk again.
+
+        Parameters:
+            None
+
+        Returns:
+            None
+        """
+        self.banks = {}
+        self.active = None
+
+manager = ResourceManager()
+
+def use(filename):
+    """
+    Activates a resource file through the shared resource manager.
+
+    Parameters:
+        filename (str): The .pyxres file to activate.
+
+    Returns:
+        None
+    """
+    manager.use(filename)
+
+def preload(filename):
+    """
+    Caches a resource file through the shared resource manager, the active one stays.
+
+    Parameters:
+        filename (str): The .pyxres file to cache.
+
+    Returns:
+        None
+    """
+    manager.preload(filename)
+
+def current():
+    """
+    Returns the name of the active resource file.
+
+    Parameters:
+        None
+
+    Returns:
+        str: The active .pyxres file, or None if nothing was loaded yet.
+    """
+    return manager.active
@@ -0,0 +1,107 @@
+import resources
+import timing
+
+class SceneStack:
+    def __init__(self):
+        """
+        Initializes a new instance of the SceneStack class.
+
+        Only the scene on top of the stack runs. The scenes below it are suspended: their
+        timers are paused and the resource file they were using is remembered, so they
+        come back exactly as they were left. Scenes that are popped go to a pool and are
+        resumed, not created again, the next time they are entered.
+
+        A scene can define suspend() and resume() methods, they are called on the switch.
+
+        Parameters:
+            None
+
+        Returns:
+            None
+        """
+        self.scenes = []
+        self.pool = {}
+        self.files = {}
+
+    def top(self):
+        """
+        Returns the running scene.
+
+        Parameters:
+            None
+
+        Returns:
+            object: The scene on top of the stack, or None if the stack is empty.
+        """
+        return self.scenes[-1][1] if self.scenes else None
+
+    def push(self, name, scene):
+        """
+        Suspends the running scene and puts a new one on top of it.
+
+        Parameters:
+            name (str): The name the scene is pooled under.
+            scene (object): The scene to run.
+
+        Returns:
+            object: The scene.
+        """
+        if self.scenes:
+            self.suspend(*self.scenes[-1])
+        self.scenes.append((name, scene))
+        return scene
+
+    def pop(self):
+        """
+        Suspends the running scene, keeps it in the pool and resumes the one below.
+
+        Parameters:
+            None
+
+        Returns:
+            object: The scene that was removed.
+        """
+        name, scene = self.scenes.pop()
+        self.suspend(name, scene)
+        self.pool[name] = scene
+        if self.scenes:
+            self.resume(*self.scenes[-1])
+        return scene
+
+    def enter(self, name, factory):
+        """
+        Runs a scene on top of the stack, reusing the pooled instance if there is one.
+
+        Parameters:
+            name (str): The name of the scene.
+            factory (callable): Called with the name to create the scene when it is not pooled.
+
+        Returns:
+            object: The running scene.
+        """
+        scene = self.pool.pop(name, None)
+        if scene is None:
+            # Suspend first, the constructor may switch the resource file
+            if self.scenes:
+                self.suspend(*self.scenes[-1])
+            scene = factory(name)
+            self.scenes.append((name, scene))
+            return scene
+        self.push(name, scene)
+        self.resume(name, scene)
+        return scene
+
+    def suspend(self, name, scene):
+        self.files[name] = resources.current()
+        timing.suspend(scene)
+        if hasattr(scene, "suspend"):
+            scene.suspend()
+
+    def resume(self, name, scene):
+        if hasattr(scene, "done"):
+            scene.done = False
+        if self.files.get(name):
+            resources.use(self.files[name])
+        timing.resume(scene)
+        if hasattr(scene, "resume"):
+            scene.resume()
@@ -0,0 +1,251 @@
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import sys
+import time
+import headless
+import minigames
+import particles
+import pool
+import swarm
+from stats import summary
+
+# Keys and buttons the random player presses, KEY_A is left out since it leaves the game
+KEYS = ["KEY_UP", "KEY_DOWN", "KEY_LEFT", "KEY_RIGHT", "KEY_SPACE", "KEY_Z", "KEY_S", "KEY_Q",
+        "KEY_D", "KEY_R", "KEY_T", "KEY_H", "MOUSE_BUTTON_LEFT"]
+SAMPLE_EVERY = 10  # Frames between two counts of the live objects
+
+backend = None
+
+def setup(render=True):
+    """
+    Installs the headless backend in a worker process, the games print to stdout so it is muted.
+
+    Parameters:
+        render (bool): Whether drawing calls rasterize.
+
+    Returns:
+        None
+    """
+    global backend
+    backend = headless.install(render)
+    backend.init(256, 256)
+    sys.stdout = open(os.devnull, "w")
+
+def randomPlayer(seed, press):
+    """
+    Returns an input script holding random keys for a few frames at a time.
+
+    Parameters:
+        seed (int): The seed of the input, the same seed always presses the same keys.
+        press (float): The chance per frame that a key changes state.
+
+    Returns:
+        callable: The script for the backend.
+    """
+    rng = random.Random(seed)
+    keys = [getattr(headless.Backend, key) for key in KEYS]
+    held = set()
+
+    def script(b):
+        for key in keys:
+            if rng.random() < press:
+                held.symmetric_difference_update((key,))
+        b.hold(*held)
+        b.moveMouse(min(255, max(0, b.mouse_x + rng.randint(-6, 6))), min(255, max(0, b.mouse_y + rng.randint(-6, 6))))
+    return script
+
+def liveObjects(scene, created=None):
+    """
+    Counts the entries of every container a scene and its game objects hold.
+
+    Parameters:
+        scene (object): The minigame.
+        created (dict): Filled with the records every pool.Pool created so far, by attribute path.
+
+    Returns:
+        dict: The number of live entries per attribute path, like "player.shots".
+    """
+    counts = {}
+    seen = {id(scene)}
+
+    def visit(prefix, obj, depth):
+        for attr, value in vars(obj).items():
+            # Objects shared between game objects (Player.enemies) are only counted once
+            if id(value) in seen:
+                continue
+            if isinstance(value, (list, dict, set, particles.ParticleSystem, pool.Pool, swarm.Swarm)):
+                seen.add(id(value))
+                counts[prefix + attr] = len(value)
+                if created is not None and isinstance(value, pool.Pool):
+                    created[prefix + attr] = value.created
+            elif depth and type(value).__module__.startswith("game_") and hasattr(value, "__dict__"):
+                seen.add(id(value))
+                visit(prefix + attr + ".", value, depth - 1)
+    visit("", scene, 2)
+    return counts
+
+def score(scene):
+    for attr in ("score", "holes"):
+        if isinstance(getattr(scene, attr, None), (int, float)):
+            return getattr(scene, attr)
+    return None
+
+def episode(task):
+    """
+    Plays one seeded episode of a minigame with a random player.
+
+    Parameters:
+        task (tuple): The minigame name, the seed, the number of frames, the chance a key
+            changes state each frame and the chance a frame lags and runs several updates.
+
+    Returns:
+        dict: The score, the frame time summary, the live object counts, the pool records
+        created after the warm-up and the frames played.
+    """
+    name, seed, frames, press, lag = task
+    random.seed(seed)
+    lagging = random.Random(seed + 1)
+    backend.frame_count = 0
+    backend.held = set()
+    backend.running = True
+    backend.script = randomPlayer(seed, press)
+    scene = minigames.Registry(prewarm=False).create(name)
+    times = []
+    peaks = {}
+    growth = {}
+    warm = {}
+    played = 0
+    for frame in range(frames):
+        # A late frame runs up to GameClock.maxSteps updates before drawing, like the real loop
+        steps = lagging.randint(2, 4) if lagging.random() < lag else 1
+        start = time.perf_counter()
+        backend.step(lambda: [scene.update() for _ in range(steps)], scene.draw)
+        times.append(time.perf_counter() - start)
+        played += 1
+        if frame % SAMPLE_EVERY == 0:
+            created = {}
+            counts = liveObjects(scene, created)
+            for path, count in counts.items():
+                peaks[path] = max(peaks.get(path, 0), count)
+                if frame >= frames // 4:
+                    growth.setdefault(path, count)
+            if frame >= frames // 4:
+                for path, count in created.items():
+                    warm.setdefault(path, count)
+        if getattr(scene, "done", False) or not backend.running:
+            break
+    created = {}
+    final = liveObjects(scene, created)
+    quarter = max(1, played // 4)
+    return {
+        "game": name,
+        "seed": seed,
+        "frames": played,
+        "score": score(scene),
+        "frameTime": summary(times),
+        # Mean frame time of the last quarter over the first one, above 1 the game slows down
+        "drift": round(sum(times[-quarter:]) / max(sum(times[:quarter]), 1e-9), 3),
+        "peakObjects": peaks,
+        # Live objects added since the first quarter, steady games stay around 0
+        "growth": {path: final.get(path, 0) - count for path, count in growth.items()},
+        # Pool records created after the first quarter, a warmed up pool reuses its dead ones
+        "allocations": {path: created.get(path, 0) - count for path, count in warm.items()},
+    }
+
+def aggregate(results, keep):
+    """
+    Merges the episodes of every minigame into one report.
+
+    Parameters:
+        results (list): The episode results.
+        keep (int): The number of worst seeds kept per minigame and criterion.
+
+    Returns:
+        dict: The per game aggregates and the worst seeds.
+    """
+    games = {}
+    worst = []
+    for name in sorted({result["game"] for result in results}):
+        runs = [result for result in results if result["game"] == name]
+        scores = [run["score"] for run in runs if run["score"] is not None]
+        peaks = {}
+        growth = {}
+        allocations = {}
+        for run in runs:
+            for path, count in run["peakObjects"].items():
+                peaks[path] = max(peaks.get(path, 0), count)
+            for path, count in run["growth"].items():
+                growth[path] = max(growth.get(path, 0), count)
+            for path, count in run["allocations"].items():
+                allocations[path] = max(allocations.get(path, 0), count)
+        games[name] = {
+            "episodes": len(runs),
+            "frames": sum(run["frames"] for run in runs),
+            "score": {"min": min(scores), "mean": round(sum(scores) / len(scores), 3), "max": max(scores)} if scores else None,
+            "frameTime": {
+                "p50": round(sorted(run["frameTime"]["p50"] for run in runs)[len(runs) // 2], 4),
+                "p99": max(run["frameTime"]["p99"] for run in runs),
+                "max": max(run["frameTime"]["max"] for run in runs),
+            },
+            "drift": max(run["drift"] for run in runs),
+            "peakObjects": peaks,
+            "growth": growth,
+            "allocations": allocations,
+        }
+        criteria = {
+            "p99": lambda run: run["frameTime"]["p99"],
+            "drift": lambda run: run["drift"],
+            "growth": lambda run: max(run["growth"].values(), default=0),
+            "allocations": lambda run: max(run["allocations"].values(), default=0),
+        }
+        for reason, key in criteria.items():
+            for run in sorted(runs, key=key, reverse=True)[:keep]:
+                worst.append({"game": name, "seed": run["seed"], "frames": run["frames"], "reason": reason, "value": key(run)})
+    return {"games": games, "worst": worst}
+
+def parseArgs():
+    parser = argparse.ArgumentParser(description="Soak test every minigame headlessly with seeded random players.")
+    parser.add_argument("--games", default=",".join(minigames.GAMES), help="comma separated minigames to play")
+    parser.add_argument("--episodes", type=int, default=50, help="episodes per minigame")
+    parser.add_argument("--frames", type=int, default=2000, help="frames per episode at most")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first episode, the next ones count up")
+    parser.add_argument("--press", type=float, default=0.05, help="chance per frame that a key changes state")
+    parser.add_argument("--lag", type=float, default=0.02, help="chance that a frame lags and runs several updates")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="number of worker processes")
+    parser.add_argument("--no-render", action="store_true", help="skip rasterizing, only game logic is timed")
+    parser.add_argument("--keep", type=int, default=3, help="worst seeds saved per minigame and criterion")
+    parser.add_argument("--output", help="write the JSON report to this file instead of stdout")
+    parser.add_argument("--worst", default="soak_worst.json", help="file the worst seeds are saved to")
+    parser.add_argument("--episode", help="play a single GAME:SEED episode in this process and print it")
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    args = parseArgs()
+    if args.episode:
+        name, seed = args.episode.split(":")
+        setup(not args.no_render)
+        print(json.dumps(episode((name, int(seed), args.frames, args.press, args.lag)), indent=2), file=sys.__stdout__)
+        sys.exit()
+    tasks = [(name, args.seed + index, args.frames, args.press, args.lag)
+             for name in args.games.split(",") for index in range(args.episodes)]
+    results = []
+    started = time.perf_counter()
+    with multiprocessing.Pool(args.workers, setup, (not args.no_render,)) as pool:
+        for result in pool.imap_unordered(episode, tasks, chunksize=4):
+            results.append(result)
+            print(f"\r{len(results)}/{len(tasks)} episodes", end="", file=sys.stderr)
+    print(f"\r{len(results)} episodes in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+    report = aggregate(results, args.keep)
+    report["settings"] = {key: value for key, value in vars(args).items() if key not in ("output", "worst", "episode")}
+    with open(args.worst, "w") as file:
+        json.dump(report["worst"], file, indent=2)
+        file.write("\n")
+    output = json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(output + "\n")
+    else:
+        print(output)
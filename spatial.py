@@ -0,0 +1,186 @@
+class Grid:
+    def __init__(self, cellSize):
+        """
+        Initializes a new instance of the Grid class.
+
+        A uniform grid of square cells used as a broad phase: items are stored in the cell
+        under their position, so a query only looks at the cells a circle overlaps instead
+        of every item.
+
+        Parameters:
+            cellSize (int): The side of a cell in pixels, about the largest query radius.
+
+        Returns:
+            None
+        """
+        self.cellSize = cellSize
+        self.cells = {}
+
+    def cell(self, x, y):
+        return (int(x // self.cellSize), int(y // self.cellSize))
+
+    def clear(self):
+        self.cells = {}
+
+    def insert(self, item, x, y):
+        """
+        Adds an item at a position.
+
+        Parameters:
+            item (object): The item, usually an index into the caller's list.
+            x (float): The x-coordinate of the item.
+            y (float): The y-coordinate of the item.
+
+        Returns:
+            None
+        """
+        self.cells.setdefault(self.cell(x, y), []).append(item)
+
+    def remove(self, item, x, y):
+        """
+        Removes an item inserted at a position.
+
+        Parameters:
+            item (object): The item to remove.
+            x (float): The x-coordinate it was inserted at.
+            y (float): The y-coordinate it was inserted at.
+
+        Returns:
+            None
+        """
+        key = self.cell(x, y)
+        bucket = self.cells.get(key)
+        if bucket and item in bucket:
+            bucket.remove(item)
+            if not bucket:
+                del self.cells[key]
+
+    def rebuild(self, points):
+        """
+        Replaces the content of the grid with the indices of a list of points.
+
+        Parameters:
+            points (list): Sequences whose first two values are the x and y coordinates.
+
+        Returns:
+            None
+        """
+        self.cells = {}
+        cells = self.cells
+        size = self.cellSize
+        for index, point in enumerate(points):
+            key = (int(point[0] // size), int(point[1] // size))
+            bucket = cells.get(key)
+            if bucket is None:
+                cells[key] = [index]
+            else:
+                bucket.append(index)
+
+    def query(self, x, y, radius):
+        """
+        Returns the items of every cell a circle overlaps.
+
+        The result is a superset of the items within the radius, callers still check the
+        exact distance.
+
+        Parameters:
+            x (float): The x-coordinate of the center.
+            y (float): The y-coordinate of the center.
+            radius (float): The radius of the circle.
+
+        Returns:
+            list: The candidate items.
+        """
+        size = self.cellSize
+        left, top = int((x - radius) // size), int((y - radius) // size)
+        right, bottom = int((x + radius) // size), int((y + radius) // size)
+        found = []
+        cells = self.cells
+        for column in range(left, right + 1):
+            for row in range(top, bottom + 1):
+                bucket = cells.get((column, row))
+                if bucket:
+                    found.extend(bucket)
+        return found
+
+class Points:
+    def __init__(self, cellSize, points=()):
+        """
+        Initializes a new instance of the Points class.
+
+        A set of fixed points, like trigger spots, indexed by a Grid so the nearest one to a
+        position is found by looking at a few cells. Points can be added and removed at any
+        time, only their own cell changes.
+
+        Parameters:
+            cellSize (int): The side of a grid cell in pixels, about the largest query radius.
+            points (list): The (x, y) points to start with.
+
+        Returns:
+            None
+        """
+        self.grid = Grid(cellSize)
+        self.points = {}
+        self.nextId = 0
+        self.version = 0  # Goes up on every change, for callers caching query results
+        for x, y in points:
+            self.add(x, y)
+
+    def __len__(self):
+        return len(self.points)
+
+    def __iter__(self):
+        return iter(self.points.values())
+
+    def add(self, x, y):
+        """
+        Adds a point.
+
+        Parameters:
+            x (float): The x-coordinate of the point.
+            y (float): The y-coordinate of the point.
+
+        Returns:
+            int: The id of the point, to remove it later.
+        """
+        point = self.nextId
+        self.nextId += 1
+        self.points[point] = (x, y)
+        self.grid.insert(point, x, y)
+        self.version += 1
+        return point
+
+    def remove(self, point):
+        """
+        Removes a point.
+
+        Parameters:
+            point (int): The id returned by add.
+
+        Returns:
+            None
+        """
+        x, y = self.points.pop(point)
+        self.grid.remove(point, x, y)
+        self.version += 1
+
+    def nearest(self, x, y, radius):
+        """
+        Returns the point closest to a position, by Manhattan distance, if one is closer than a radius.
+
+        Parameters:
+            x (float): The x-coordinate of the position.
+            y (float): The y-coordinate of the position.
+            radius (float): The distance the point must be under.
+
+        Returns:
+            tuple: The id of the point and its distance, or None if no point is close enough.
+        """
+        best = None
+        for point in self.grid.query(x, y, radius):
+            px, py = self.points[point]
+            distance = abs(x - px) + abs(y - py)
+            # The oldest point wins a tie, whatever the order of the cells
+            if distance < radius and (best is None or (distance, point) < best[::-1]):
+                best = (point, distance)
+        return best
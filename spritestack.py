@@ -0,0 +1,78 @@
+from collections import OrderedDict
+from math import *
+import pyxel
+import resources
+
+class SpriteStack:
+    def __init__(self, parts, capacity=720):
+        """
+        Initializes a new instance of the SpriteStack class.
+
+        A sprite stack is a list of sprites drawn on top of each other with the same rotation.
+        Each rotation angle is composited once into an off-screen image, the least recently
+        used images are reused when the cache is full. The default capacity holds a whole
+        turn of the menu balloon (720 steps of 0.5 degree).
+
+        Parameters:
+            parts (list): (x, y, img, u, v, w, h, scale) tuples, drawn in order with colkey 0.
+            capacity (int): The maximum number of cached angles.
+
+        Returns:
+            None
+        """
+        self.parts = parts
+        self.capacity = capacity
+        self.cache = OrderedDict()
+        self.source = resources.current()
+        # Screen area any rotation of the parts can cover
+        left, top, right, bottom = pyxel.width, pyxel.height, 0, 0
+        for x, y, img, u, v, w, h, scale in parts:
+            radius = hypot(w, h) * scale / 2 + 1
+            left = min(left, floor(x + w / 2 - radius))
+            top = min(top, floor(y + h / 2 - radius))
+            right = max(right, ceil(x + w / 2 + radius))
+            bottom = max(bottom, ceil(y + h / 2 + radius))
+        self.left = max(0, left)
+        self.top = max(0, top)
+        self.width = max(1, min(pyxel.width, right) - self.left)
+        self.height = max(1, min(pyxel.height, bottom) - self.top)
+
+    def render(self, angle):
+        """
+        Returns the composited image of the stack at an angle, rendering it on a cache miss.
+
+        Parameters:
+            angle (float): The rotation in degrees.
+
+        Returns:
+            pyxel.Image: The off-screen image of the stack.
+        """
+        if self.source != resources.current():
+            # Another resource file is active, the sprites changed
+            self.cache.clear()
+            self.source = resources.current()
+        if angle in self.cache:
+            self.cache.move_to_end(angle)
+            return self.cache[angle]
+        if len(self.cache) >= self.capacity:
+            image = self.cache.popitem(last=False)[1]
+        else:
+            image = pyxel.Image(self.width, self.height)
+        image.cls(0)
+        for x, y, img, u, v, w, h, scale in self.parts:
+            image.blt(x - self.left, y - self.top, img, u, v, w, h, colkey=0, rotate=angle, scale=scale)
+        self.cache[angle] = image
+        return image
+
+    def draw(self, angle, target=None):
+        """
+        Draws the stack on the screen with a single blit.
+
+        Parameters:
+            angle (float): The rotation in degrees.
+            target (object): What to draw on, like a batch.Batch, pyxel by default.
+
+        Returns:
+            None
+        """
+        (target or pyxel).blt(self.left, self.top, self.render(angle), 0, 0, self.width, self.height, colkey=0)
@@ -0,0 +1,38 @@
+import sys
+import time
+
+# Imported first by main.py, so this is as close to the start of the process as Python gets
+started = time.perf_counter()
+marks = []
+
+def mark(label):
+    """
+    Records how long after startup a phase of the launch ended.
+
+    Parameters:
+        label (str): The name of the phase.
+
+    Returns:
+        None
+    """
+    marks.append((label, time.perf_counter() - started))
+
+def report(file=sys.stderr):
+    """
+    Prints the startup phases and the game modules imported so far.
+
+    For a per-module breakdown of the import phase, run main.py with python -X importtime.
+
+    Parameters:
+        file (file): Where to print the report.
+
+    Returns:
+        None
+    """
+    previous = 0.0
+    print("startup phase          ms    total", file=file)
+    for label, at in marks:
+        print(f"{label:18} {(at - previous) * 1000:8.1f} {at * 1000:8.1f}", file=file)
+        previous = at
+    games = sorted(name for name in sys.modules if name.startswith("game_"))
+    print(f"modules loaded: {len(sys.modules)}, minigames: {', '.join(games) or 'none'}", file=file)
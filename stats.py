@@ -0,0 +1,33 @@
+import math
+
+PERCENTILES = [50, 95, 99]
+
+def percentile(samples, p):
+    """
+    Returns the nearest-rank percentile of a list of samples.
+
+    Parameters:
+        samples (list): The measured values.
+        p (int): The percentile, from 0 to 100.
+
+    Returns:
+        float: The value below which p percent of the samples fall.
+    """
+    ordered = sorted(samples)
+    index = max(0, math.ceil(p / 100 * len(ordered)) - 1)
+    return ordered[index]
+
+def summary(samples):
+    """
+    Summarizes frame times in milliseconds.
+
+    Parameters:
+        samples (list): The measured times in seconds.
+
+    Returns:
+        dict: The p50, p95, p99, mean and max times in milliseconds.
+    """
+    result = {f"p{p}": round(percentile(samples, p) * 1000, 4) for p in PERCENTILES}
+    result["mean"] = round(sum(samples) / len(samples) * 1000, 4)
+    result["max"] = round(max(samples) * 1000, 4)
+    return result
@@ -0,0 +1,231 @@
+import random
+import numpy as np
+
+preset = "classic"  # Set by main.py --shooter-waves, the schedule Shooter plays by default
+
+class Swarm:
+    def __init__(self, capacity):
+        """
+        Initializes a new instance of the Swarm class.
+
+        The enemies of a wave live in preallocated arrays, one per field, with the live ones
+        packed at the front in the order they spawned: a frame moves all of them with one
+        array operation. Unlike ParticleSystem the order is kept when enemies are removed,
+        the first enemy a shot overlaps is the one it hits.
+
+        Shots find the enemies they may overlap with near, a sort and sweep broad phase over
+        the arrays, so many shots in a big swarm do not test every enemy each.
+
+        Parameters:
+            capacity (int): The maximum number of live enemies, new ones are dropped beyond it.
+
+        Returns:
+            None
+        """
+        self.capacity = capacity
+        self.count = 0
+        self.x = np.zeros(capacity)
+        self.y = np.zeros(capacity)
+        self.hp = np.zeros(capacity, dtype=np.int32)
+        self.speed = np.zeros(capacity)
+        self.fields = [self.x, self.y, self.hp, self.speed]
+
+    def __len__(self):
+        return self.count
+
+    def spawn(self, x, y, hp, speed):
+        """
+        Adds an enemy.
+
+        Parameters:
+            x (float): The x-coordinate of the enemy.
+            y (float): The y-coordinate of the enemy.
+            hp (int): The number of hits it takes.
+            speed (float): How far it moves down every frame.
+
+        Returns:
+            bool: False if the swarm is full and the enemy was dropped.
+        """
+        i = self.count
+        if i >= self.capacity:
+            return False
+        self.x[i] = x
+        self.y[i] = y
+        self.hp[i] = hp
+        self.speed[i] = speed
+        self.count = i + 1
+        return True
+
+    def step(self):
+        n = self.count
+        self.y[:n] += self.speed[:n]
+
+    def keep(self, alive):
+        """
+        Removes the live enemies that are not flagged as alive, keeping the order of the others.
+
+        Parameters:
+            alive (numpy.ndarray): One boolean per live enemy.
+
+        Returns:
+            None
+        """
+        n = self.count
+        remaining = int(np.count_nonzero(alive))
+        if remaining == n:
+            return
+        for field in self.fields:
+            field[:remaining] = field[:n][alive]
+        self.count = remaining
+
+    def near(self, x, y, radius):
+        """
+        Returns the pairs of points and live enemies that may be within a distance of each other.
+
+        The enemies are sorted by rows as high as the distance and by x-coordinate inside a
+        row, then every point only looks at the enemies of the three rows around it whose
+        x-coordinate is close enough. Callers still check the exact distance.
+
+        Parameters:
+            x (numpy.ndarray): The x-coordinates of the points.
+            y (numpy.ndarray): The y-coordinates of the points.
+            radius (float): The distance.
+
+        Returns:
+            tuple: The index of the point and the index of the enemy of every pair, two numpy.ndarray.
+        """
+        n = self.count
+        if n == 0:
+            return np.zeros(0, dtype=np.intp), np.zeros(0, dtype=np.intp)
+        enemyX = self.x[:n]
+        left = enemyX.min()
+        # A row is wider than the enemies spread so its keys never reach the next one
+        width = enemyX.max() - left + 1
+        keys = np.floor(self.y[:n] / radius) * width + (enemyX - left)
+        order = np.argsort(keys, kind="stable")
+        keys = keys[order]
+        # One window per point and row, from the row above the point to the row below
+        rows = (np.floor(y / radius)[:, None] + np.arange(-1, 2)).ravel()
+        start = keys.searchsorted(rows * width + np.clip(x - radius - left, 0, width - 1).repeat(3), "left")
+        end = keys.searchsorted(rows * width + np.clip(x + radius - left, 0, width - 1).repeat(3), "right")
+        counts = end - start
+        windows = np.repeat(np.arange(len(counts)), counts)
+        # Every pair is the start of its window plus its rank in the window
+        ranks = np.arange(len(windows)) - np.repeat(np.cumsum(counts) - counts, counts)
+        return windows // 3, order[np.repeat(start, counts) + ranks]
+
+    def visible(self, width, height, size):
+        """
+        Returns the enemies whose sprite overlaps the screen, in spawn order.
+
+        Parameters:
+            width (int): The width of the screen.
+            height (int): The height of the screen.
+            size (int): The side of the sprite as drawn, scaled around the center of a 16 pixel square.
+
+        Returns:
+            numpy.ndarray: The indices of the enemies to draw.
+        """
+        n = self.count
+        x, y = self.x[:n], self.y[:n]
+        margin = (size - 16) / 2
+        return np.flatnonzero((x + 16 + margin > 0) & (x - margin < width) & (y + 16 + margin > 0) & (y - margin < height))
+
+    def clear(self):
+        self.count = 0
+
+# Spawn patterns, each returns the positions of one spawn of a wave
+def trickle(wave, width):
+    # The original Shooter: one enemy somewhere in the middle, just above the screen
+    return [(random.randint(60, width - 60), -10) for _ in range(wave.count)]
+
+def line(wave, width):
+    step = width / (wave.count + 1)
+    return [(step * (i + 1) - 8, -20) for i in range(wave.count)]
+
+def vee(wave, width):
+    middle = random.randint(40, width - 56)
+    return [(middle + offset * 12, -20 - abs(offset) * 12) for offset in range(-(wave.count // 2), wave.count - wave.count // 2)]
+
+def rain(wave, width):
+    return [(random.uniform(-8, width - 8), random.uniform(-40, -20)) for _ in range(wave.count)]
+
+class Wave:
+    def __init__(self, pattern, every=60, count=1, speed=1, jitter=0, hp=10, start=0, stop=None):
+        """
+        Initializes a new instance of the Wave class.
+
+        A wave spawns count enemies with a pattern every few frames between two frames.
+
+        Parameters:
+            pattern (callable): The spawn pattern, trickle, line, vee or rain.
+            every (int): The frames between two spawns.
+            count (int): The enemies of a spawn.
+            speed (float): How far the enemies move down every frame.
+            jitter (float): The random change of the speed of every enemy, up or down.
+            hp (int): The hits an enemy takes.
+            start (int): The frame of the first spawn.
+            stop (int): The frame spawns stop at, None to go on forever.
+
+        Returns:
+            None
+        """
+        self.pattern = pattern
+        self.every = every
+        self.count = count
+        self.speed = speed
+        self.jitter = jitter
+        self.hp = hp
+        self.start = start
+        self.stop = stop
+
+    def due(self, frame):
+        return frame >= self.start and (self.stop is None or frame < self.stop) and (frame - self.start) % self.every == 0
+
+class Schedule:
+    def __init__(self, waves, target=20, capacity=64, fire=0):
+        """
+        Initializes a new instance of the Schedule class.
+
+        Parameters:
+            waves (list): The waves, spawned in this order when due on the same frame.
+            target (int): The enemies to kill to win, spawning stops then.
+            capacity (int): The most enemies alive at once.
+            fire (int): The frames between two shots of an enemy on screen at the player, 0 for none.
+
+        Returns:
+            None
+        """
+        self.waves = waves
+        self.target = target
+        self.capacity = capacity
+        self.fire = fire
+
+    def spawns(self, frame):
+        """
+        Returns the enemies to spawn on a frame.
+
+        Parameters:
+            frame (int): The frame count.
+
+        Returns:
+            list: (x, y, hp, speed) tuples.
+        """
+        spawned = []
+        for wave in self.waves:
+            if not wave.due(frame):
+                continue
+            for x, y in wave.pattern(wave, 256):
+                speed = wave.speed + random.uniform(-wave.jitter, wave.jitter) if wave.jitter else wave.speed
+                spawned.append((x, y, wave.hp, speed))
+        return spawned
+
+PRESETS = {
+    "classic": Schedule([Wave(trickle)]),
+    # About 2,000 enemies on screen once it is going, and 500 of their shots
+    "bullethell": Schedule([
+        Wave(rain, every=1, count=6, speed=0.75, jitter=0.25, hp=1),
+        Wave(line, every=120, count=15, speed=1.5, hp=3, start=60),
+        Wave(vee, every=90, count=9, speed=2, hp=2, start=30),
+    ], target=100000, capacity=4096, fire=240),
+}
@@ -0,0 +1,28 @@
+import os
+import random
+import sys
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+# Like pyxel, the headless backend reads resource files next to the script that was run
+sys.argv[0] = os.path.join(ROOT, "main.py")
+
+import headless
+import timing
+
+backend = headless.install()
+
+@pytest.fixture
+def pyxel():
+    """
+    Returns the headless backend, reset to a fresh 256x256 screen with no input and a seeded random module.
+    """
+    backend.init(256, 256)
+    backend.script = None
+    backend.held = set()
+    backend.previous = set()
+    backend.limit = None
+    timing.clock.useFrames(backend)
+    random.seed(0)
+    return backend
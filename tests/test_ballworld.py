@@ -0,0 +1,163 @@
+import random
+from math import *
+import numpy as np
+import ballworld
+import collision
+import course
+import game_tag
+
+class OldBall:
+    # A Tag ball before the balls moved into BallWorld, walls read from the course like then
+    def __init__(self, grid, x, y):
+        self.course = grid
+        self.bX = x
+        self.bY = y
+        self.bvX = 0
+        self.bvY = 0
+        self.jump = 2
+        self.upPressed = False
+
+    def press(self, up, down, left, right):
+        if up:
+            if self.jump > 0:
+                self.bvY -= 2.5
+                self.jump -= 1
+            self.upPressed = True
+        if down:
+            self.bvY += 1
+        if left:
+            self.bvX -= 0.12/1.18
+        if right:
+            self.bvX += 0.12/1.18
+
+    def wouldCollide(self, x, y):
+        if collision.touches(x+4, y+4, course.WALL, self.course.at):
+            self.jump = 2
+            return True
+        return False
+
+    def update(self):
+        self.bvX *= 0.985
+        self.bvY *= 0.985
+        new_x = self.bX + self.bvX
+        new_y = self.bY + self.bvY
+        if not self.wouldCollide(new_x, self.bY):
+            self.bX = new_x
+        else:
+            self.bvX *= -0.8
+        if not self.wouldCollide(self.bX, new_y):
+            self.bY = new_y
+        else:
+            self.bvY *= -0.8
+        if not self.upPressed:
+            self.bvY += 0.1
+        if abs(self.bvX) < 0.1:
+            self.bvX = 0
+        if abs(self.bvY) < 0.1:
+            self.bvY = 0
+        if self.bX < 0 or self.bX > 256 or self.bY < 0 or self.bY > 256:
+            self.bX = 20
+            self.bY = 228
+            self.bvX = 0
+            self.bvY = 0
+        self.upPressed = False
+
+    def checkBallCollision(self, other_ball):
+        dx = (self.bX + 4) - (other_ball.bX + 4)
+        dy = (self.bY + 4) - (other_ball.bY + 4)
+        distance = sqrt(dx*dx + dy*dy)
+        if distance < 8 and distance > 0:
+            nx = dx / distance
+            ny = dy / distance
+            separation = (8 - distance) / 2
+            new_self_x = self.bX + nx * separation
+            new_self_y = self.bY + ny * separation
+            new_other_x = other_ball.bX - nx * separation
+            new_other_y = other_ball.bY - ny * separation
+            if not self.wouldCollide(new_self_x, new_self_y):
+                self.bX = new_self_x
+                self.bY = new_self_y
+            if not other_ball.wouldCollide(new_other_x, new_other_y):
+                other_ball.bX = new_other_x
+                other_ball.bY = new_other_y
+            dvx = self.bvX - other_ball.bvX
+            dvy = self.bvY - other_ball.bvY
+            impulse = 2 * (dvx * nx + dvy * ny) / 2
+            self.bvX -= impulse * nx * 0.8
+            self.bvY -= impulse * ny * 0.8
+            other_ball.bvX += impulse * nx * 0.8
+            other_ball.bvY += impulse * ny * 0.8
+            return True
+        return False
+
+    def pushBack(self):
+        if self.wouldCollide(self.bX, self.bY):
+            self.bX -= self.bvX * 0.1
+            self.bY -= self.bvY * 0.1
+            self.bvX *= -0.5
+            self.bvY *= -0.5
+
+def playRound(pyxel, seed):
+    # Checks every frame of a two-player round against the old balls, returns the ball contacts
+    pyxel.init(256, 256)
+    pyxel.held = set()
+    tag = game_tag.Tag(2, 0)
+    world = tag.world
+    old = [OldBall(world.course, float(x), float(y)) for x, y in zip(world.x.tolist(), world.y.tolist())]
+    # Player 1 plays Z Q S D, player 2 the arrows, both mostly chase the other one
+    keys = [(pyxel.KEY_Z, pyxel.KEY_S, pyxel.KEY_Q, pyxel.KEY_D), (pyxel.KEY_UP, pyxel.KEY_DOWN, pyxel.KEY_LEFT, pyxel.KEY_RIGHT)]
+    rng = random.Random(seed)
+    held = set()
+    pyxel.script = lambda backend: backend.hold(*held)
+    contacts = 0
+    for frame in range(1500):
+        previous = held
+        if frame % 20 == 0:
+            held = set()
+            for player, (up, down, left, right) in enumerate(keys):
+                towards = right if old[1 - player].bX > old[player].bX else left
+                held.add(towards if rng.random() < 0.7 else rng.choice([left, right]))
+                if rng.random() < 0.3:
+                    held.add(up)
+                if rng.random() < 0.05:
+                    held.add(down)
+        elif rng.random() < 0.05:
+            held = held ^ {keys[rng.randrange(2)][0]}
+        gameOver = tag.gameOver
+        pyxel.step(tag.update, tag.draw)
+        for ball, (up, down, left, right) in zip(old, keys):
+            ball.press(up in held and up not in previous, down in held, left in held, right in held)
+            ball.update()
+        if not gameOver and old[0].checkBallCollision(old[1]):
+            contacts += 1
+        for ball in old:
+            ball.pushBack()
+        assert world.x.tolist() == [ball.bX for ball in old]
+        assert world.y.tolist() == [ball.bY for ball in old]
+        assert world.vx.tolist() == [ball.bvX for ball in old]
+        assert world.vy.tolist() == [ball.bvY for ball in old]
+    return contacts
+
+def test_two_player_rounds_move_like_the_ball_objects_did(pyxel):
+    assert sum(playRound(pyxel, seed) for seed in range(4)) > 10
+
+def test_the_broad_phase_finds_every_touching_pair(pyxel):
+    tag = game_tag.Tag(2, 0)
+    rng = random.Random(2)
+    # A pile of balls, many of them touching
+    positions = [(rng.uniform(100, 140), rng.uniform(180, 220)) for _ in range(32)]
+    world = ballworld.BallWorld(tag.world.course, positions)
+    pairs = world.pairs()
+    assert pairs == sorted(set(pairs))
+    touching = [(i, j) for i in range(32) for j in range(i + 1, 32)
+                if hypot(world.x[i] - world.x[j], world.y[i] - world.y[j]) < ballworld.SIZE]
+    assert touching and set(touching) <= set(pairs)
+
+def test_wall_masks_match_the_circle_probes(pyxel):
+    tag = game_tag.Tag(2, 0)
+    world = tag.world
+    rng = np.random.default_rng(3)
+    x = rng.uniform(-4, 252, 20000)
+    y = rng.uniform(-4, 252, 20000)
+    expected = [collision.touches(px + 4, py + 4, course.WALL, world.course.at) for px, py in zip(x.tolist(), y.tolist())]
+    assert world.walls(x, y).tolist() == expected
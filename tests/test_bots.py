@@ -0,0 +1,80 @@
+import random
+import subprocess
+import sys
+import numpy as np
+import bots
+import course
+import game_golf
+import game_tag
+from conftest import ROOT
+
+def test_the_games_load_the_bots_only_when_they_play():
+    code = ("import sys, headless; headless.install(); import game_golf, game_tag; "
+            "print(sorted(name for name in ('bots', 'golfsolver') if name in sys.modules))")
+    output = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True).stdout
+    assert output.strip() == "[]"
+
+def fresh(pyxel):
+    # Like a new session, nothing compiled or solved yet
+    pyxel.init(256, 256)
+    course.cache.clear()
+
+def playTag(pyxel, frames):
+    fresh(pyxel)
+    random.seed(5)
+    tag = game_tag.Tag(4, 3)
+    trace = []
+    for frame in range(frames):
+        pyxel.step(tag.update, tag.draw)
+        trace.append(tuple(tag.world.x.tolist() + tag.world.y.tolist()) + (tag.tag,))
+    return trace
+
+def playGolf(pyxel, frames):
+    fresh(pyxel)
+    golf = game_golf.Golf(bot=True)
+    trace = []
+    for frame in range(frames):
+        pyxel.step(golf.update, golf.draw)
+        trace.append((golf.holes, golf.bX, golf.bY, golf.rotation, golf.power))
+    return trace
+
+def test_bots_on_a_step_budget_play_the_same_every_time(pyxel, monkeypatch):
+    monkeypatch.setattr(bots.budget, "steps", bots.REPLAY_STEPS)
+    assert playTag(pyxel, 300) == playTag(pyxel, 300)
+    first = playGolf(pyxel, 400)
+    assert first == playGolf(pyxel, 400)
+    # The bot did play, it aimed and shot
+    assert len(set(first)) > 10
+
+def finish(search):
+    # Runs a search to its end and returns what it returns
+    while True:
+        try:
+            next(search)
+        except StopIteration as stop:
+            return stop.value
+
+def test_the_golf_bot_tries_shots_with_the_physics_only(pyxel, monkeypatch):
+    fresh(pyxel)
+    golf = game_golf.Golf(bot=True, report=True)
+    golf.continuous = True
+    grid = golf.currentCourse()
+    cells = np.frombuffer(bytes(grid.cells), dtype=np.uint8).reshape(grid.height, grid.width)
+    field = finish(bots.flood(grid, np.nonzero(cells == course.HOLE)))
+    before = dict(vars(golf))
+
+    def allot():
+        raise AssertionError("a tried shot asked for a share of the frame")
+    monkeypatch.setattr(bots.budget, "allot", allot)
+    left = finish(golf.bot.play(golf, grid, field, 300, 6))
+    assert vars(golf) == before and golf.reports == {} and golf.reportSearch is None
+
+    # The same shot played by the game itself
+    golf.think = lambda: None
+    golf.rotation, golf.power = 300, 6
+    golf.shoot()
+    golf.checkBall()
+    while not golf.stopped:
+        golf.update()
+    assert golf.holes == 0 and left > 0
+    assert left == float(golf.bot.distance(grid, field, np.array(golf.bX), np.array(golf.bY)))
@@ -0,0 +1,53 @@
+import random
+from math import *
+import collision
+import course
+import game_golf
+
+STEPS = [(cos(radians(direction)) * 4, sin(radians(direction)) * 4) for direction in range(360)]
+
+def exactCircle(x, y):
+    # The collisionCircle of Golf and Tag before the offsets were precomputed, in the same order
+    return list(dict.fromkeys((int(x + changeX), int(y + changeY)) for changeX, changeY in STEPS))
+
+def exactTouches(x, y, color, sample):
+    return any(sample(px, py) == color for px, py in exactCircle(x, y))
+
+def test_integer_positions_probe_the_same_pixels():
+    for x in range(5, 60):
+        for y in range(5, 60, 7):
+            assert collision.circle(x, y) == exactCircle(x, y)
+
+def test_fractional_probes_are_at_most_one_pixel_up_or_left():
+    rng = random.Random(1)
+    for _ in range(500):
+        x, y = rng.uniform(5, 250), rng.uniform(5, 250)
+        ix, iy, table = collision.offsets(x, y)
+        fracX = int((x - ix) * collision.SUBPIXEL) / collision.SUBPIXEL
+        fracY = int((y - iy) * collision.SUBPIXEL) / collision.SUBPIXEL
+        probes = set((ix + dx, iy + dy) for dx, dy in table)
+        for direction in range(360):
+            exactX = int(x + cos(radians(direction)) * 4)
+            exactY = int(y + sin(radians(direction)) * 4)
+            probeX = ix + floor(fracX + cos(radians(direction)) * 4)
+            probeY = iy + floor(fracY + sin(radians(direction)) * 4)
+            assert (probeX, probeY) in probes
+            assert exactX - 1 <= probeX <= exactX
+            assert exactY - 1 <= probeY <= exactY
+
+def test_wall_contacts_near_walls_match_the_exact_circle(pyxel):
+    import game_tag
+    tag = game_tag.Tag(2, 0)
+    grids = [course.bake(1, u, 0, 16, 16, 7.5*16, 7.5*16, 16) for u in game_golf.HOLES] + [tag.world.course]
+    rng = random.Random(1)
+    for grid in grids:
+        checked = different = 0
+        while checked < 3000:
+            x, y = rng.uniform(5, 250), rng.uniform(5, 250)
+            if not any(grid.at(int(x) + dx, int(y) + dy) == course.WALL for dx in range(-6, 7, 2) for dy in range(-6, 7, 2)):
+                continue
+            checked += 1
+            if collision.touches(x, y, course.WALL, grid.at) != exactTouches(x, y, course.WALL, grid.at):
+                different += 1
+        # The bound the collision.buildOffsets docstring gives, 0.1%
+        assert different <= checked * 0.001
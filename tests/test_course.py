@@ -0,0 +1,76 @@
+import random
+import pytest
+import collision
+import course
+import game_golf
+
+def hole(number):
+    return course.bake(1, game_golf.HOLES[number], 0, 16, 16, 7.5*16, 7.5*16, 16)
+
+def test_sweep_square_stops_the_circle_at_the_side():
+    t, contactX, contactY, normalX, normalY = course.sweepSquare(0, 8, 20, 0, 4, 10, 0, 16)
+    assert t == 0.3
+    assert (contactX, contactY, normalX, normalY) == (10, 8, -1.0, 0.0)
+    assert course.sweepSquare(0, 8, -20, 0, 4, 10, 0, 16) is None
+
+def test_sweep_finds_the_first_wall_of_the_hole(pyxel):
+    rng = random.Random(2)
+    for number in range(len(game_golf.HOLES)):
+        grid = hole(number)
+        walls = [(grid.left + column * grid.scale, grid.top + row * grid.scale)
+                 for row in range(grid.height) for column in range(grid.width)
+                 if grid.cells[row * grid.width + column] == course.WALL]
+        for _ in range(300):
+            x, y = rng.uniform(0, 256), rng.uniform(0, 256)
+            dx, dy = rng.uniform(-12, 12), rng.uniform(-12, 12)
+            hits = [hit for hit in (course.sweepSquare(x, y, dx, dy, collision.RADIUS, left, top, grid.scale) for left, top in walls) if hit]
+            expected = min(hit[0] for hit in hits) if hits else None
+            hit = grid.sweep(x, y, dx, dy, collision.RADIUS)
+            assert (hit and hit[0]) == expected
+
+class Walls:
+    # A grid whose sweep reports the given contacts one after the other, then nothing
+    def __init__(self, hits):
+        self.hits = list(hits)
+        self.moves = []
+
+    def sweep(self, x, y, dx, dy, radius):
+        self.moves.append((dx, dy))
+        return self.hits.pop(0) if self.hits else None
+
+def sweepOnce(pyxel, hits, bvX=4.0):
+    golf = game_golf.Golf(bot=False)
+    walls = Walls(hits)
+    golf.currentCourse = lambda: walls
+    golf.bX, golf.bY, golf.bvX, golf.bvY = 100.0, 100.0, bvX, 0.0
+    golf.sweepBall()
+    return golf, walls
+
+def test_each_bounce_moves_the_rest_of_the_frame(pyxel):
+    wall = (0.5, 0, 0, -1.0, 0.0)
+    back = (0.5, 0, 0, 1.0, 0.0)
+    golf, walls = sweepOnce(pyxel, [wall, back])
+    # Half the frame to the wall, a quarter back to the other one, the last quarter moves on
+    assert [dx for dx, dy in walls.moves] == pytest.approx([4.0, -2.4 * 0.5, 1.44 * 0.25])
+    assert golf.bX == pytest.approx(100 + 2 - 0.01 - 0.6 + 0.01 + 0.36)
+
+def test_a_wedged_ball_stops_after_the_last_bounce(pyxel):
+    wedged = [(0.0, 0, 0, -1.0, 0.0)] * 100
+    golf, walls = sweepOnce(pyxel, wedged)
+    assert len(walls.moves) == game_golf.MAX_BOUNCES
+    assert golf.bX == pytest.approx(100 - 0.01 * game_golf.MAX_BOUNCES)
+
+def test_continuous_mode_is_opt_in(pyxel):
+    assert not game_golf.Golf(bot=False).continuous
+
+def test_a_dropped_search_does_not_stop_the_masks_being_built(pyxel):
+    grid = hole(2)
+    masks = course.Masks(grid, lazy=True)
+    search = masks.building()
+    for _ in range(20):
+        next(search)
+    search.close()
+    masks.finish()
+    complete = course.Masks(grid)
+    for field in ("wall", "hole", "water", "sand"):
+        assert (getattr(masks, field) == getattr(complete, field)).all()
@@ -0,0 +1,103 @@
+import random
+import numpy as np
+import bots
+import game_golf
+import golfsolver
+
+def play(golf, rotation, power):
+    # Plays a shot with the game's own update, like a player pressing space
+    golf.rotation, golf.power = rotation, power
+    golf.shoot()
+    holes = golf.holes
+    for frame in range(golfsolver.MAX_FRAMES):
+        x, y = golf.bX, golf.bY
+        golf.update()
+        if golf.holes != holes:
+            return golfsolver.HOLED, None, None
+        if golf.stopped:
+            break
+    if (golf.bX, golf.bY) == (20, 228) and (x, y) != (20, 228):
+        return golfsolver.OUT, None, None
+    return None, golf.bX, golf.bY
+
+def test_the_simulation_plays_like_the_game(pyxel):
+    rng = random.Random(3)
+    for hole in range(len(game_golf.HOLES)):
+        golf = game_golf.Golf(bot=False)
+        golf.think = lambda: None
+        golf.holes = hole
+        rotations = np.array(sorted(rng.sample(range(360), 6)))
+        powers = np.array([1, 4, 7, 10])
+        result = golfsolver.simulate(golf.currentCourse(), 20, 228, rotations, powers)
+        for row, rotation in enumerate(rotations.tolist()):
+            for column, power in enumerate(powers.tolist()):
+                golf.holes, golf.bX, golf.bY, golf.stopped = hole, 20, 228, True
+                outcome, x, y = play(golf, rotation, power)
+                expected = int(result["outcome"][row, column])
+                if outcome is None:
+                    assert expected in (golfsolver.REST, golfsolver.WATER)
+                    assert (x, y) == (result["x"][row, column], result["y"][row, column])
+                else:
+                    assert outcome == expected
+
+def test_solving_spreads_the_work_and_only_reads_the_disk(pyxel, tmp_path):
+    golf = game_golf.Golf(bot=False)
+    golf.startSolver()
+    grid, key = golf.currentCourse(), golf.holeKey()
+    solver = golfsolver.Solver(cacheDir=str(tmp_path))
+    steps = sum(1 for _ in solver.solving(grid, key, 20, 228, cached=True))
+    assert steps > 100
+    assert list(tmp_path.iterdir()) == []
+    # solve saves the tee, like running golfsolver.py
+    result = golfsolver.Solver(cacheDir=str(tmp_path)).solve(grid, key, 20, 228, persist=True)
+    assert [path.name for path in tmp_path.iterdir()] == [solver.name(key, 20, 228) + ".npz"]
+    # A new solver reads it back without a single step
+    again = golfsolver.Solver(cacheDir=str(tmp_path))
+    assert sum(1 for _ in again.solving(grid, key, 20, 228, cached=True)) == 0
+    for field in result:
+        assert np.array_equal(again.known(key, 20, 228)[field], result[field])
+
+def test_a_plain_game_does_not_start_the_solver(pyxel):
+    golf = game_golf.Golf(bot=False, report=False)
+
+    def script(backend):
+        # Tap up now and then, shoot every 80 frames
+        if backend.frame_count % 80 == 40:
+            backend.hold(pyxel.KEY_SPACE)
+        elif backend.frame_count % 8 == 0:
+            backend.hold(pyxel.KEY_UP)
+    pyxel.script = script
+    for frame in range(600):
+        pyxel.step(golf.update, golf.draw)
+    assert golf.solver is None and golf.shots > 0
+    # Until a hint is asked for
+    pyxel.script = lambda backend: backend.hold(pyxel.KEY_H)
+    while not golf.stopped:
+        pyxel.step(golf.update, golf.draw)
+    pyxel.step(golf.update, golf.draw)
+    assert golf.solver is not None and golf.aim is not None
+
+def test_the_report_and_the_hint_come_over_several_frames(pyxel, monkeypatch, tmp_path):
+    monkeypatch.setattr(bots.budget, "steps", 20)
+    golf = game_golf.Golf(bot=False, report=True)
+    golf.solver = golfsolver.Solver(cacheDir=str(tmp_path))
+    golf.update()
+    golf.draw()
+    assert golf.holes not in golf.reports
+    for frame in range(100):
+        golf.update()
+    assert golf.holes in golf.reports
+    # Once the report is done, a frame has nothing to think about
+    search = golf.reportSearch
+    golf.think()
+    assert golf.reportSearch is search is None
+    golf.bX, golf.bY = 100.0, 120.0
+    golf.autoAim()
+    golf.update()
+    assert golf.aim is not None
+    while golf.aim is not None:
+        golf.update()
+    rotation, power, _ = golf.solver.best(golf.solver.solve(golf.currentCourse(), golf.holeKey(), 100.0, 120.0))
+    assert (golf.rotation, golf.power) == (rotation, power)
+    # The game never writes the cache
+    assert list(tmp_path.iterdir()) == []
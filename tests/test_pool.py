@@ -0,0 +1,40 @@
+import minigames
+import pool
+import soak
+
+class Record:
+    pass
+
+def test_dead_records_are_reused():
+    records = pool.Pool(Record, 8)
+    for frame in range(100):
+        for _ in range(3):
+            records.acquire()
+        records.keep(lambda record: False)
+    assert records.created == 3
+
+def test_a_full_pool_drops_new_records():
+    records = pool.Pool(Record, 2)
+    assert records.acquire() is not None and records.acquire() is not None
+    assert records.acquire() is None
+    assert records.created == 2
+
+def test_reserved_records_are_used_first():
+    records = pool.Pool(Record, 4)
+    records.reserve(10)
+    assert records.created == 4
+    reserved = list(records.items)
+    assert [records.acquire() for _ in range(4)] == reserved
+    assert records.created == 4
+
+def test_the_shooter_allocates_nothing_once_started(pyxel):
+    scene = minigames.Registry(prewarm=False).create("shooter")
+    pyxel.script = lambda backend: backend.hold(pyxel.KEY_SPACE)
+    warm = {}
+    soak.liveObjects(scene, warm)
+    assert set(warm) == {"player.shots", "terrain.stars"}
+    for frame in range(2000):
+        pyxel.step(scene.update, scene.draw)
+    created = {}
+    soak.liveObjects(scene, created)
+    assert created == warm
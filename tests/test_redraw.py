@@ -0,0 +1,70 @@
+import contextlib
+import io
+import random
+import game_clock
+import game_wam
+import main
+import redraw
+
+def playScene(pyxel, monkeypatch, scene, draw, skip, keys):
+    # Every frame, the screen has to be the one a full redraw gives
+    skipped = []
+    needed = redraw.Skip.needed
+    monkeypatch.setattr(redraw.Skip, "needed", lambda self, state: skipped.append(not needed(self, state)) or not skipped[-1])
+    rng = random.Random(4)
+    held = set()
+    mouse = (100, 100)
+
+    def script(backend):
+        backend.hold(*held)
+        backend.moveMouse(*mouse)
+    pyxel.script = script
+    for frame in range(1500):
+        # Long idle stretches, with some keys and mouse moves in between
+        if frame % 50 == 0:
+            held = set(rng.sample(keys, 1)) if rng.random() < 0.4 else set()
+        if rng.random() < 0.02:
+            mouse = (rng.randint(0, 255), rng.randint(0, 255))
+        pyxel.step(scene.update, draw)
+        shown = pyxel.screen.data.copy()
+        # The step already counted the frame, the redraw stays in the frame drawn
+        drawnAt = skip.frame
+        skip.state = None
+        draw()
+        skip.frame = drawnAt
+        assert (pyxel.screen.data == shown).all(), frame
+    return skipped.count(True)
+
+def test_the_clock_skips_only_frames_that_would_look_the_same(pyxel, monkeypatch):
+    clock = game_clock.Clock()
+    clock.target_time = 2
+    skipped = playScene(pyxel, monkeypatch, clock, clock.draw, clock.skip, [pyxel.KEY_SPACE, pyxel.KEY_R])
+    assert skipped > 500
+
+def test_whack_a_mole_skips_only_frames_that_would_look_the_same(pyxel, monkeypatch):
+    wam = game_wam.Wam()
+    skipped = playScene(pyxel, monkeypatch, wam, wam.draw, wam.skip, [pyxel.MOUSE_BUTTON_LEFT])
+    assert skipped > 500
+
+def test_the_overworld_skips_only_frames_that_would_look_the_same(pyxel, monkeypatch):
+    pyxel.limit = 0  # HotAirBalloonGame() starts pyxel.run, return from it right away
+    with contextlib.redirect_stdout(io.StringIO()):
+        game = main.HotAirBalloonGame()
+    game.isMenu = False
+    game.current_game = "balloon"
+    keys = [pyxel.KEY_LEFT, pyxel.KEY_RIGHT, pyxel.KEY_UP, pyxel.KEY_DOWN]
+    skipped = playScene(pyxel, monkeypatch, game, game.draw_balloon, game.balloonSkip, keys)
+    assert skipped > 500
+
+def test_a_frame_drawn_over_or_by_another_scene_is_repainted(pyxel):
+    skip = redraw.Skip()
+    assert skip.needed((1,))
+    pyxel.frame_count += 1
+    assert not skip.needed((1,))
+    redraw.overdraw()
+    pyxel.frame_count += 1
+    assert skip.needed((1,))
+    pyxel.frame_count += 2  # Another scene drew the frame in between
+    assert skip.needed((1,))
+    pyxel.frame_count += 1
+    assert not skip.needed((1,))
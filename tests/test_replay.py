@@ -0,0 +1,106 @@
+import hashlib
+import random
+import pytest
+import binding
+import bots
+import course
+import game_shooter
+import game_tag
+import replay
+
+@pytest.fixture
+def restore(pyxel, monkeypatch):
+    # attach binds its input layer and sets the bots to steps, both are given back afterwards
+    monkeypatch.setattr(bots.budget, "steps", bots.budget.steps)
+    yield pyxel
+    binding.bind(pyxel)
+
+def test_varints_round_trip():
+    out = bytearray()
+    values = [0, 1, 127, 128, 300, 2 ** 32 - 1, 2 ** 40]
+    for value in values:
+        replay.writeVarint(out, value)
+    pos = 0
+    for value in values:
+        read, pos = replay.readVarint(out, pos)
+        assert read == value
+    assert pos == len(out)
+    for value in range(-300, 300):
+        assert replay.zigzag(value) >= 0
+        assert replay.unzigzag(replay.zigzag(value)) == value
+
+def observe(layer, keys):
+    return (tuple(layer.btn(key) for key in keys), tuple(layer.btnp(key) for key in keys),
+            tuple(layer.btnr(key) for key in keys), layer.mouse_x, layer.mouse_y)
+
+def test_a_log_plays_the_recorded_input_back(pyxel, tmp_path):
+    path = str(tmp_path / "input.habr")
+    keys = [getattr(pyxel, name) for name in replay.KEYS]
+    rng = random.Random(1)
+    plan = []
+    for frame in range(2000):
+        # Long quiet stretches too, past the forced record every MAX_SKIP frames
+        if frame < 1000 or frame > 1600:
+            held = set(rng.sample(keys, rng.randint(0, 3))) if rng.random() < 0.2 else (plan[-1][0] if plan else set())
+            mouse = (rng.randint(0, 255), rng.randint(0, 255)) if rng.random() < 0.1 else (plan[-1][1] if plan else (0, 0))
+        plan.append((held, mouse))
+
+    def script(backend):
+        held, mouse = plan[backend.frame_count]
+        backend.hold(*held)
+        backend.moveMouse(*mouse)
+    pyxel.script = script
+    recorder = replay.Recorder(pyxel, path, 7)
+    layer = replay.Input(pyxel, recorder)
+    seen = []
+    for frame in range(len(plan)):
+        pyxel.step(recorder.sample, lambda: seen.append(observe(layer, keys)))
+    recorder.close()
+
+    player = replay.Player(path)
+    assert player.seed == 7 and player.keys == keys
+    layer = replay.Input(pyxel, player)
+    for expected in seen:
+        assert player.sample()
+        assert observe(layer, keys) == expected
+    assert player.sample() is False
+    # About a byte per frame for a busy random player
+    assert len(player.data) < len(plan) * 2
+
+def playSession(pyxel, source, script, create):
+    # A fresh session, like a new run of main.py
+    pyxel.init(256, 256)
+    pyxel.held = set()
+    pyxel.previous = set()
+    pyxel.script = script
+    course.cache.clear()
+    layer = replay.attach(source, pyxel)
+    scene = create()
+    frames = []
+
+    def draw():
+        scene.draw()
+        frames.append(hashlib.md5(pyxel.screen.data.tobytes()).hexdigest())
+    pyxel.limit = 300
+    layer.run(scene.update, draw)
+    return frames
+
+# Tag with a bot on its step budget, Shooter spawning from the random module
+@pytest.mark.parametrize("create, moves", [
+    (lambda: game_tag.Tag(3, 1), ["KEY_Q", "KEY_D", "KEY_Z", "KEY_LEFT", "KEY_RIGHT", "KEY_UP"]),
+    (lambda: game_shooter.Shooter(), ["KEY_SPACE", "KEY_LEFT", "KEY_RIGHT", "KEY_UP", "KEY_DOWN"]),
+])
+def test_a_replayed_session_draws_the_same_frames(restore, tmp_path, create, moves):
+    pyxel = restore
+    path = str(tmp_path / "session.habr")
+    rng = random.Random(3)
+    moves = [getattr(pyxel, name) for name in moves]
+    recorder = replay.Recorder(pyxel, path, 11)
+    recorded = playSession(pyxel, recorder, lambda backend: backend.hold(*rng.sample(moves, 2)) if backend.frame_count % 15 else None, create)
+    recorder.close()
+    assert len(set(recorded)) > 100
+
+    # Another random state and other keys held while replaying, only the log counts
+    random.seed(99)
+    replayed = playSession(pyxel, replay.Player(path), lambda backend: backend.hold(*moves[:2]), create)
+    assert replayed == recorded
@@ -0,0 +1,79 @@
+import random
+from math import hypot
+import main
+import spatial
+
+def scanNearest(points, x, y, radius):
+    # Every point in id order, so the oldest one wins a tie like in Points
+    best = None
+    for point, (px, py) in sorted(points.items()):
+        distance = abs(x - px) + abs(y - py)
+        if distance < radius and (best is None or distance < best[1]):
+            best = (point, distance)
+    return best
+
+def test_nearest_matches_a_scan_while_points_change():
+    rng = random.Random(1)
+    points = spatial.Points(16)
+    live = {}
+    queries = 0
+    for _ in range(4000):
+        roll = rng.random()
+        if roll < 0.3 or not live:
+            # Whole pixels, so ties happen
+            x, y = rng.randint(0, 255), rng.randint(0, 255)
+            live[points.add(x, y)] = (x, y)
+        elif roll < 0.4:
+            point = rng.choice(sorted(live))
+            points.remove(point)
+            del live[point]
+        else:
+            x, y, radius = rng.randint(-10, 265), rng.randint(-10, 265), rng.choice([4, 10, 16, 40])
+            assert points.nearest(x, y, radius) == scanNearest(live, x, y, radius)
+            queries += 1
+    assert len(points) == len(live)
+    assert queries > 2000
+
+def test_the_version_moves_on_every_change():
+    points = spatial.Points(16, [(10, 10)])
+    version = points.version
+    point = points.add(20, 20)
+    assert points.version == version + 1
+    points.remove(point)
+    assert points.version == version + 2
+
+def test_grid_queries_find_every_item_within_the_radius():
+    rng = random.Random(2)
+    positions = [(rng.uniform(-20, 270), rng.uniform(-20, 270)) for _ in range(500)]
+    grid = spatial.Grid(8)
+    grid.rebuild(positions)
+    for _ in range(300):
+        x, y, radius = rng.uniform(-20, 270), rng.uniform(-20, 270), rng.choice([4, 8, 20])
+        found = grid.query(x, y, radius)
+        within = {index for index, (px, py) in enumerate(positions) if hypot(px - x, py - y) < radius}
+        assert within <= set(found)
+        assert len(found) == len(set(found))
+
+def test_removed_grid_items_are_not_found():
+    grid = spatial.Grid(8)
+    grid.insert("a", 10, 10)
+    grid.insert("b", 12, 11)
+    grid.remove("a", 10, 10)
+    assert grid.query(10, 10, 4) == ["b"]
+    grid.remove("b", 12, 11)
+    assert grid.query(10, 10, 4) == [] and grid.cells == {}
+
+def test_the_overworld_looks_triggers_up_again_when_they_change():
+    # Only the parts of the overworld the lookup uses
+    game = main.HotAirBalloonGame.__new__(main.HotAirBalloonGame)
+    game.triggers = spatial.Points(16, [(126, 165)])
+    game.triggerKey = None
+    game.trigger = None
+    game.balloon_x, game.balloon_y = 100, 100
+    assert game.nearestTrigger() is None
+    point = game.addTrigger(101, 101)
+    assert game.nearestTrigger() == (point, 2)
+    game.removeTrigger(point)
+    assert game.nearestTrigger() is None
+    game.balloon_x, game.balloon_y = 126, 166
+    assert game.nearestTrigger() == (0, 1)
@@ -0,0 +1,38 @@
+import resources
+import spritestack
+
+PARTS = [(120, 120, 0, 0, 0, 8, 8, 3), (120, 110, 0, 8, 0, 8, 8, 3), (100, 140, 0, 0, 16, 16, 16, 2)]
+
+def test_every_angle_is_cached_exactly(pyxel):
+    stack = spritestack.SpriteStack(PARTS)
+    assert stack.render(0) is stack.render(0)
+    assert stack.render(0) is not stack.render(0.5)
+    assert list(stack.cache) == [0, 0.5]
+
+def test_the_least_recently_used_angle_is_reused(pyxel):
+    stack = spritestack.SpriteStack(PARTS, capacity=3)
+    first = stack.render(1)
+    stack.render(0)
+    stack.render(2)
+    stack.render(0)
+    assert stack.render(3) is first
+    assert list(stack.cache) == [2, 0, 3]
+
+def test_a_menu_turn_is_cached_whole(pyxel):
+    stack = spritestack.SpriteStack(PARTS)
+    images = [stack.render(step * 0.5) for step in range(720)]
+    assert [stack.render(step * 0.5) for step in range(720)] == images
+    assert len(stack.cache) == 720
+
+def test_the_stack_draws_like_the_rotated_parts(pyxel):
+    resources.use("my_resource.pyxres")
+    stack = spritestack.SpriteStack(PARTS)
+    for angle in [0, 0.5, 37.5, 90, 123.25, 359.5]:
+        pyxel.cls(6)
+        for x, y, img, u, v, w, h, scale in PARTS:
+            pyxel.blt(x, y, img, u, v, w, h, colkey=0, rotate=angle, scale=scale)
+        expected = pyxel.screen.data.copy()
+        assert (expected != 6).any()
+        pyxel.cls(6)
+        stack.draw(angle)
+        assert (pyxel.screen.data == expected).all()
@@ -0,0 +1,16 @@
+import stats
+
+def test_nearest_rank_percentiles():
+    samples = list(range(1, 101))
+    assert stats.percentile(samples, 50) == 50
+    assert stats.percentile(samples, 95) == 95
+    assert stats.percentile(samples, 99) == 99
+    assert stats.percentile(samples, 100) == 100
+    assert stats.percentile(samples, 0) == 1
+    # Always one of the samples, whatever their order
+    assert stats.percentile([3, 1, 2], 50) == 2
+    assert stats.percentile([5], 99) == 5
+
+def test_summary_is_in_milliseconds():
+    samples = [0.001] * 98 + [0.010, 0.020]
+    assert stats.summary(samples) == {"p50": 1.0, "p95": 1.0, "p99": 10.0, "mean": 1.28, "max": 20.0}
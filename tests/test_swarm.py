@@ -0,0 +1,92 @@
+import random
+import numpy as np
+import game_shooter
+import swarm
+
+def randomSwarm(count):
+    enemies = swarm.Swarm(count)
+    for i in range(count):
+        # Whole pixels like the stress mode, so many enemies share an x-coordinate
+        enemies.spawn(random.randint(-8, 248), random.uniform(-40, 270), 1, 1)
+    return enemies
+
+def test_near_finds_every_enemy_within_the_distance(pyxel):
+    enemies = randomSwarm(500)
+    x = np.array([random.uniform(-40, 300) for _ in range(60)])
+    y = np.array([random.uniform(-60, 300) for _ in range(60)])
+    points, near = enemies.near(x, y, 25)
+    found = set(zip(points.tolist(), near.tolist()))
+    assert len(found) == len(points)
+    n = len(enemies)
+    for point in range(len(x)):
+        close = np.flatnonzero(np.maximum(abs(enemies.x[:n] - x[point]), abs(enemies.y[:n] - y[point])) <= 25)
+        assert {(point, i) for i in close.tolist()} <= found
+    # A broad phase, not every pair
+    assert len(found) < len(x) * n / 4
+
+def test_near_with_no_enemies_or_points(pyxel):
+    enemies = swarm.Swarm(4)
+    points, near = enemies.near(np.array([10.0]), np.array([10.0]), 25)
+    assert len(points) == len(near) == 0
+    enemies = randomSwarm(4)
+    points, near = enemies.near(np.zeros(0), np.zeros(0), 25)
+    assert len(points) == len(near) == 0
+
+def test_keep_keeps_the_spawn_order(pyxel):
+    enemies = swarm.Swarm(8)
+    for i in range(6):
+        enemies.spawn(i, 0, i, 1)
+    enemies.keep(np.array([True, False, True, True, False, True]))
+    assert enemies.x[:len(enemies)].tolist() == [0, 2, 3, 5]
+    assert enemies.hp[:len(enemies)].tolist() == [0, 2, 3, 5]
+
+def playBulletHell(pyxel, frames):
+    random.seed(3)
+    game = game_shooter.Shooter(waves="bullethell")
+    pyxel.script = lambda backend: backend.hold(pyxel.KEY_SPACE, pyxel.KEY_LEFT if (backend.frame_count // 40) % 2 else pyxel.KEY_RIGHT)
+    trace = []
+    for frame in range(frames):
+        pyxel.step(game.update, game.draw)
+        enemies = game.enemies.swarm
+        n = len(enemies)
+        trace.append((enemies.x[:n].tolist(), enemies.hp[:n].tolist(), game.enemies.nbTargetOfEnemies))
+    return trace
+
+def test_the_broad_phase_hits_the_same_enemies(pyxel, monkeypatch):
+    expected = playBulletHell(pyxel, 400)
+    # Enemies were shot down on the way
+    assert expected[-1][2] < expected[0][2]
+    monkeypatch.setattr(game_shooter, "BROAD_PHASE", 1)
+    pyxel.init(256, 256)
+    assert playBulletHell(pyxel, 400) == expected
+
+def test_bullet_hell_keeps_500_enemy_shots_on_screen(pyxel):
+    random.seed(3)
+    game = game_shooter.Shooter(waves="bullethell")
+    pyxel.script = lambda backend: backend.hold(pyxel.KEY_LEFT if (backend.frame_count // 40) % 2 else pyxel.KEY_RIGHT)
+    shots = []
+    for frame in range(700):
+        # Drawing thousands of sprites headlessly is slow, the shots only need the updates
+        pyxel.step(game.update, lambda: None)
+        shots.append(len(game.enemies.bullets))
+    assert min(shots[400:]) >= 500
+    bullets = game.enemies.bullets
+    n = len(bullets)
+    x, y = bullets.x[:n], bullets.y[:n]
+    assert ((x > -4) & (x < 260) & (y > -4) & (y < 260)).all()
+    # The ship sits in the stream, the shots that reach it are counted and gone
+    player = game.player
+    assert player.hits > 0
+    bullets.emit(player.x + 10, player.y + 6)
+    n = len(bullets)
+    hits = player.hits + int(np.count_nonzero(np.hypot(bullets.x[:n] - player.x - 8, bullets.y[:n] - player.y - 8) < game_shooter.PLAYER_RADIUS))
+    player.checkHits()
+    assert player.hits == hits
+    n = len(bullets)
+    assert (np.hypot(bullets.x[:n] - player.x - 8, bullets.y[:n] - player.y - 8) >= game_shooter.PLAYER_RADIUS).all()
+
+def test_the_classic_waves_do_not_shoot(pyxel):
+    game = game_shooter.Shooter(waves="classic")
+    for frame in range(300):
+        pyxel.step(game.update, game.draw)
+    assert len(game.enemies.swarm) > 0 and len(game.enemies.bullets) == 0
@@ -0,0 +1,133 @@
+import timing
+
+class FakeTime:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+class FakeKeys:
+    # Answers btn, btnp and btnr from the keys held, pressed and released in the current frame
+    def __init__(self):
+        self.held = set()
+        self.pressed = set()
+        self.released = set()
+
+    def btn(self, key):
+        return key in self.held
+
+    def btnp(self, key, hold=None, repeat=None):
+        return key in self.pressed
+
+    def btnr(self, key):
+        return key in self.released
+
+def test_tick_hands_out_fixed_steps():
+    source = FakeTime()
+    clock = timing.GameClock(fps=70, source=source)
+    assert clock.tick() == 1
+    source.now += 3 / 70
+    assert clock.tick() == 3
+    source.now += 0.4 / 70
+    assert clock.tick() == 0
+    source.now += 0.6 / 70
+    assert clock.tick() == 1
+    # A long stall runs maxSteps and drops the rest, the time lost is counted
+    source.now += 1.0
+    assert clock.tick() == clock.maxSteps
+    assert abs(clock.dropped - (1.0 - clock.maxSteps / 70)) < 1e-9
+    source.now += 1 / 70
+    assert clock.tick() == 1
+
+def test_timers_follow_the_steps_not_the_wall_clock(monkeypatch):
+    source = FakeTime()
+    monkeypatch.setattr(timing, "clock", timing.GameClock(fps=70, source=source))
+    timer = timing.Timer(1.0)
+    source.now += 5.0  # Wall time passing without steps does not count
+    assert timer.elapsed() == 0.0
+    for _ in range(35):
+        timing.clock.advance()
+    assert abs(timer.elapsed() - 0.5) < 1e-9
+    timer.pause()
+    for _ in range(70):
+        timing.clock.advance()
+    timer.resume()
+    assert abs(timer.remaining() - 0.5) < 1e-9
+
+def runFrame(layer, steps, key):
+    seen = []
+    layer.frame()
+    for _ in range(steps):
+        seen.append(layer.btnp(key))
+        layer.stepped()
+    layer.end()
+    return seen
+
+def test_a_press_is_seen_by_one_step_of_a_frame():
+    keys = FakeKeys()
+    layer = timing.StepInput(keys)
+    assert runFrame(layer, 1, "space") == [False]
+    keys.pressed = {"space"}
+    assert runFrame(layer, 3, "space") == [True, False, False]
+
+def test_a_press_in_a_frame_without_steps_is_kept_for_the_next_step():
+    keys = FakeKeys()
+    layer = timing.StepInput(keys)
+    runFrame(layer, 1, "space")
+    keys.pressed = {"space"}
+    assert runFrame(layer, 0, "space") == []
+    keys.pressed = set()
+    assert runFrame(layer, 2, "space") == [True, False]
+    assert runFrame(layer, 1, "space") == [False]
+
+def test_input_outside_of_a_frame_goes_to_the_backend():
+    keys = FakeKeys()
+    layer = timing.StepInput(keys)
+    keys.pressed = {"space"}
+    assert layer.btnp("space") and layer.btnp("space")
+
+def test_a_key_held_across_a_multi_step_frame_is_pressed_once():
+    keys = FakeKeys()
+    layer = timing.StepInput(keys)
+    runFrame(layer, 1, "space")
+    keys.held = {"space"}
+    keys.pressed = {"space"}
+    seen = []
+    layer.frame()
+    for _ in range(3):
+        seen.append((layer.btn("space"), layer.btnp("space"), layer.btnp("space")))
+        layer.stepped()
+    layer.end()
+    # Read twice in the first step, both answers agree
+    assert seen == [(True, True, True), (True, False, False), (True, False, False)]
+    keys.pressed = set()
+    assert runFrame(layer, 2, "space") == [False, False]
+    keys.held = set()
+    keys.released = {"space"}
+    layer.frame()
+    assert [layer.btnr("space") for _ in range(2)] == [True, True]
+    layer.stepped()
+    assert layer.btnr("space") is False
+    layer.stepped()
+    layer.end()
+
+def test_a_key_first_read_in_a_later_step_still_sees_its_press():
+    keys = FakeKeys()
+    layer = timing.StepInput(keys)
+    keys.pressed = {"space", "enter"}
+    layer.frame()
+    seen = []
+    for step in range(3):
+        # enter is only looked at from the second step on, space only in the last one
+        seen.append((layer.btnp("enter") if step > 0 else None, layer.btnp("space") if step == 2 else None))
+        layer.stepped()
+    layer.end()
+    assert seen == [(None, None), (True, None), (False, True)]
+    # Both are known now, a press no step reads does not leak into the next frame
+    layer.frame()
+    layer.stepped()
+    layer.end()
+    keys.pressed = set()
+    assert runFrame(layer, 1, "space") == [False]
+    assert runFrame(layer, 1, "enter") == [False]
@@ -0,0 +1,318 @@
+import time
+import binding
+
+class GameClock:
+    def __init__(self, fps=70, source=time.perf_counter):
+        """
+        Initializes a new instance of the GameClock class.
+
+        The clock reads a monotonic high resolution time source and hands out fixed
+        timesteps: every frame tick returns how many steps of 1/fps seconds have passed,
+        so game speed no longer follows the frame rate.
+
+        Parameters:
+            fps (int): The number of fixed steps per second.
+            source (callable): The function returning the current time in seconds.
+
+        Returns:
+            None
+        """
+        self.source = source
+        self.maxSteps = 4  # Drop the backlog instead of spiraling when far behind, see tick
+        self.dropped = 0.0  # Seconds of backlog dropped so far by the maxSteps clamp
+        self.steps = 0  # Fixed steps run so far, counted by advance
+        self.counter = None  # Reads the number of steps run instead, when the steps are frames of a backend
+        self.setRate(fps)
+
+    def setRate(self, fps):
+        """
+        Changes the length of a fixed step and resets the accumulator.
+
+        Parameters:
+            fps (int): The number of fixed steps per second.
+
+        Returns:
+            None
+        """
+        self.fps = fps
+        self.step = 1 / fps
+        self.accumulator = 0.0
+        self.last = None
+
+    def now(self):
+        """
+        Returns the current time of the clock.
+
+        Parameters:
+            None
+
+        Returns:
+            float: The time in seconds.
+        """
+        return self.source()
+
+    def advance(self):
+        self.steps += 1
+
+    def time(self):
+        """
+        Returns the game time: the number of fixed steps run so far times the step length.
+
+        Timers read it, so they follow the fixed steps and not the wall clock.
+
+        Parameters:
+            None
+
+        Returns:
+            float: The time in seconds.
+        """
+        steps = self.counter() if self.counter is not None else self.steps
+        return steps * self.step
+
+    def tick(self):
+        """
+        Advances the clock by the time elapsed since the last tick.
+
+        A frame runs at most maxSteps steps. When the game is further behind than that,
+        after a stall or a breakpoint, the rest of the backlog is dropped on purpose:
+        running it would make the next frame late too and the game would never catch
+        up. The game then runs slower than the wall clock for that frame, the time lost
+        is added to dropped.
+
+        Parameters:
+            None
+
+        Returns:
+            int: The number of fixed steps to run this frame.
+        """
+        now = self.now()
+        if self.last is None:
+            self.last = now - self.step
+        elapsed = max(0.0, now - self.last)
+        self.last = now
+        # Frames that are only a little early or late count as exactly one step
+        if abs(elapsed - self.step) < self.step / 4:
+            elapsed = self.step
+        self.accumulator += elapsed
+        steps = int(self.accumulator / self.step + 1e-9)
+        if steps > self.maxSteps:
+            steps = self.maxSteps
+            self.dropped += self.accumulator - steps * self.step
+            self.accumulator = 0.0
+        else:
+            self.accumulator -= steps * self.step
+        return steps
+
+    def useFrames(self, backend):
+        """
+        Makes the clock follow the frame counter of a backend instead of the wall clock.
+
+        Every frame then lasts exactly one step, which keeps headless runs and replays
+        deterministic.
+
+        Parameters:
+            backend (object): The pyxel implementation whose frame_count is read.
+
+        Returns:
+            None
+        """
+        self.source = lambda: backend.frame_count * self.step
+        self.counter = lambda: backend.frame_count
+        self.last = None
+        self.accumulator = 0.0
+
+    def useWallClock(self):
+        """
+        Makes the clock read the monotonic high resolution wall clock again.
+
+        Parameters:
+            None
+
+        Returns:
+            None
+        """
+        self.source = time.perf_counter
+        self.counter = None
+        self.last = None
+        self.accumulator = 0.0
+
+clock = GameClock()
+
+class StepInput:
+    def __init__(self, backend):
+        """
+        Initializes a new instance of the StepInput class.
+
+        Stands in for the pyxel module while a frame runs its fixed steps. pyxel computes
+        btnp and btnr once per frame: a frame running two steps would see the same press
+        twice, and one running none would lose it. The presses and releases are latched
+        when the frame starts and answered by the first step that reads them, later
+        steps see none. A key the game asks about for the first time is latched when it
+        is read, in whichever step that is. Edges no step read are dropped at the end of
+        a frame that ran steps. btn and everything else go to the backend, and so does
+        the input read outside of frame and end.
+
+        Parameters:
+            backend (object): The pyxel implementation to wrap.
+
+        Returns:
+            None
+        """
+        self.backend = backend
+        self.keys = set()
+        self.pressed = set()
+        self.released = set()
+        self.read = set()  # Keys whose edges the current step read
+        self.first = True  # No step ran since the frame started
+        self.active = False
+
+    def __getattr__(self, name):
+        return getattr(self.backend, name)
+
+    def install(self):
+        binding.bind(self)
+        return self
+
+    def frame(self):
+        """
+        Latches the presses and releases of the keys the game reads, once at the start of a frame.
+
+        Parameters:
+            None
+
+        Returns:
+            None
+        """
+        backend = self.backend
+        for key in self.keys:
+            if backend.btnp(key):
+                self.pressed.add(key)
+            if backend.btnr(key):
+                self.released.add(key)
+        self.first = True
+        self.active = True
+
+    def end(self):
+        if not self.first:
+            # The frame ran steps and none of them wanted these
+            self.pressed.clear()
+            self.released.clear()
+        self.active = False
+
+    def stepped(self):
+        # The edges read belong to the step that just ran
+        self.pressed -= self.read
+        self.released -= self.read
+        self.read.clear()
+        self.first = False
+
+    def latch(self, key):
+        # First time the game asks about this key, its edges of this frame are still unread
+        self.keys.add(key)
+        if self.backend.btnp(key):
+            self.pressed.add(key)
+        if self.backend.btnr(key):
+            self.released.add(key)
+
+    def btnp(self, key, hold=None, repeat=None):
+        if not self.active:
+            return self.backend.btnp(key, hold, repeat)
+        if hold is not None or repeat is not None:
+            # Key repeat is paced by pyxel's frames, it is only answered in the first step
+            return self.first and self.backend.btnp(key, hold, repeat)
+        if key not in self.keys:
+            self.latch(key)
+        self.read.add(key)
+        return key in self.pressed
+
+    def btnr(self, key):
+        if not self.active:
+            return self.backend.btnr(key)
+        if key not in self.keys:
+            self.latch(key)
+        self.read.add(key)
+        return key in self.released
+
+class Timer:
+    def __init__(self, duration=None):
+        """
+        Initializes a new instance of the Timer class, started right away.
+
+        Timers read the time of the shared game clock, the fixed steps run so far, and
+        can be paused, so a scene that is suspended does not lose time.
+
+        Parameters:
+            duration (float): The length of a countdown in seconds, None for a stopwatch.
+
+        Returns:
+            None
+        """
+        self.duration = duration
+        self.restart()
+
+    def restart(self):
+        self.started = clock.time()
+        self.pausedAt = None
+        self.pausedFor = 0.0
+
+    def pause(self):
+        if self.pausedAt is None:
+            self.pausedAt = clock.time()
+
+    def resume(self):
+        if self.pausedAt is not None:
+            self.pausedFor += clock.time() - self.pausedAt
+            self.pausedAt = None
+
+    def elapsed(self):
+        """
+        Returns the time the timer has been running, pauses excluded.
+
+        Parameters:
+            None
+
+        Returns:
+            float: The elapsed time in seconds.
+        """
+        now = self.pausedAt if self.pausedAt is not None else clock.time()
+        return now - self.started - self.pausedFor
+
+    def remaining(self):
+        """
+        Returns the time left on a countdown.
+
+        Parameters:
+            None
+
+        Returns:
+            float: The remaining time in seconds, never below 0.
+        """
+        return max(0.0, self.duration - self.elapsed())
+
+def suspend(scene):
+    """
+    Pauses every timer of a scene.
+
+    Parameters:
+        scene (object): The scene, its Timer attributes are paused.
+
+    Returns:
+        None
+    """
+    for value in vars(scene).values():
+        if isinstance(value, Timer):
+            value.pause()
+
+def resume(scene):
+    """
+    Resumes every timer of a scene.
+
+    Parameters:
+        scene (object): The scene, its Timer attributes are resumed.
+
+    Returns:
+        None
+    """
+    for value in vars(scene).values():
+        if isinstance(value, Timer):
+            value.resume()